@@ -0,0 +1,247 @@
+# backend/api_payloads.py
+# Response payloads shared by both entry points: app.py (Flask) and asgi.py (Quart).
+# Each builder returns ``(payload, status)``; the routes only fetch data and jsonify.
+from datetime import date
+from database import aggregates
+from database.analytics_store import analytics_store
+from database.availability_engine import availability_engine
+from database.db_config import get_pool_metrics
+from mysql_routes import analytics_rows
+from utils.process_stats import memory_usage
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sidebar data
+QUICK_ACTIONS = [
+    {
+        "icon": "🚨",
+        "text": "Check Critical Alerts",
+        "suggestion": "Show me equipment with critical status"
+    },
+    {
+        "icon": "📊",
+        "text": "Production Efficiency",
+        "suggestion": "What is our current production efficiency?"
+    },
+    {
+        "icon": "🛡️",
+        "text": "Safety Overview",
+        "suggestion": "Recent safety incidents and trends"
+    },
+    {
+        "icon": "🔧",
+        "text": "Maintenance Status",
+        "suggestion": "Which equipment needs maintenance?"
+    },
+    {
+        "icon": "⚡",
+        "text": "Fuel Consumption",
+        "suggestion": "How is our fuel consumption across sites?"
+    }
+]
+
+RECENT_ACTIVITY = [
+    "Equipment status checked",
+    "Production report generated",
+    "Safety audit completed"
+]
+
+TEST_QUESTION = "What is the current equipment status?"
+
+# Server-sent event responses (/api/query/stream)
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # let nginx pass tokens through immediately
+}
+
+
+def sse_event(event, payload, dumps):
+    return f"event: {event}\ndata: {dumps(payload)}\n\n"
+
+
+# Questions
+
+def question_args(data):
+    """``(question, language)`` from a /api/query request body"""
+    data = data or {}
+    return data.get('question', ''), data.get('language', 'en')
+
+
+def query_error(error, answer, status):
+    return {
+        "success": False,
+        "error": error,
+        "response": {
+            "answer": answer,
+            "type": "error",
+            "visualizations": {},
+            "recommendations": []
+        }
+    }, status
+
+
+def query_not_ready():
+    return query_error("RAG engine not initialized", "System is still initializing, please try again shortly.", 503)
+
+
+def query_missing_question():
+    return query_error("No question provided", "Please provide a question.", 400)
+
+
+def query_failed(e):
+    logger.error(f"❌ Query processing error: {e}")
+    return query_error(str(e), "An error occurred while processing your query.", 500)
+
+
+def query_answer(result):
+    # result contains answer + visualizations + recommendations
+    return {"success": True, "response": result}, 200
+
+
+def stream_not_ready():
+    return {"success": False, "error": "RAG engine not initialized"}, 503
+
+
+def stream_missing_question():
+    return {"success": False, "error": "No question provided"}, 400
+
+
+def test_not_ready():
+    return {"success": False, "error": "RAG engine not ready"}, 503
+
+
+def test_answer(result):
+    return {"success": True, "test_question": TEST_QUESTION, "response": result}, 200
+
+
+def test_failed(e):
+    return {"success": False, "error": str(e)}, 500
+
+
+# Dashboard and sidebar
+
+def health(rag_engine, **extra):
+    return {"status": "healthy", "rag_engine_ready": rag_engine is not None, **extra}, 200
+
+
+def system_status(rag_engine, database, **extra):
+    """Dashboard status; ``database`` is the entry point's own MySQL ping"""
+    status = {
+        "database": database,
+        "chromadb": bool(rag_engine and rag_engine.chroma_manager and rag_engine.chroma_manager.client),
+        "mistral_ai": bool(rag_engine and rag_engine.mistral),
+        "services_ready": rag_engine is not None
+    }
+    return {
+        "success": True,
+        "status": status,
+        "db_pool": get_pool_metrics(),
+        **extra,
+        "process_memory": memory_usage(),
+        "aggregate_cache": aggregates.aggregate_cache.stats(),
+        "analytics_store": analytics_store.stats() if Config.ANALYTICS_ENABLED else None,
+        "answer_cache": rag_engine.answer_cache.stats() if rag_engine and rag_engine.answer_cache else None,
+        "llm": rag_engine.llm.stats() if rag_engine else None,
+        "timestamp": "2024-01-15T10:30:00Z"
+    }, 200
+
+
+def system_status_failed(e):
+    logger.error(f"❌ System status error: {e}")
+    return {"success": False, "error": str(e)}, 500
+
+
+def quick_actions():
+    """Get quick actions and suggestions for sidebar"""
+    return {
+        "success": True,
+        "quick_actions": QUICK_ACTIONS,
+        "recent_activity": RECENT_ACTIVITY
+    }, 200
+
+
+def languages():
+    """Get supported languages for TTS"""
+    try:
+        return {"success": True, "languages": Config.SUPPORTED_LANGUAGES}, 200
+    except Exception as e:
+        logger.error(f"❌ Languages endpoint error: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "languages": {
+                'en': 'English',
+                'es': 'Spanish',
+                'fr': 'French',
+                'hi': 'Hindi'
+            }
+        }, 500
+
+
+def incidents(rows):
+    return {"success": True, "incidents": rows}, 200
+
+
+def incidents_failed(e):
+    logger.error(f"❌ Incidents endpoint error: {e}")
+    return {"success": False, "error": str(e), "incidents": []}, 500
+
+
+def maintenance_alerts(rows):
+    return {"success": True, "alerts": rows}, 200
+
+
+def maintenance_alerts_fallback(e):
+    """MySQL failed: the analytics store's alerts, or the error (blocking: may load the store)"""
+    logger.error(f"❌ Maintenance alerts error: {e}")
+    rows = analytics_rows(analytics_store.maintenance_alerts)
+    if rows:
+        return {"success": True, "alerts": rows, "source": "analytics"}, 200
+    return {"success": False, "error": str(e), "alerts": []}, 500
+
+
+def kpis(snapshot):
+    """``snapshot``: ``(kpis, cache_age)`` from aggregates.get_kpis()/aget_kpis()"""
+    values, cache_age = snapshot
+    if cache_age is None:
+        return {"success": False, "error": "KPI aggregation failed", "kpis": values}, 500
+    return {"success": True, "kpis": values, "cache_age_seconds": cache_age}, 200
+
+
+def availability_window(args):
+    """``start``/``end`` (YYYY-MM-DD, end exclusive) and ``days`` query arguments; raises ValueError"""
+    start = date.fromisoformat(args['start']) if args.get('start') else None
+    end = date.fromisoformat(args['end']) if args.get('end') else None
+    days = args.get('days', type=int)
+    if days is not None and days <= 0:
+        raise ValueError("days must be positive")
+    if start and end and start >= end:
+        raise ValueError("start must be before end")
+    return start, end, days
+
+
+def availability(args):
+    """Per-equipment availability over the requested window (blocking: may query MySQL)"""
+    try:
+        start, end, days = availability_window(args)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}, 400
+
+    try:
+        report, cache_age = availability_engine.get(start, end, days)
+        return {"success": True, "availability": report, "cache_age_seconds": cache_age}, 200
+    except Exception as e:
+        logger.error(f"❌ Availability error: {e}")
+        return {"success": False, "error": str(e)}, 500
+
+
+def invalidate_cache(data):
+    """Invalidation hook for the aggregate snapshots, e.g. after a data load"""
+    keys = (data or {}).get('keys', [])
+    try:
+        aggregates.invalidate_aggregates(*keys)
+    except KeyError as e:
+        return {"success": False, "error": str(e)}, 400
+    return {"success": True, "invalidated": keys or list(aggregates.AGGREGATES)}, 200
@@ -1,11 +1,17 @@
+import gc
 import os
 import sys
-from flask import Flask, request, jsonify
+import threading
+import time
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from models.rag_engine import RAGEngine
-from utils.langchain_setup import langchain_setup
+from utils.embedding_service import get_embedding_service
+from utils.process_stats import memory_usage, format_memory
 from database.db_config import init_database, get_mysql_connection
+from database import aggregates
+from database.analytics_store import analytics_store
 from config import Config
+import api_payloads as api
 import logging
 
 # Configure logging
@@ -15,202 +21,204 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Global RAG engine instance
+# Global RAG engine instance (per worker process, built by get_rag_engine())
 rag_engine = None
+_services_pid = None
+_rag_engine_lock = threading.Lock()
+
+# Sidebar queries, shared with the async serving mode (asgi.py)
+INCIDENTS_QUERY = """
+    SELECT incident_date, mine_name, incident_type, severity, description
+    FROM mining_incidents 
+    ORDER BY incident_date DESC 
+    LIMIT %s
+"""
+
+MAINTENANCE_ALERTS_QUERY = """
+    SELECT equipment_id, equipment_type, status, alerts, efficiency_score
+    FROM equipment_monitoring 
+    WHERE status != 'Operational' OR efficiency_score < 80
+    ORDER BY 
+        CASE status 
+            WHEN 'Critical' THEN 1
+            WHEN 'Maintenance' THEN 2  
+            ELSE 3
+        END,
+        efficiency_score ASC
+    LIMIT 10
+"""
+
+def preload_models():
+    """Load the read-only model weights once, before gunicorn forks its workers
+
+    Workers inherit the weights copy-on-write. Nothing that holds a socket,
+    file handle or thread (MySQL pool, Chroma client, executors) is created
+    here; workers open those after the fork in initialize_services(). The
+    model is not run here either: torch thread pools started in the master
+    do not survive fork.
+    """
+    started = time.monotonic()
+    embeddings = get_embedding_service()
+    embeddings.model  # loads the weights
+    import models.rag_engine  # noqa: F401  (AI stack modules, shared with the workers too)
+
+    # Keep the cyclic GC from touching (and un-sharing) the preloaded objects
+    gc.collect()
+    gc.freeze()
+
+    report = {
+        "load_seconds": round(time.monotonic() - started, 2),
+        "model_name": embeddings.model_name,
+        "frozen_objects": gc.get_freeze_count(),
+        "memory": memory_usage()
+    }
+    logger.info(
+        f"📦 Preloaded {report['model_name']} in {report['load_seconds']}s "
+        f"({report['frozen_objects']} objects frozen), master {format_memory(report['memory'])}"
+    )
+    return report
 
 def initialize_services():
-    """Initialize all services on startup"""
-    global rag_engine
-    
+    """Initialize all services on startup (once per worker process)
+
+    Only the database is set up here. The AI stack (langchain, chromadb,
+    torch) is imported when the RAG engine is built: in a background
+    warm-up thread when RAG_WARMUP_ON_START is set, otherwise on the first
+    question. Health, auth and dashboard routes serve in the meantime.
+    """
     try:
-        # Initialize LangChain components
-        embedding_info = langchain_setup.get_embedding_model_info()
-        logger.info(f"🚀 LangChain initialized with: {embedding_info.get('model_name', 'Unknown')}")
-        
         # Initialize database connection
         if init_database():
             logger.info("✅ Database connection established")
+            if Config.SCHEMA_AUTO_MIGRATE:
+                from database.schema import ensure_schema
+                ensure_schema()
         else:
             logger.error("❌ Database connection failed")
-        
-        # Initialize RAG engine
-        rag_engine = RAGEngine()
-        logger.info("✅ RAG Engine initialized successfully")
-        
+
+        if Config.RAG_WARMUP_ON_START and rag_engine is None:
+            threading.Thread(target=get_rag_engine, name="rag-warmup", daemon=True).start()
+
+        # Load the embedded analytics store now rather than during the first MySQL outage
+        if Config.ANALYTICS_ENABLED:
+            threading.Thread(target=warm_analytics_store, name="analytics-warmup", daemon=True).start()
+
         return True
         
     except Exception as e:
         logger.error(f"❌ Service initialization failed: {e}")
         return False
 
+def warm_analytics_store():
+    try:
+        analytics_store.ensure_loaded()
+    except Exception as e:
+        logger.error(f"❌ Analytics store load failed: {e}")
+
+def get_rag_engine():
+    """RAG engine of this worker process, built (and the AI stack imported) on first need
+
+    Returns None when the engine cannot be built.
+    """
+    global rag_engine, _services_pid
+
+    if rag_engine is not None and _services_pid == os.getpid():
+        return rag_engine
+
+    with _rag_engine_lock:
+        if rag_engine is None or _services_pid != os.getpid():
+            try:
+                started = time.monotonic()
+                from models.rag_engine import RAGEngine
+                from utils.langchain_setup import get_langchain_setup
+
+                # Initialize LangChain components
+                embedding_info = get_langchain_setup().get_embedding_model_info()
+                logger.info(f"🚀 LangChain initialized with: {embedding_info.get('model_name', 'Unknown')}")
+
+                # Initialize RAG engine
+                rag_engine = RAGEngine()
+                _services_pid = os.getpid()
+                logger.info(
+                    f"✅ RAG Engine initialized successfully in {time.monotonic() - started:.1f}s "
+                    f"(pid {_services_pid}, {format_memory(memory_usage())})"
+                )
+            except Exception as e:
+                logger.error(f"❌ RAG Engine initialization failed: {e}")
+                return None
+    return rag_engine
+
+def respond(built):
+    """jsonify an ``api_payloads`` builder's ``(payload, status)``"""
+    payload, status = built
+    return jsonify(payload), status
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        "status": "healthy", 
-        "rag_engine_ready": rag_engine is not None
-    })
+    return respond(api.health(rag_engine))
 
 @app.route('/api/query', methods=['POST'])
 def handle_query():
     """Main query endpoint - UPDATED for structured response"""
     try:
-        if rag_engine is None:
-            return jsonify({
-                "success": False,
-                "error": "RAG engine not initialized",
-                "response": {
-                    "answer": "System is still initializing, please try again shortly.",
-                    "type": "error",
-                    "visualizations": {},
-                    "recommendations": []
-                }
-            }), 503
-        
-        data = request.get_json()
-        question = data.get('question', '')
-        language = data.get('language', 'en')
-        
+        engine = get_rag_engine()
+        if engine is None:
+            return respond(api.query_not_ready())
+
+        question, language = api.question_args(request.get_json())
         if not question:
-            return jsonify({
-                "success": False,
-                "error": "No question provided",
-                "response": {
-                    "answer": "Please provide a question.",
-                    "type": "error", 
-                    "visualizations": {},
-                    "recommendations": []
-                }
-            }), 400
-        
+            return respond(api.query_missing_question())
+
         # Process the query - now returns structured data
-        result = rag_engine.query(question, language)
-        
-        return jsonify({
-            "success": True,
-            "response": result  # Contains answer + visualizations + recommendations
-        })
-        
+        return respond(api.query_answer(engine.query(question, language)))
+
     except Exception as e:
-        logger.error(f"❌ Query processing error: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e),
-            "response": {
-                "answer": "An error occurred while processing your query.",
-                "type": "error",
-                "visualizations": {},
-                "recommendations": []
-            }
-        }), 500
+        return respond(api.query_failed(e))
+
+@app.route('/api/query/stream', methods=['POST'])
+def handle_query_stream():
+    """Streaming query endpoint (server-sent events)
+
+    Events: ``visualizations`` (KPIs, charts, tables) as soon as the SQL stage
+    finishes, ``token`` for each LLM text delta, then ``done`` (or ``error``).
+    """
+    engine = get_rag_engine()
+    if engine is None:
+        return respond(api.stream_not_ready())
+
+    question, language = api.question_args(request.get_json(silent=True))
+    if not question:
+        return respond(api.stream_missing_question())
+
+    def event_stream():
+        for event, payload in engine.query_stream(question, language):
+            yield api.sse_event(event, payload, app.json.dumps)
+
+    return Response(stream_with_context(event_stream()), mimetype='text/event-stream', headers=api.SSE_HEADERS)
 
 @app.route('/api/system-status', methods=['GET'])
 def get_system_status():
     """Get overall system status for dashboard"""
     try:
-        status = {
-            "database": False,
-            "chromadb": False,
-            "mistral_ai": False,
-            "services_ready": rag_engine is not None
-        }
-        
-        # Check database
         try:
-            conn = get_mysql_connection()
-            if conn:
-                status["database"] = True
-                conn.close()
-        except:
-            status["database"] = False
-            
-        # Check ChromaDB (through RAG engine)
-        if rag_engine and rag_engine.chroma_manager and rag_engine.chroma_manager.client:
-            status["chromadb"] = True
-            
-        # Check Mistral (through RAG engine)  
-        if rag_engine and rag_engine.mistral:
-            status["mistral_ai"] = True
-            
-        return jsonify({
-            "success": True,
-            "status": status,
-            "timestamp": "2024-01-15T10:30:00Z"
-        })
-        
+            with get_mysql_connection() as conn:
+                database = bool(conn)
+        except Exception:
+            database = False
+        return respond(api.system_status(rag_engine, database))
     except Exception as e:
-        logger.error(f"❌ System status error: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        return respond(api.system_status_failed(e))
 
 @app.route('/api/quick-actions', methods=['GET'])
 def get_quick_actions():
     """Get quick actions and suggestions for sidebar"""
-    try:
-        return jsonify({
-            "success": True,
-            "quick_actions": [
-                {
-                    "icon": "🚨", 
-                    "text": "Check Critical Alerts", 
-                    "suggestion": "Show me equipment with critical status"
-                },
-                {
-                    "icon": "📊", 
-                    "text": "Production Efficiency", 
-                    "suggestion": "What is our current production efficiency?"
-                },
-                {
-                    "icon": "🛡️", 
-                    "text": "Safety Overview", 
-                    "suggestion": "Recent safety incidents and trends"
-                },
-                {
-                    "icon": "🔧", 
-                    "text": "Maintenance Status", 
-                    "suggestion": "Which equipment needs maintenance?"
-                },
-                {
-                    "icon": "⚡", 
-                    "text": "Fuel Consumption", 
-                    "suggestion": "How is our fuel consumption across sites?"
-                }
-            ],
-            "recent_activity": [
-                "Equipment status checked",
-                "Production report generated", 
-                "Safety audit completed"
-            ]
-        })
-    except Exception as e:
-        logger.error(f"❌ Quick actions error: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+    return respond(api.quick_actions())
 
 @app.route('/api/languages', methods=['GET'])
 def get_languages():
     """Get supported languages for TTS"""
-    try:
-        return jsonify({
-            "success": True,
-            "languages": Config.SUPPORTED_LANGUAGES
-        })
-    except Exception as e:
-        logger.error(f"❌ Languages endpoint error: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e),
-            "languages": {
-                'en': 'English',
-                'es': 'Spanish',
-                'fr': 'French', 
-                'hi': 'Hindi'
-            }
-        }), 500
+    return respond(api.languages())
 
 # ✅ ADDED: MySQL Data Endpoints (for sidebar)
 @app.route('/api/incidents', methods=['GET'])
@@ -218,160 +226,53 @@ def get_incidents():
     """Get recent safety incidents"""
     try:
         limit = request.args.get('limit', 5, type=int)
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT incident_date, mine_name, incident_type, severity, description
-            FROM mining_incidents 
-            ORDER BY incident_date DESC 
-            LIMIT %s
-        """, (limit,))
-        
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        return jsonify({
-            "success": True,
-            "incidents": rows
-        })
-        
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(INCIDENTS_QUERY, (limit,))
+            rows = cursor.fetchall()
+            cursor.close()
+        return respond(api.incidents(rows))
     except Exception as e:
-        logger.error(f"❌ Incidents endpoint error: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e),
-            "incidents": []
-        }), 500
+        return respond(api.incidents_failed(e))
 
 @app.route('/api/maintenance-alerts', methods=['GET'])
 def get_maintenance_alerts():
     """Get maintenance alerts"""
     try:
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT equipment_id, equipment_type, status, alerts, efficiency_score
-            FROM equipment_monitoring 
-            WHERE status != 'Operational' OR efficiency_score < 80
-            ORDER BY 
-                CASE status 
-                    WHEN 'Critical' THEN 1
-                    WHEN 'Maintenance' THEN 2  
-                    ELSE 3
-                END,
-                efficiency_score ASC
-            LIMIT 10
-        """)
-        
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        return jsonify({
-            "success": True,
-            "alerts": rows
-        })
-        
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(MAINTENANCE_ALERTS_QUERY)
+            rows = cursor.fetchall()
+            cursor.close()
+        return respond(api.maintenance_alerts(rows))
     except Exception as e:
-        logger.error(f"❌ Maintenance alerts error: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e),
-            "alerts": []
-        }), 500
+        return respond(api.maintenance_alerts_fallback(e))
 
 @app.route('/api/kpis', methods=['GET'])
 def get_kpis():
-    """Get current KPIs"""
-    try:
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Total incidents (last 30 days)
-        cursor.execute("""
-            SELECT COUNT(*) as total_incidents 
-            FROM mining_incidents 
-            WHERE incident_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-        """)
-        total_incidents = cursor.fetchone()['total_incidents']
-        
-        # Critical equipment alerts
-        cursor.execute("""
-            SELECT COUNT(*) as critical_alerts 
-            FROM equipment_monitoring 
-            WHERE status = 'Critical'
-        """)
-        critical_alerts = cursor.fetchone()['critical_alerts']
-        
-        # Average efficiency (last 30 days)
-        cursor.execute("""
-            SELECT AVG(efficiency_percentage) as avg_efficiency 
-            FROM production_metrics 
-            WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-        """)
-        avg_efficiency = cursor.fetchone()['avg_efficiency'] or 0
-        
-        # Monthly production
-        cursor.execute("""
-            SELECT SUM(quantity_tons) as monthly_production 
-            FROM production_metrics 
-            WHERE MONTH(metric_date) = MONTH(CURDATE())
-        """)
-        monthly_production = cursor.fetchone()['monthly_production'] or 0
-        
-        cursor.close()
-        conn.close()
-        
-        return jsonify({
-            "success": True,
-            "kpis": {
-                "total_incidents": total_incidents,
-                "critical_alerts": critical_alerts,
-                "avg_efficiency": round(float(avg_efficiency), 2),
-                "monthly_production": float(monthly_production)
-            }
-        })
-        
-    except Exception as e:
-        logger.error(f"❌ KPIs endpoint error: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e),
-            "kpis": {
-                "total_incidents": 0,
-                "critical_alerts": 0,
-                "avg_efficiency": 0,
-                "monthly_production": 0
-            }
-        }), 500
+    """Get current KPIs (served from the shared aggregate snapshot)"""
+    return respond(api.kpis(aggregates.get_kpis()))
+
+@app.route('/api/availability', methods=['GET'])
+def get_availability():
+    """Per-equipment uptime, MTBF, MTTR, alert rate and longest outage over a date window"""
+    return respond(api.availability(request.args))
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """Invalidation hook for the aggregate snapshots, e.g. after a data load"""
+    return respond(api.invalidate_cache(request.get_json(silent=True)))
 
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
     """Test endpoint to verify RAG functionality"""
     try:
-        if rag_engine is None:
-            return jsonify({
-                "success": False,
-                "error": "RAG engine not ready"
-            }), 503
-        
-        test_question = "What is the current equipment status?"
-        result = rag_engine.query(test_question)
-        
-        return jsonify({
-            "success": True,
-            "test_question": test_question,
-            "response": result
-        })
-        
+        engine = get_rag_engine()
+        if engine is None:
+            return respond(api.test_not_ready())
+        return respond(api.test_answer(engine.query(api.TEST_QUESTION)))
     except Exception as e:
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+        return respond(api.test_failed(e))
 
 if __name__ == '__main__':
     # Initialize services
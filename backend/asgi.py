@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the async serving mode (SERVING_MODE=async)
+
+Serves the same API as app.py from one event loop per worker: MySQL through
+aiomysql, the LLM through async HTTP clients, embeddings and Chroma on the
+RAG stage executor. A worker keeps hundreds of questions in flight while the
+dashboard endpoints stay responsive.
+
+    gunicorn -c gunicorn.conf.py        (with SERVING_MODE=async)
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from quart import Quart, Response, request, jsonify
+from quart_cors import cors
+import app as sync_app
+import api_payloads as api
+from database import aggregates, async_db
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+app = cors(Quart(__name__))
+
+if Config.PRELOAD_MODELS:
+    # Weights load once in the gunicorn master; workers open handles in startup()
+    sync_app.preload_models()
+
+
+async def get_rag_engine():
+    """This worker's RAG engine; building it (first question only) runs off the loop"""
+    if sync_app.rag_engine is not None:
+        return sync_app.rag_engine
+    return await asyncio.to_thread(sync_app.get_rag_engine)
+
+
+@app.before_serving
+async def startup():
+    # init_database() (and the RAG warm-up it starts) are blocking; keep them off the loop
+    if not await asyncio.to_thread(sync_app.initialize_services):
+        logger.error("❌ Service initialization failed")
+    try:
+        await async_db.get_async_pool()
+    except Exception as e:
+        logger.error(f"❌ Async MySQL pool unavailable: {e}")
+
+
+@app.after_serving
+async def shutdown():
+    await async_db.close_async_pool()
+
+
+def respond(built):
+    """jsonify an ``api_payloads`` builder's ``(payload, status)``"""
+    payload, status = built
+    return jsonify(payload), status
+
+
+@app.route('/api/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint"""
+    return respond(api.health(sync_app.rag_engine, serving_mode="async"))
+
+
+@app.route('/api/query', methods=['POST'])
+async def handle_query():
+    """Main query endpoint (async pipeline, see RAGEngine.aquery)"""
+    rag_engine = await get_rag_engine()
+    try:
+        if rag_engine is None:
+            return respond(api.query_not_ready())
+
+        question, language = api.question_args(await request.get_json(silent=True))
+        if not question:
+            return respond(api.query_missing_question())
+
+        return respond(api.query_answer(await rag_engine.aquery(question, language)))
+
+    except Exception as e:
+        return respond(api.query_failed(e))
+
+
+@app.route('/api/query/stream', methods=['POST'])
+async def handle_query_stream():
+    """Streaming query endpoint (server-sent events, same events as app.py)"""
+    rag_engine = await get_rag_engine()
+    if rag_engine is None:
+        return respond(api.stream_not_ready())
+
+    question, language = api.question_args(await request.get_json(silent=True))
+    if not question:
+        return respond(api.stream_missing_question())
+
+    async def event_stream():
+        async for event, payload in rag_engine.aquery_stream(question, language):
+            yield api.sse_event(event, payload, app.json.dumps).encode("utf-8")
+
+    response = Response(event_stream(), mimetype='text/event-stream', headers=api.SSE_HEADERS)
+    response.timeout = None  # tokens keep arriving for as long as the LLM generates
+    return response
+
+
+@app.route('/api/system-status', methods=['GET'])
+async def get_system_status():
+    """Get overall system status for dashboard"""
+    try:
+        return respond(api.system_status(
+            sync_app.rag_engine, await async_db.ping(),
+            async_db_pool=async_db.get_async_pool_metrics()
+        ))
+    except Exception as e:
+        return respond(api.system_status_failed(e))
+
+
+@app.route('/api/quick-actions', methods=['GET'])
+async def get_quick_actions():
+    """Get quick actions and suggestions for sidebar"""
+    return respond(api.quick_actions())
+
+
+@app.route('/api/languages', methods=['GET'])
+async def get_languages():
+    """Get supported languages for TTS"""
+    return respond(api.languages())
+
+
+@app.route('/api/incidents', methods=['GET'])
+async def get_incidents():
+    """Get recent safety incidents"""
+    try:
+        limit = request.args.get('limit', 5, type=int)
+        return respond(api.incidents(await async_db.fetch_all(sync_app.INCIDENTS_QUERY, (limit,))))
+    except Exception as e:
+        return respond(api.incidents_failed(e))
+
+
+@app.route('/api/maintenance-alerts', methods=['GET'])
+async def get_maintenance_alerts():
+    """Get maintenance alerts"""
+    try:
+        return respond(api.maintenance_alerts(await async_db.fetch_all(sync_app.MAINTENANCE_ALERTS_QUERY)))
+    except Exception as e:
+        return respond(await asyncio.to_thread(api.maintenance_alerts_fallback, e))
+
+
+@app.route('/api/kpis', methods=['GET'])
+async def get_kpis():
+    """Get current KPIs (served from the shared aggregate snapshot)"""
+    return respond(api.kpis(await aggregates.aget_kpis()))
+
+
+@app.route('/api/availability', methods=['GET'])
+async def get_availability():
+    """Per-equipment uptime, MTBF, MTTR, alert rate and longest outage over a date window"""
+    return respond(await asyncio.to_thread(api.availability, request.args))
+
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+async def invalidate_cache():
+    """Invalidation hook for the aggregate snapshots, e.g. after a data load"""
+    return respond(api.invalidate_cache(await request.get_json(silent=True)))
+
+
+@app.route('/api/test', methods=['GET'])
+async def test_endpoint():
+    """Test endpoint to verify RAG functionality"""
+    rag_engine = await get_rag_engine()
+    try:
+        if rag_engine is None:
+            return respond(api.test_not_ready())
+        return respond(api.test_answer(await rag_engine.aquery(api.TEST_QUESTION)))
+    except Exception as e:
+        return respond(api.test_failed(e))
+
+
+# This makes the app available to ASGI servers
+application = app
+
+if __name__ == "__main__":
+    app.run(host='0.0.0.0', port=5000)
@@ -22,6 +22,57 @@ class Config:
     MYSQL_DB = os.getenv("MYSQL_DATABASE", "mining_data")
     MYSQL_PORT = int(os.getenv("MYSQL_PORT", "3307"))
 
+    # MySQL Connection Pool (one pool per gunicorn worker process)
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "4"))
+    MYSQL_MAX_CONNECTIONS = int(os.getenv("MYSQL_MAX_CONNECTIONS", "40"))
+    MYSQL_POOL_SIZE = int(os.getenv(
+        "MYSQL_POOL_SIZE", str(max(2, MYSQL_MAX_CONNECTIONS // max(1, WEB_CONCURRENCY)))
+    ))
+    MYSQL_POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", "5.0"))
+    MYSQL_POOL_PING_INTERVAL = float(os.getenv("MYSQL_POOL_PING_INTERVAL", "10.0"))
+    MYSQL_POOL_RECYCLE = float(os.getenv("MYSQL_POOL_RECYCLE", "3600"))
+
+    # Serving mode: "sync" (wsgi.py, sync workers) or "async" (asgi.py, one event loop per worker)
+    SERVING_MODE = os.getenv("SERVING_MODE", "sync").lower()
+    MYSQL_ASYNC_POOL_SIZE = int(os.getenv("MYSQL_ASYNC_POOL_SIZE", str(MYSQL_POOL_SIZE)))
+    # Load model weights once in the gunicorn master and share them copy-on-write
+    PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+    # Build the RAG engine in a background thread at startup instead of on the first question
+    RAG_WARMUP_ON_START = os.getenv("RAG_WARMUP_ON_START", "true").lower() == "true"
+
+    # Schema migrations (database/schema.py), applied by each worker at startup under a MySQL lock
+    SCHEMA_AUTO_MIGRATE = os.getenv("SCHEMA_AUTO_MIGRATE", "true").lower() == "true"
+    SCHEMA_LOCK_TIMEOUT = int(os.getenv("SCHEMA_LOCK_TIMEOUT", "60"))
+
+    # Aggregate snapshot cache (KPIs and trend charts), seconds
+    AGGREGATE_CACHE_TTL = float(os.getenv("AGGREGATE_CACHE_TTL", "60"))
+    # After a failed refresh: serve the last snapshot (or the fallback) this long before retrying
+    AGGREGATE_CACHE_ERROR_TTL = float(os.getenv("AGGREGATE_CACHE_ERROR_TTL", "10"))
+
+    # KPI Engine
+    KPI_WINDOW_DAYS = int(os.getenv("KPI_WINDOW_DAYS", "30"))
+    KPI_USE_SUMMARY_TABLE = os.getenv("KPI_USE_SUMMARY_TABLE", "false").lower() == "true"
+
+    # Rollup tables (database/rollups.py): trend charts read these instead of raw rows
+    TREND_USE_ROLLUPS = os.getenv("TREND_USE_ROLLUPS", "true").lower() == "true"
+    ROLLUP_REFRESH_INTERVAL = float(os.getenv("ROLLUP_REFRESH_INTERVAL", "30"))  # seconds between refreshes
+    ROLLUP_LOCK_TIMEOUT = int(os.getenv("ROLLUP_LOCK_TIMEOUT", "60"))  # backfill waits this long for a running refresh
+    # Days before the last rolled-up period that a refresh re-aggregates (late-arriving rows)
+    ROLLUP_LOOKBACK_DAYS = int(os.getenv("ROLLUP_LOOKBACK_DAYS", "2"))
+
+    # Embedded analytics store (database/analytics_store.py): the kaggle_data history, queried in-process
+    ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "true").lower() == "true"
+    ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "auto").lower()  # auto (DuckDB if installed), duckdb, sqlite
+    ANALYTICS_DATA_DIR = os.getenv("ANALYTICS_DATA_DIR", "../mysql/kaggle_data")
+    # Prebuilt store file (scripts/build_analytics_store.py); empty or missing = load the CSVs in memory
+    ANALYTICS_DB_PATH = os.getenv("ANALYTICS_DB_PATH", "")
+    CSV_BATCH_ROWS = int(os.getenv("CSV_BATCH_ROWS", "5000"))
+
+    # Equipment availability engine (database/availability_engine.py), cached per date window
+    AVAILABILITY_WINDOW_DAYS = int(os.getenv("AVAILABILITY_WINDOW_DAYS", "30"))
+    AVAILABILITY_CACHE_TTL = float(os.getenv("AVAILABILITY_CACHE_TTL", "300"))
+    AVAILABILITY_CACHE_WINDOWS = int(os.getenv("AVAILABILITY_CACHE_WINDOWS", "64"))
+
     # ChromaDB Local Storage
     CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./chroma_data")
 
@@ -29,6 +80,9 @@ class Config:
     OLLAMA_HOST = os.getenv("OLLAMA_HOST", "localhost")
     OLLAMA_PORT = os.getenv("OLLAMA_PORT", "11434")
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "3"))
+    OLLAMA_READ_TIMEOUT = float(os.getenv("OLLAMA_READ_TIMEOUT", "60"))
 
     # API Keys
     MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "")
@@ -36,9 +90,67 @@ class Config:
 
     # Model Settings
     EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+    INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "5000"))
+
+    # Knowledge Base Sync (MySQL -> ChromaDB)
+    KB_SYNC_STATE_PATH = os.getenv("KB_SYNC_STATE_PATH", "./chroma_data/kb_sync_state.json")
+    KB_SYNC_BATCH_ROWS = int(os.getenv("KB_SYNC_BATCH_ROWS", "1000"))
+    # Seconds between scans for deleted rows (primary keys vs vector ids); 0 = only with --full
+    KB_SYNC_RECONCILE_INTERVAL = int(os.getenv("KB_SYNC_RECONCILE_INTERVAL", "86400"))
+    KB_SYNC_INTERVAL = int(os.getenv("KB_SYNC_INTERVAL", "300"))
     CHUNK_SIZE = 1000
     CHUNK_OVERLAP = 200
 
     # RAG Settings
     TOP_K_RESULTS = 5
+    VECTOR_SCOPE_MIN_RESULTS = int(os.getenv("VECTOR_SCOPE_MIN_RESULTS", "3"))
+
+    # LLM Gateway (per process): concurrent upstream calls, queueing and retries
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "20"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+    # LLM Router: backends in order of preference, demoted when slow or failing
+    LLM_BACKENDS = [name.strip() for name in os.getenv("LLM_BACKENDS", "mistral,ollama").split(",") if name.strip()]
+    LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "50"))
+    LLM_LATENCY_MIN_SAMPLES = int(os.getenv("LLM_LATENCY_MIN_SAMPLES", "5"))
+    LLM_LATENCY_MAX_AGE = float(os.getenv("LLM_LATENCY_MAX_AGE", "300"))  # seconds a latency sample counts
+    LLM_PROBE_EVERY = int(os.getenv("LLM_PROBE_EVERY", "20"))  # every Nth call tries a slow preferred backend (0 = never)
+    LLM_LATENCY_SLO = float(os.getenv("LLM_LATENCY_SLO", "8"))          # p95 seconds per full answer
+    LLM_FIRST_TOKEN_SLO = float(os.getenv("LLM_FIRST_TOKEN_SLO", "3"))  # p95 seconds to first streamed token
+    LLM_FAILURE_THRESHOLD = int(os.getenv("LLM_FAILURE_THRESHOLD", "3"))
+    LLM_COOLDOWN = float(os.getenv("LLM_COOLDOWN", "30"))
+    LLM_HEALTH_CHECK_TTL = float(os.getenv("LLM_HEALTH_CHECK_TTL", "30"))  # seconds a check_health() result is reused
+
+    # Intent Router (cosine similarity to intent prototypes, see models/intent_router.py)
+    INTENT_THRESHOLD = float(os.getenv("INTENT_THRESHOLD", "0.35"))
+    INTENT_MARGIN = float(os.getenv("INTENT_MARGIN", "0.15"))
+    INTENT_MAX_INTENTS = int(os.getenv("INTENT_MAX_INTENTS", "3"))
+    INTENT_KEYWORD_BOOST = float(os.getenv("INTENT_KEYWORD_BOOST", "0.25"))
+    INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "2048"))
     MAX_RESPONSE = 1024  # ✅ fixed (set a sensible default response limit)
+
+    # Query Pipeline (independent stages run in parallel, budgets in seconds)
+    RAG_MAX_WORKERS = int(os.getenv("RAG_MAX_WORKERS", "8"))
+    RAG_RETRIEVAL_TIMEOUT = float(os.getenv("RAG_RETRIEVAL_TIMEOUT", "3.0"))
+    RAG_SQL_TIMEOUT = float(os.getenv("RAG_SQL_TIMEOUT", "3.0"))
+    RAG_VISUALIZATION_TIMEOUT = float(os.getenv("RAG_VISUALIZATION_TIMEOUT", "5.0"))
+
+    # LLM Context Assembly (dedup + ranked packing into a token budget, see models/context_assembler.py)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+    CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.85"))  # token-set Jaccard
+    CONTEXT_ROW_DECAY = float(os.getenv("CONTEXT_ROW_DECAY", "0.85"))  # relevance decay per SQL row position
+    CONTEXT_MAX_FIELD_CHARS = int(os.getenv("CONTEXT_MAX_FIELD_CHARS", "120"))
+    CONTEXT_CHARS_PER_TOKEN = float(os.getenv("CONTEXT_CHARS_PER_TOKEN", "3.5"))
+
+    # Chat data tables (routed SQL results): sent whole with the answer, paged by the client
+    TABLE_PAGE_SIZE = int(os.getenv("TABLE_PAGE_SIZE", "10"))
+    TABLE_MAX_ROWS = int(os.getenv("TABLE_MAX_ROWS", "500"))
+
+    # Semantic Answer Cache (reuse answers for similar questions over unchanged data)
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.92"))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
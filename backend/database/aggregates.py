@@ -0,0 +1,245 @@
+# backend/database/aggregates.py
+# KPIs and trend charts shared by the dashboard endpoints and the chat (RAG) pipeline
+from database.analytics_store import analytics_store
+from database.db_config import get_mysql_connection
+from database.kpi_engine import kpi_engine
+from database.query_result import empty_series, fetch_result
+from database.rollups import rollup_manager
+from utils.snapshot_cache import SnapshotCache
+from config import Config
+import asyncio
+import copy
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMPTY_KPIS = {
+    "total_incidents": 0,
+    "critical_alerts": 0,
+    "avg_efficiency": 0,
+    "monthly_production": 0
+}
+
+# One snapshot per aggregate; shared by /api/kpis and every chat question
+aggregate_cache = SnapshotCache(default_ttl=Config.AGGREGATE_CACHE_TTL, error_ttl=Config.AGGREGATE_CACHE_ERROR_TTL)
+
+
+def _compute_kpis():
+    """Calculate KPIs (single round trip, see database/kpi_engine.py)"""
+    conn = get_mysql_connection()
+    try:
+        return kpi_engine.compute(conn)
+    finally:
+        conn.close()
+
+
+# Trend charts from the rollup tables: a few dozen rows whatever the history length.
+# Month windows are computed in SQL (no parameters, so DATE_FORMAT's % needs no escaping).
+INCIDENTS_TREND_ROLLUP = """
+    SELECT
+        DATE_FORMAT(month, '%Y-%m') as month,
+        severity,
+        incident_count as count
+    FROM incidents_monthly_rollup
+    WHERE month >= DATE_SUB(DATE_FORMAT(CURDATE(), '%Y-%m-01'), INTERVAL 12 MONTH)
+    ORDER BY month ASC
+"""
+
+PRODUCTION_TREND_ROLLUP = """
+    SELECT
+        DATE_FORMAT(month, '%Y-%m') as month,
+        total_tons as production,
+        efficiency_sum / NULLIF(efficiency_count, 0) as efficiency
+    FROM production_monthly_rollup
+    WHERE month >= DATE_SUB(DATE_FORMAT(CURDATE(), '%Y-%m-01'), INTERVAL 12 MONTH)
+    ORDER BY month ASC
+"""
+
+EFFICIENCY_TREND_ROLLUP = """
+    SELECT
+        DATE_FORMAT(month, '%Y-%m') as month,
+        efficiency_sum / NULLIF(efficiency_count, 0) as avg_efficiency
+    FROM production_monthly_rollup
+    WHERE month >= DATE_SUB(DATE_FORMAT(CURDATE(), '%Y-%m-01'), INTERVAL 6 MONTH)
+    ORDER BY month ASC
+"""
+
+EQUIPMENT_STATUS_QUERY = """
+    SELECT status, COUNT(*) as count
+    FROM equipment_monitoring
+    GROUP BY status
+"""
+
+KNOWN_SITES_QUERY = """
+    SELECT DISTINCT site_name FROM production_metrics
+    UNION
+    SELECT DISTINCT mine_name FROM mining_incidents
+"""
+
+# Same charts straight from the raw rows (TREND_USE_ROLLUPS=false)
+INCIDENTS_TREND_RAW = """
+    SELECT
+        DATE_FORMAT(incident_date, '%Y-%m') as month,
+        severity,
+        COUNT(*) as count
+    FROM mining_incidents
+    WHERE incident_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
+    GROUP BY month, severity
+    ORDER BY month ASC
+"""
+
+PRODUCTION_TREND_RAW = """
+    SELECT
+        DATE_FORMAT(metric_date, '%Y-%m') as month,
+        SUM(quantity_tons) as production,
+        AVG(efficiency_percentage) as efficiency
+    FROM production_metrics
+    WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
+    GROUP BY month
+    ORDER BY month ASC
+"""
+
+EFFICIENCY_TREND_RAW = """
+    SELECT
+        DATE_FORMAT(metric_date, '%Y-%m') as month,
+        AVG(efficiency_percentage) as avg_efficiency
+    FROM production_metrics
+    WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)
+    GROUP BY month
+    ORDER BY month ASC
+"""
+
+
+def _read_result(name, query, rollups=()):
+    """Typed rows straight from the cursor (no DataFrame); ``rollups`` are brought up to date first"""
+    conn = get_mysql_connection()
+    try:
+        if rollups:
+            rollup_manager.ensure_fresh(conn, list(rollups))
+        return fetch_result(conn, name, query)
+    finally:
+        conn.close()
+
+
+def _read_trend(name, rollup_query, raw_query, rollups):
+    if Config.TREND_USE_ROLLUPS:
+        return _read_result(name, rollup_query, rollups)
+    return _read_result(name, raw_query)
+
+
+def _compute_incidents_trend():
+    """Get incident trend data: monthly counts, one series per severity"""
+    return _read_trend(
+        "incidents_trend", INCIDENTS_TREND_ROLLUP, INCIDENTS_TREND_RAW, ["incidents_monthly"]
+    ).pivot("month", "severity", "count")
+
+
+def _compute_equipment_status():
+    """Get equipment status distribution"""
+    return _read_result("equipment_status", EQUIPMENT_STATUS_QUERY).series("status")
+
+
+def _compute_production_trend():
+    """Get production trend"""
+    return _read_trend(
+        "production_trend", PRODUCTION_TREND_ROLLUP, PRODUCTION_TREND_RAW, ["production_monthly"]
+    ).series("month")
+
+
+def _compute_efficiency_trend():
+    """Get efficiency trend data"""
+    return _read_trend(
+        "efficiency_trend", EFFICIENCY_TREND_ROLLUP, EFFICIENCY_TREND_RAW, ["production_monthly"]
+    ).series("month")
+
+
+def _compute_known_sites():
+    """Lower-cased site/mine names, used to scope vector searches to a site"""
+    conn = get_mysql_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(KNOWN_SITES_QUERY)
+        sites = sorted({row[0].strip().lower() for row in cursor.fetchall() if row[0]})
+        cursor.close()
+        return sites
+    finally:
+        conn.close()
+
+
+# name -> (loader, fallback returned when the database is unavailable, see also ANALYTICS_FALLBACKS)
+# Charts are columnar {"labels", "series"} payloads (see database/query_result.py)
+AGGREGATES = {
+    "kpis": (_compute_kpis, EMPTY_KPIS),
+    "incidents_trend": (_compute_incidents_trend, empty_series()),
+    "equipment_status": (_compute_equipment_status, empty_series()),
+    "production_trend": (_compute_production_trend, empty_series()),
+    "efficiency_trend": (_compute_efficiency_trend, empty_series()),
+    "known_sites": (_compute_known_sites, []),
+}
+
+
+# Charts the embedded analytics store (kaggle_data history) can serve while MySQL is unavailable
+ANALYTICS_FALLBACKS = {
+    "equipment_status": lambda: analytics_store.equipment_status().series("status"),
+    "production_trend": lambda: analytics_store.production_trend().series("month"),
+}
+
+
+def _fallback(name):
+    if Config.ANALYTICS_ENABLED and name in ANALYTICS_FALLBACKS:
+        try:
+            return ANALYTICS_FALLBACKS[name]()
+        except Exception as e:
+            logger.error(f"❌ Analytics fallback for '{name}' failed: {e}")
+    return copy.deepcopy(AGGREGATES[name][1])
+
+
+def get_aggregate(name):
+    """Return ``(value, cache_age_seconds)``; age is None when the fallback is served"""
+    loader, _ = AGGREGATES[name]
+    try:
+        return aggregate_cache.get(name, loader)
+    except Exception as e:
+        logger.error(f"❌ Aggregate '{name}' failed: {e}")
+        return _fallback(name), None
+
+
+async def aget_aggregate(name):
+    """Async get_aggregate(): fresh snapshots are served from memory on the event loop,
+    a refresh runs the (single-flight) loader in a worker thread"""
+    snapshot = aggregate_cache.peek(name)
+    if snapshot is not None:
+        return snapshot
+    return await asyncio.to_thread(get_aggregate, name)
+
+
+def get_kpis():
+    return get_aggregate("kpis")
+
+
+async def aget_kpis():
+    return await aget_aggregate("kpis")
+
+
+def get_incidents_trend():
+    return get_aggregate("incidents_trend")
+
+
+def get_equipment_status():
+    return get_aggregate("equipment_status")
+
+
+def get_production_trend():
+    return get_aggregate("production_trend")
+
+
+def get_efficiency_trend():
+    return get_aggregate("efficiency_trend")
+
+
+def invalidate_aggregates(*names):
+    """Invalidation hook: drop the named snapshots (all of them without arguments)"""
+    unknown = [name for name in names if name not in AGGREGATES]
+    if unknown:
+        raise KeyError(f"Unknown aggregate(s): {', '.join(unknown)}")
+    aggregate_cache.invalidate(*names)
@@ -0,0 +1,367 @@
+# backend/database/analytics_store.py
+# Embedded, in-process analytics over the kaggle_data history (DuckDB when installed, SQLite otherwise).
+# Serves read-only aggregates to the dashboards and the RAG pipeline, including while MySQL is down.
+from database.mining_csv import DATASETS, dataset_path, iter_batches
+from database.query_result import QueryResult
+from config import Config
+from datetime import date, datetime, time
+import csv
+import importlib.util
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time as clock
+
+logger = logging.getLogger(__name__)
+
+# Column types understood by both engines (SQLite maps them to its affinities)
+TABLES = {
+    "equipment_status": """
+        CREATE TABLE IF NOT EXISTS equipment_status (
+            id VARCHAR PRIMARY KEY,
+            equipment_name VARCHAR,
+            status VARCHAR,
+            date DATE,
+            start_time TIME,
+            end_time TIME,
+            duration_minutes INTEGER,
+            alert VARCHAR,
+            reason VARCHAR,
+            issue VARCHAR,
+            comment VARCHAR,
+            created_at TIMESTAMP
+        )
+    """,
+    "shift_production": """
+        CREATE TABLE IF NOT EXISTS shift_production (
+            date DATE,
+            shift VARCHAR,
+            excavator INTEGER,
+            dumper INTEGER,
+            trips_mining INTEGER,
+            trips_reclaim INTEGER,
+            total_trips INTEGER,
+            qty_m3 DOUBLE,
+            grader INTEGER,
+            dozer INTEGER,
+            PRIMARY KEY (date, shift)
+        )
+    """,
+    "trip_details": """
+        CREATE TABLE IF NOT EXISTS trip_details (
+            date DATE,
+            source VARCHAR,
+            destination VARCHAR,
+            specification VARCHAR,
+            asset_name VARCHAR,
+            operator VARCHAR,
+            production DOUBLE,
+            total INTEGER
+        )
+    """,
+}
+
+# Aggregates below stick to SQL both engines run identically (no date functions:
+# months are the first 7 characters of the ISO date).
+
+# One row per equipment: latest status plus uptime over all logged minutes
+EQUIPMENT_SUMMARY_QUERY = """
+    WITH latest AS (
+        SELECT
+            equipment_name, status, alert, reason, date,
+            ROW_NUMBER() OVER (PARTITION BY equipment_name ORDER BY date DESC, start_time DESC) AS position
+        FROM equipment_status
+    ),
+    totals AS (
+        SELECT
+            equipment_name,
+            COUNT(*) AS log_entries,
+            SUM(CASE WHEN alert = 'Yes' THEN 1 ELSE 0 END) AS alert_count,
+            SUM(CASE WHEN status = 'ACTIVE' THEN duration_minutes ELSE 0 END) AS active_minutes,
+            SUM(duration_minutes) AS logged_minutes
+        FROM equipment_status
+        GROUP BY equipment_name
+    )
+    SELECT
+        t.equipment_name AS equipment_id,
+        CASE l.status WHEN 'ACTIVE' THEN 'Operational' ELSE 'Offline' END AS status,
+        ROUND(100.0 * t.active_minutes / NULLIF(t.logged_minutes, 0), 1) AS uptime_pct,
+        CASE WHEN l.alert = 'Yes' THEN COALESCE(l.reason, 'Alert raised') ELSE 'None' END AS alerts,
+        t.alert_count,
+        t.log_entries,
+        l.date AS last_seen
+    FROM totals t
+    JOIN latest l ON l.equipment_name = t.equipment_name AND l.position = 1
+"""
+
+EQUIPMENT_QUERY = f"""
+    SELECT * FROM ({EQUIPMENT_SUMMARY_QUERY}) summary
+    ORDER BY uptime_pct DESC
+    LIMIT ?
+"""
+
+MAINTENANCE_ALERTS_QUERY = f"""
+    SELECT * FROM ({EQUIPMENT_SUMMARY_QUERY}) summary
+    WHERE status != 'Operational' OR uptime_pct < 80
+    ORDER BY uptime_pct ASC
+    LIMIT ?
+"""
+
+EQUIPMENT_STATUS_QUERY = f"""
+    SELECT status, COUNT(*) as count
+    FROM ({EQUIPMENT_SUMMARY_QUERY}) summary
+    GROUP BY status
+    ORDER BY status
+"""
+
+ALERT_LOG_QUERY = """
+    SELECT date, start_time, equipment_name, status, duration_minutes, reason, issue
+    FROM equipment_status
+    WHERE alert = 'Yes'
+    ORDER BY date DESC, start_time DESC
+    LIMIT ?
+"""
+
+# Same as database/availability_engine.py's INTERVALS_QUERY (qmark parameters)
+EQUIPMENT_INTERVALS_QUERY = """
+    SELECT equipment_name, status, duration_minutes, alert
+    FROM equipment_status
+    WHERE date >= ? AND date < ?
+    ORDER BY date, start_time
+"""
+
+LATEST_LOG_DATE_QUERY = "SELECT MAX(date) FROM equipment_status"
+
+# Shift rows only: the file's "Total" shift repeats their sum
+DAILY_PRODUCTION_QUERY = """
+    SELECT
+        date as metric_date,
+        SUM(qty_m3) as quantity_m3,
+        SUM(total_trips) as total_trips,
+        SUM(trips_mining) as trips_mining,
+        SUM(trips_reclaim) as trips_reclaim
+    FROM shift_production
+    WHERE shift != 'Total'
+    GROUP BY date
+    ORDER BY date DESC
+    LIMIT ?
+"""
+
+PRODUCTION_TREND_QUERY = """
+    SELECT
+        SUBSTR(CAST(date AS VARCHAR), 1, 7) as month,
+        SUM(qty_m3) as production,
+        SUM(total_trips) as trips
+    FROM shift_production
+    WHERE shift != 'Total'
+    GROUP BY 1
+    ORDER BY 1 ASC
+"""
+
+TRIP_SUMMARY_QUERY = """
+    SELECT
+        source, destination, asset_name,
+        SUM(total) as trips,
+        SUM(production) as production,
+        MAX(date) as last_trip
+    FROM trip_details
+    GROUP BY source, destination, asset_name
+    ORDER BY production DESC
+    LIMIT ?
+"""
+
+# RAG route -> aggregates answering it (see SQL_TEMPLATES in models/rag_engine.py)
+ROUTE_QUERIES = {
+    "equipment": [("equipment", MAINTENANCE_ALERTS_QUERY)],
+    "maintenance_history": [("maintenance_history", ALERT_LOG_QUERY)],
+    "production": [("production", DAILY_PRODUCTION_QUERY), ("trip_details", TRIP_SUMMARY_QUERY)],
+    "mixed": [("equipment", MAINTENANCE_ALERTS_QUERY), ("production", DAILY_PRODUCTION_QUERY)],
+}
+ROUTE_ROW_LIMIT = 8
+
+
+def resolve_engine(requested):
+    """``auto`` picks DuckDB when installed; a missing DuckDB falls back to SQLite"""
+    requested = (requested or "auto").lower()
+    # Optional columnar engine, imported on first connect so importing the store stays cheap
+    if requested in ("auto", "duckdb") and importlib.util.find_spec("duckdb") is not None:
+        return "duckdb"
+    if requested == "duckdb":
+        logger.warning("⚠️ ANALYTICS_ENGINE=duckdb but duckdb is not installed, using SQLite")
+    return "sqlite"
+
+
+def sqlite_value(value):
+    """SQLite has no date/time types: store them as ISO text (sortable, same as DuckDB's casts)"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+class AnalyticsStore:
+    """Read-only analytics over the kaggle_data history, in this process
+
+    The store is either loaded from the CSVs in ANALYTICS_DATA_DIR (through
+    the shared parsers in database/mining_csv.py) into an in-memory database,
+    or opened read-only from a file prebuilt by scripts/build_analytics_store.py
+    (ANALYTICS_DB_PATH). Loading happens once per worker process, on first use
+    or from the startup warm-up; queries are serialized on one connection.
+    """
+
+    def __init__(self, engine=None, data_dir=None, db_path=None):
+        self.engine = resolve_engine(engine or Config.ANALYTICS_ENGINE)
+        self.data_dir = data_dir or Config.ANALYTICS_DATA_DIR
+        self.db_path = db_path if db_path is not None else Config.ANALYTICS_DB_PATH
+        self._conn = None
+        self._pid = None
+        self._rows = {}
+        self._load_seconds = None
+        self._lock = threading.Lock()
+
+    # Loading
+
+    def connect(self, path=None, read_only=False):
+        if self.engine == "duckdb":
+            import duckdb
+            return duckdb.connect(path or ":memory:", read_only=read_only)
+        if path and read_only:
+            return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        return sqlite3.connect(path or ":memory:", check_same_thread=False)
+
+    def ensure_loaded(self):
+        """Connection of this process, loading the store on first use (and again after a fork)"""
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        with self._lock:
+            if self._conn is None or self._pid != os.getpid():
+                started = clock.monotonic()
+                if self.db_path and os.path.exists(self.db_path):
+                    conn = self.connect(self.db_path, read_only=True)
+                    self._rows = self._count_rows(conn)
+                    source = self.db_path
+                else:
+                    conn = self.connect()
+                    self._rows = self.load(conn)
+                    source = self.data_dir
+                self._conn, self._pid = conn, os.getpid()
+                self._load_seconds = round(clock.monotonic() - started, 2)
+                logger.info(
+                    f"✅ Analytics store ready ({self.engine}, {source}): "
+                    f"{self._rows} rows in {self._load_seconds}s"
+                )
+        return self._conn
+
+    def load(self, conn):
+        """Create the tables on ``conn`` and load every CSV found in data_dir; returns {table: rows}"""
+        loaded = {}
+        for name, (_, parser, columns) in DATASETS.items():
+            conn.execute(TABLES[name])
+            path = dataset_path(self.data_dir, name)
+            if not os.path.exists(path):
+                logger.warning(f"⚠️ Analytics store: {path} not found, '{name}' stays empty")
+                loaded[name] = 0
+                continue
+            if self.engine == "duckdb":
+                loaded[name] = self._copy_rows(conn, name, columns, parser(path))
+            else:
+                loaded[name] = self._insert_rows(conn, name, columns, parser(path))
+        return loaded
+
+    def build(self, path):
+        """Load the CSVs into a new database file at ``path`` (see ANALYTICS_DB_PATH)"""
+        conn = self.connect(path)
+        try:
+            return self.load(conn)
+        finally:
+            conn.close()
+
+    def _insert_rows(self, conn, table, columns, rows):
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+        count = 0
+        for batch in iter_batches(rows, Config.CSV_BATCH_ROWS):
+            conn.executemany(sql, [tuple(sqlite_value(value) for value in row) for row in batch])
+            count += len(batch)
+        conn.commit()
+        return count
+
+    def _copy_rows(self, conn, table, columns, rows):
+        """DuckDB bulk path: parsed rows go through a temporary CSV into one COPY
+        (row-by-row executemany is slow in DuckDB)"""
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False)
+        try:
+            count = 0
+            with handle:
+                writer = csv.writer(handle)
+                for row in rows:
+                    writer.writerow(["" if value is None else value for value in row])
+                    count += 1
+            conn.execute(
+                f"COPY {table} ({', '.join(columns)}) FROM '{handle.name}' (HEADER false, NULL '')"
+            )
+            return count
+        finally:
+            os.unlink(handle.name)
+
+    def _count_rows(self, conn):
+        return {name: conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] for name in TABLES}
+
+    # Queries
+
+    def query(self, name, sql, params=()):
+        """Run a read-only aggregate and return its QueryResult"""
+        conn = self.ensure_loaded()
+        with self._lock:
+            cursor = conn.execute(sql, params)
+            return QueryResult.from_cursor(name, cursor, cursor.fetchall())
+
+    def equipment(self, limit=50):
+        return self.query("equipment", EQUIPMENT_QUERY, (limit,))
+
+    def maintenance_alerts(self, limit=20):
+        return self.query("maintenance_alerts", MAINTENANCE_ALERTS_QUERY, (limit,))
+
+    def equipment_status(self):
+        return self.query("equipment_status", EQUIPMENT_STATUS_QUERY)
+
+    def daily_production(self, limit=50):
+        return self.query("production", DAILY_PRODUCTION_QUERY, (limit,))
+
+    def production_trend(self):
+        return self.query("production_trend", PRODUCTION_TREND_QUERY)
+
+    def trip_summary(self, limit=20):
+        return self.query("trip_details", TRIP_SUMMARY_QUERY, (limit,))
+
+    def equipment_intervals(self, start, end):
+        """Status log rows dated in [start, end), in time order"""
+        return self.query("equipment_intervals", EQUIPMENT_INTERVALS_QUERY, (sqlite_value(start), sqlite_value(end)))
+
+    def latest_log_date(self):
+        latest = self.query("latest_log_date", LATEST_LOG_DATE_QUERY).rows[0][0]
+        return date.fromisoformat(latest) if isinstance(latest, str) else latest
+
+    def route_results(self, routes):
+        """QueryResults for the RAG routes this store can answer (others are skipped)"""
+        results, seen = [], set()
+        for route in routes:
+            for name, sql in ROUTE_QUERIES.get(route, []):
+                if name not in seen:
+                    seen.add(name)
+                    results.append(self.query(name, sql, (ROUTE_ROW_LIMIT,)))
+        return results
+
+    def stats(self):
+        return {
+            "engine": self.engine,
+            "loaded": self._conn is not None and self._pid == os.getpid(),
+            "rows": self._rows,
+            "load_seconds": self._load_seconds,
+        }
+
+
+analytics_store = AnalyticsStore()
@@ -0,0 +1,86 @@
+# backend/database/async_db.py
+# aiomysql pool for the async serving mode (asgi.py); the sync pool lives in db_config.py
+from contextlib import asynccontextmanager
+from config import Config
+import aiomysql
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# One pool per event loop (each uvicorn worker runs its own loop)
+_pools = {}
+
+
+async def get_async_pool():
+    """Return this event loop's aiomysql pool, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = await aiomysql.create_pool(
+            host=Config.MYSQL_HOST,
+            port=Config.MYSQL_PORT,
+            user=Config.MYSQL_USER,
+            password=Config.MYSQL_PASSWORD,
+            db=Config.MYSQL_DB,
+            minsize=1,
+            maxsize=Config.MYSQL_ASYNC_POOL_SIZE,
+            pool_recycle=int(Config.MYSQL_POOL_RECYCLE),
+            autocommit=True
+        )
+        # Another coroutine may have created one while we were connecting
+        if loop in _pools:
+            pool.close()
+            await pool.wait_closed()
+        else:
+            _pools[loop] = pool
+            logger.info(f"✅ Async MySQL pool ready (max {Config.MYSQL_ASYNC_POOL_SIZE} connections)")
+    return _pools[loop]
+
+
+@asynccontextmanager
+async def get_async_cursor():
+    """Dictionary cursor on a pooled connection, returned to the pool on exit"""
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            yield cursor
+
+
+async def fetch_all(query, params=None):
+    async with get_async_cursor() as cursor:
+        await cursor.execute(query, params)
+        return await cursor.fetchall()
+
+
+async def ping():
+    """True when the database answers on a pooled connection"""
+    try:
+        await fetch_all("SELECT 1")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Async MySQL ping failed: {e}")
+        return False
+
+
+def get_async_pool_metrics():
+    try:
+        pool = _pools.get(asyncio.get_running_loop())
+    except RuntimeError:
+        pool = None
+    if pool is None:
+        return None
+    return {
+        "size": pool.size,
+        "free": pool.freesize,
+        "max_size": pool.maxsize
+    }
+
+
+async def close_async_pool():
+    loop = asyncio.get_running_loop()
+    pool = _pools.pop(loop, None)
+    if pool is not None:
+        pool.close()
+        await pool.wait_closed()
+        logger.info("🔌 Async MySQL pool closed")
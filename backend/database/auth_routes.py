@@ -10,8 +10,23 @@ from datetime import datetime, timedelta
 import logging
 import re
 
-auth_bp = Blueprint('auth', _name_)
-logger = logging.getLogger(_name_)
+auth_bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
+
+# User lookups (EXPLAIN-checked by tests/test_query_plans.py)
+USER_EXISTS_QUERY = "SELECT user_id FROM users WHERE username = %s OR email = %s"
+
+LOGIN_QUERY = """
+    SELECT user_id, username, email, password_hash, full_name, role, is_active
+    FROM users
+    WHERE (username = %s OR email = %s) AND is_active = TRUE
+"""
+
+PROFILE_QUERY = """
+    SELECT user_id, username, email, full_name, role, created_at, last_login
+    FROM users
+    WHERE user_id = %s AND is_active = TRUE
+"""
 
 def validate_email(email):
     """Validate email format"""
@@ -30,10 +45,16 @@ def validate_password(password):
         return False, "Password must contain at least one number"
     return True, "Valid"
 
-def log_auth_action(user_id, action, success=True):
-    """Log authentication actions for security audit"""
+def log_auth_action(user_id, action, success=True, conn=None):
+    """Log authentication actions for security audit
+
+    Pass the caller's open connection to write the audit row on it (the
+    caller commits) instead of checking out a second pooled connection.
+    """
+    owns_conn = conn is None
     try:
-        conn = get_mysql_connection()
+        if owns_conn:
+            conn = get_mysql_connection()
         cursor = conn.cursor()
         ip_address = request.remote_addr
         user_agent = request.headers.get('User-Agent', '')
@@ -43,11 +64,14 @@ def log_auth_action(user_id, action, success=True):
             VALUES (%s, %s, %s, %s, %s)
         """, (user_id, action, ip_address, user_agent, success))
         
-        conn.commit()
         cursor.close()
-        conn.close()
+        if owns_conn:
+            conn.commit()
     except Exception as e:
         logger.error(f"Failed to log auth action: {e}")
+    finally:
+        if owns_conn and conn is not None:
+            conn.close()
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -86,36 +110,34 @@ def register():
             }), 400
         
         # Check if user exists
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("SELECT user_id FROM users WHERE username = %s OR email = %s", 
-                      (username, email))
-        existing_user = cursor.fetchone()
-        
-        if existing_user:
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute(USER_EXISTS_QUERY, (username, email))
+            existing_user = cursor.fetchone()
+
+            if existing_user:
+                cursor.close()
+                return jsonify({
+                    'success': False,
+                    'error': 'Username or email already exists'
+                }), 409
+
+            # Create new user
+            password_hash = User.hash_password(password)
+
+            cursor.execute("""
+                INSERT INTO users (username, email, password_hash, full_name, role)
+                VALUES (%s, %s, %s, %s, 'user')
+            """, (username, email, password_hash, full_name))
+
+            user_id = cursor.lastrowid
+
+            # Log registration
+            log_auth_action(user_id, 'REGISTER', True, conn=conn)
+
+            conn.commit()
             cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'error': 'Username or email already exists'
-            }), 409
-        
-        # Create new user
-        password_hash = User.hash_password(password)
-        
-        cursor.execute("""
-            INSERT INTO users (username, email, password_hash, full_name, role)
-            VALUES (%s, %s, %s, %s, 'user')
-        """, (username, email, password_hash, full_name))
-        
-        user_id = cursor.lastrowid
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        # Log registration
-        log_auth_action(user_id, 'REGISTER', True)
         
         logger.info(f"New user registered: {username}")
         
@@ -152,43 +174,42 @@ def login():
             }), 400
         
         # Find user
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT user_id, username, email, password_hash, full_name, role, is_active
-            FROM users 
-            WHERE (username = %s OR email = %s) AND is_active = TRUE
-        """, (username_or_email, username_or_email))
-        
-        user_data = cursor.fetchone()
-        
-        if not user_data:
-            log_auth_action(None, 'LOGIN_FAILED', False)
-            cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'error': 'Invalid credentials'
-            }), 401
-        
-        # Verify password
-        if not User.verify_password(user_data['password_hash'], password):
-            log_auth_action(user_data['user_id'], 'LOGIN_FAILED', False)
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute(LOGIN_QUERY, (username_or_email, username_or_email))
+
+            user_data = cursor.fetchone()
+
+            if not user_data:
+                log_auth_action(None, 'LOGIN_FAILED', False, conn=conn)
+                conn.commit()
+                cursor.close()
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid credentials'
+                }), 401
+
+            # Verify password
+            if not User.verify_password(user_data['password_hash'], password):
+                log_auth_action(user_data['user_id'], 'LOGIN_FAILED', False, conn=conn)
+                conn.commit()
+                cursor.close()
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid credentials'
+                }), 401
+
+            # Update last login
+            cursor.execute("""
+                UPDATE users SET last_login = NOW() WHERE user_id = %s
+            """, (user_data['user_id'],))
+
+            # Log successful login
+            log_auth_action(user_data['user_id'], 'LOGIN', True, conn=conn)
+
+            conn.commit()
             cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'error': 'Invalid credentials'
-            }), 401
-        
-        # Update last login
-        cursor.execute("""
-            UPDATE users SET last_login = NOW() WHERE user_id = %s
-        """, (user_data['user_id'],))
-        conn.commit()
-        cursor.close()
-        conn.close()
         
         # Create JWT tokens
         access_token = create_access_token(
@@ -201,9 +222,6 @@ def login():
         
         refresh_token = create_refresh_token(identity=user_data['user_id'])
         
-        # Log successful login
-        log_auth_action(user_data['user_id'], 'LOGIN', True)
-        
         logger.info(f"User logged in: {user_data['username']}")
         
         return jsonify({
@@ -235,16 +253,13 @@ def refresh():
         user_id = get_jwt_identity()
         
         # Get user info
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT username, role FROM users WHERE user_id = %s AND is_active = TRUE
-        """, (user_id,))
-        
-        user_data = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT username, role FROM users WHERE user_id = %s AND is_active = TRUE
+            """, (user_id,))
+            user_data = cursor.fetchone()
+            cursor.close()
         
         if not user_data:
             return jsonify({
@@ -280,18 +295,11 @@ def get_current_user():
     try:
         user_id = get_jwt_identity()
         
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT user_id, username, email, full_name, role, created_at, last_login
-            FROM users 
-            WHERE user_id = %s AND is_active = TRUE
-        """, (user_id,))
-        
-        user_data = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(PROFILE_QUERY, (user_id,))
+            user_data = cursor.fetchone()
+            cursor.close()
         
         if not user_data:
             return jsonify({
@@ -357,35 +365,33 @@ def change_password():
             }), 400
         
         # Verify current password
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT password_hash FROM users WHERE user_id = %s
-        """, (user_id,))
-        
-        user_data = cursor.fetchone()
-        
-        if not user_data or not User.verify_password(user_data['password_hash'], current_password):
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+
+            cursor.execute("""
+                SELECT password_hash FROM users WHERE user_id = %s
+            """, (user_id,))
+
+            user_data = cursor.fetchone()
+
+            if not user_data or not User.verify_password(user_data['password_hash'], current_password):
+                cursor.close()
+                return jsonify({
+                    'success': False,
+                    'error': 'Current password is incorrect'
+                }), 401
+
+            # Update password
+            new_password_hash = User.hash_password(new_password)
+
+            cursor.execute("""
+                UPDATE users SET password_hash = %s WHERE user_id = %s
+            """, (new_password_hash, user_id))
+
+            log_auth_action(user_id, 'PASSWORD_CHANGE', True, conn=conn)
+
+            conn.commit()
             cursor.close()
-            conn.close()
-            return jsonify({
-                'success': False,
-                'error': 'Current password is incorrect'
-            }), 401
-        
-        # Update password
-        new_password_hash = User.hash_password(new_password)
-        
-        cursor.execute("""
-            UPDATE users SET password_hash = %s WHERE user_id = %s
-        """, (new_password_hash, user_id))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        log_auth_action(user_id, 'PASSWORD_CHANGE', True)
         
         return jsonify({
             'success': True,
@@ -0,0 +1,211 @@
+# backend/database/availability_engine.py
+# Per-equipment availability (uptime, MTBF, MTTR, alert rate, longest outage) from the equipment_status logs
+from datetime import date, timedelta
+from database.analytics_store import analytics_store
+from database.db_config import get_mysql_connection
+from database.query_result import QueryResult, fetch_result
+from utils.snapshot_cache import SnapshotCache
+from config import Config
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Status intervals in time order; the engine groups them by equipment itself
+INTERVALS_QUERY = """
+    SELECT equipment_name, status, duration_minutes, alert
+    FROM equipment_status
+    WHERE date >= %(start)s AND date < %(end)s
+    ORDER BY date, start_time
+"""
+
+LATEST_LOG_DATE_QUERY = "SELECT MAX(date) FROM equipment_status"
+
+# Columns of the per-equipment table (API rows and the RAG "availability" result)
+AVAILABILITY_COLUMNS = [
+    "equipment", "uptime_pct", "mtbf_hours", "mttr_hours", "failures",
+    "alerts", "alert_rate_pct", "longest_outage_minutes", "logged_hours"
+]
+
+
+def ratio(numerator, denominator, scale=1.0):
+    """Element-wise numerator / denominator * scale, NaN where the denominator is 0"""
+    import numpy as np
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator * scale / np.where(denominator > 0, denominator, 1), np.nan)
+
+
+def metric(value, digits=2):
+    """JSON-safe rounded float (None for NaN: e.g. MTBF with no failures)"""
+    import numpy as np
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
+
+
+def empty_fleet():
+    """Fleet totals of a window with no intervals: same keys, nothing logged"""
+    return {
+        "equipment": 0, "uptime_pct": None, "mtbf_hours": None, "mttr_hours": None, "failures": 0,
+        "alerts": 0, "alert_rate_pct": None, "longest_outage_minutes": None, "logged_hours": 0.0,
+    }
+
+
+def summarize(names, statuses, minutes, alerts):
+    """Availability per equipment from status intervals in time order (no per-row Python)
+
+    A failure is the start of an outage: an INACTIVE interval that opens the
+    equipment's log or follows an ACTIVE one. Consecutive INACTIVE intervals
+    form one outage. MTBF = active time / failures, MTTR = inactive time /
+    failures.
+    """
+    # numpy is imported on first use, keeping it off the web-server import path
+    import numpy as np
+
+    if len(names) == 0:
+        return [], empty_fleet()
+    equipment, codes = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+    # Group each equipment's intervals together, keeping their time order
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    active = np.asarray(statuses, dtype=str)[order] == "ACTIVE"
+    minutes = np.nan_to_num(np.asarray(minutes, dtype=float)[order])
+    alerted = np.asarray(alerts, dtype=str)[order] == "Yes"
+    count = len(equipment)
+
+    logged = np.bincount(codes, weights=minutes, minlength=count)
+    up = np.bincount(codes, weights=minutes * active, minlength=count)
+    down = logged - up
+    entries = np.bincount(codes, minlength=count)
+    alert_counts = np.bincount(codes, weights=alerted, minlength=count)
+
+    first = np.r_[True, codes[1:] != codes[:-1]]
+    previous_active = np.r_[False, active[:-1]]
+    outage_start = ~active & (first | previous_active)
+    failures = np.bincount(codes, weights=outage_start, minlength=count)
+
+    # Outage lengths: inactive minutes summed per outage (run), then max per equipment
+    longest = np.zeros(count)
+    if outage_start.any():
+        run = np.cumsum(outage_start) - 1
+        inactive = ~active
+        run_minutes = np.bincount(run[inactive], weights=minutes[inactive], minlength=int(outage_start.sum()))
+        np.maximum.at(longest, codes[outage_start], run_minutes)
+
+    uptime = ratio(up, logged, 100.0)
+    mtbf = ratio(up, failures, 1 / 60)
+    mttr = ratio(down, failures, 1 / 60)
+    alert_rate = ratio(alert_counts, entries, 100.0)
+
+    rows = [
+        {
+            "equipment": str(equipment[i]),
+            "uptime_pct": metric(uptime[i]),
+            "mtbf_hours": metric(mtbf[i]),
+            "mttr_hours": metric(mttr[i]),
+            "failures": int(failures[i]),
+            "alerts": int(alert_counts[i]),
+            "alert_rate_pct": metric(alert_rate[i]),
+            "longest_outage_minutes": metric(longest[i], 1),
+            "logged_hours": metric(logged[i] / 60),
+        }
+        for i in np.argsort(uptime, kind="stable")  # least available first (NaN last)
+    ]
+
+    total_failures = failures.sum()
+    fleet = {
+        "equipment": count,
+        "uptime_pct": metric(ratio(up.sum(), logged.sum(), 100.0)),
+        "mtbf_hours": metric(ratio(up.sum(), total_failures, 1 / 60)),
+        "mttr_hours": metric(ratio(down.sum(), total_failures, 1 / 60)),
+        "failures": int(total_failures),
+        "alerts": int(alert_counts.sum()),
+        "alert_rate_pct": metric(ratio(alert_counts.sum(), entries.sum(), 100.0)),
+        "longest_outage_minutes": metric(longest.max(), 1),
+        "logged_hours": metric(logged.sum() / 60),
+    }
+    return rows, fleet
+
+
+class AvailabilityEngine:
+    """Availability reports over arbitrary date windows, cached per window
+
+    Intervals come from MySQL, or from the embedded analytics store when
+    MySQL is unavailable. A window defaults to the AVAILABILITY_WINDOW_DAYS
+    days up to the latest logged day (the history is not live telemetry).
+    """
+
+    def __init__(self, cache_ttl=None, max_windows=None):
+        self.cache = SnapshotCache(
+            default_ttl=cache_ttl or Config.AVAILABILITY_CACHE_TTL,
+            max_keys=max_windows or Config.AVAILABILITY_CACHE_WINDOWS
+        )
+
+    def get(self, start=None, end=None, days=None):
+        """Return ``(report, cache_age_seconds)`` for the window [start, end)"""
+        key = (start, end, days)
+        return self.cache.get(key, lambda: self.compute(start, end, days))
+
+    def compute(self, start=None, end=None, days=None):
+        started = time.perf_counter()
+        try:
+            source = "mysql"
+            start, end = self._window(start, end, days, self._mysql_latest_date)
+            intervals = self._mysql_intervals(start, end)
+        except Exception as e:
+            if not Config.ANALYTICS_ENABLED:
+                raise
+            logger.warning(f"⚠️ Availability from the analytics store, MySQL unavailable: {e}")
+            source = "analytics"
+            start, end = self._window(start, end, days, analytics_store.latest_log_date)
+            intervals = analytics_store.equipment_intervals(start, end)
+
+        rows, fleet = summarize(
+            intervals.column("equipment_name"), intervals.column("status"),
+            intervals.column("duration_minutes"), intervals.column("alert")
+        )
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"⏱️ Availability {start}..{end}: {len(intervals)} intervals, {len(rows)} equipment in {elapsed_ms}ms")
+        return {
+            "window": {"start": start.isoformat(), "end": end.isoformat()},
+            "source": source,
+            "intervals": len(intervals),
+            "fleet": fleet,
+            "equipment": rows,
+            "compute_ms": elapsed_ms
+        }
+
+    def result(self, report):
+        """The per-equipment rows as a QueryResult (RAG context, tables and charts)"""
+        return QueryResult(
+            "availability",
+            AVAILABILITY_COLUMNS,
+            [[row[column] for column in AVAILABILITY_COLUMNS] for row in report["equipment"]]
+        )
+
+    def _window(self, start, end, days, latest_date):
+        if end is None:
+            if start is not None and days:
+                end = start + timedelta(days=days)
+            else:
+                latest = latest_date()
+                end = (latest or date.today()) + timedelta(days=1)
+        if start is None:
+            start = end - timedelta(days=days or Config.AVAILABILITY_WINDOW_DAYS)
+        return start, end
+
+    def _mysql_latest_date(self):
+        conn = get_mysql_connection()
+        try:
+            return fetch_result(conn, "latest_log_date", LATEST_LOG_DATE_QUERY).rows[0][0]
+        finally:
+            conn.close()
+
+    def _mysql_intervals(self, start, end):
+        conn = get_mysql_connection()
+        try:
+            return fetch_result(conn, "equipment_intervals", INTERVALS_QUERY, {"start": start, "end": end})
+        finally:
+            conn.close()
+
+
+availability_engine = AvailabilityEngine()
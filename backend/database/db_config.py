@@ -1,29 +1,218 @@
 # backend/database/db_config.py
 import mysql.connector
-from sqlalchemy import create_engine
+from mysql.connector.errors import PoolError
 from config import Config  # ← Changed this line
 import logging
+import os
+import threading
 import time
 
 logger = logging.getLogger(__name__)
 
+
+class PoolTimeoutError(PoolError):
+    """Raised when no pooled connection frees up within MYSQL_POOL_TIMEOUT"""
+
+
+class PooledConnection:
+    """Checked-out pool connection; close() hands it back instead of disconnecting
+
+    Use it as a context manager (``with get_mysql_connection() as conn:``) so
+    the connection is returned even when a query raises.
+    """
+
+    def __init__(self, pool, conn, opened_at):
+        self._pool = pool
+        self._conn = conn
+        self._opened_at = opened_at
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn, self._opened_at)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise PoolError("Connection was already returned to the pool")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MySQLConnectionPool:
+    """Process-local MySQL connection pool with validation on checkout"""
+
+    def __init__(self, size, timeout, ping_interval, recycle):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.recycle = recycle
+        self.pid = os.getpid()
+        self._idle = []  # LIFO: the most recently returned connection is the warmest
+        self._lock = threading.Lock()
+        # Signalled whenever a waiter may proceed: a connection was returned or a slot freed up
+        self._available = threading.Condition(self._lock)
+        self._opened = 0
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_timeouts": 0,
+            "connects": 0,
+            "discarded": 0,
+            "in_use": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    def acquire(self):
+        """Check out a validated connection, waiting at most ``timeout`` seconds"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = self._take_idle(deadline)
+            if entry is None:
+                conn, opened_at = self._connect(), time.monotonic()
+                break
+            conn, opened_at, returned_at = entry
+            if self._validate(conn, opened_at, returned_at):
+                break
+            self._discard(conn)
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+        return PooledConnection(self, conn, opened_at)
+
+    def release(self, conn, opened_at):
+        """Return a connection to the pool (called by PooledConnection.close)"""
+        with self._lock:
+            self._stats["in_use"] -= 1
+        try:
+            if getattr(conn, "in_transaction", False):
+                conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._available:
+            self._idle.append((conn, opened_at, time.monotonic()))
+            self._available.notify()
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["opened"] = self._opened
+            stats["idle"] = len(self._idle)
+        stats["size"] = self.size
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 4)
+        return stats
+
+    def _take_idle(self, deadline):
+        """Return an idle entry, or None when the caller may open a new connection"""
+        wait_started = None
+        with self._available:
+            try:
+                while True:
+                    if self._idle:
+                        return self._idle.pop()
+                    if self._opened < self.size:
+                        self._opened += 1
+                        return None
+                    if wait_started is None:
+                        wait_started = time.monotonic()
+                        self._stats["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["wait_timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"No MySQL connection available within {self.timeout}s (pool size {self.size})"
+                        )
+                    self._available.wait(remaining)
+            finally:
+                if wait_started is not None:
+                    self._stats["wait_seconds_total"] += time.monotonic() - wait_started
+
+    def _connect(self):
+        try:
+            conn = mysql.connector.connect(
+                host=Config.MYSQL_HOST,
+                user=Config.MYSQL_USER,
+                password=Config.MYSQL_PASSWORD,
+                database=Config.MYSQL_DB,
+                port=Config.MYSQL_PORT
+            )
+        except Exception:
+            with self._available:
+                self._opened -= 1
+                self._available.notify()
+            raise
+        with self._lock:
+            self._stats["connects"] += 1
+        return conn
+
+    def _validate(self, conn, opened_at, returned_at):
+        now = time.monotonic()
+        if self.recycle and now - opened_at > self.recycle:
+            return False
+        if now - returned_at < self.ping_interval:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.warning(f"Discarding stale pooled MySQL connection: {e}")
+            return False
+
+    def _discard(self, conn):
+        with self._available:
+            self._opened -= 1
+            self._stats["discarded"] += 1
+            self._available.notify()
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool():
+    """Return this process's pool, rebuilding it after a fork (one pool per gunicorn worker)"""
+    global _pool
+    pid = os.getpid()
+    if _pool is None or _pool.pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool.pid != pid:
+                _pool = MySQLConnectionPool(
+                    size=Config.MYSQL_POOL_SIZE,
+                    timeout=Config.MYSQL_POOL_TIMEOUT,
+                    ping_interval=Config.MYSQL_POOL_PING_INTERVAL,
+                    recycle=Config.MYSQL_POOL_RECYCLE
+                )
+                logger.info(f"✅ MySQL pool ready (pid {pid}, size {_pool.size})")
+    return _pool
+
+
+def get_pool_metrics():
+    """Checkout/wait/in-use counters for the current process's pool"""
+    return get_connection_pool().metrics()
+
+
 def get_mysql_connection():
-    """Create MySQL connection"""
+    """Check out a pooled MySQL connection (``with`` it, or close() it in a ``finally``)"""
     try:
-        conn = mysql.connector.connect(
-            host=Config.MYSQL_HOST,
-            user=Config.MYSQL_USER,
-            password=Config.MYSQL_PASSWORD,
-            database=Config.MYSQL_DB,
-            port=Config.MYSQL_PORT
-        )
-        return conn
+        return get_connection_pool().acquire()
     except Exception as e:
         logger.error(f"MySQL connection failed: {e}")
         raise
 
 def get_sqlalchemy_engine():
     """Create SQLAlchemy engine"""
+    from sqlalchemy import create_engine
+
     connection_string = (
         f"mysql+mysqlconnector://{Config.MYSQL_USER}:{Config.MYSQL_PASSWORD}"
         f"@{Config.MYSQL_HOST}:{Config.MYSQL_PORT}/{Config.MYSQL_DB}"
@@ -34,12 +223,12 @@ def init_database(retries=10, delay=5):
     """Retry connecting to MySQL until it is ready"""
     for i in range(retries):
         try:
-            conn = get_mysql_connection()
-            conn.close()
+            with get_mysql_connection():
+                pass
             logger.info("✅ MySQL connection successful")
             return True
         except Exception as e:
             logger.warning(f"Attempt {i+1}/{retries}: MySQL not ready yet. Retrying in {delay}s...")
             time.sleep(delay)
     logger.error("❌ Could not connect to MySQL after multiple retries")
-    return False
\ No newline at end of file
+    return False
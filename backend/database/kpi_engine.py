@@ -0,0 +1,88 @@
+# backend/database/kpi_engine.py
+from datetime import date, timedelta
+from database.rollups import rollup_manager
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# All headline KPIs in one round trip. Date bounds are passed as constants so
+# every predicate is a plain range on the indexed date column.
+KPI_QUERY = """
+    SELECT
+        (SELECT COUNT(*)
+           FROM mining_incidents
+          WHERE incident_date >= %(window_start)s) AS total_incidents,
+        (SELECT COUNT(*)
+           FROM equipment_monitoring
+          WHERE status = 'Critical') AS critical_alerts,
+        (SELECT AVG(efficiency_percentage)
+           FROM production_metrics
+          WHERE metric_date >= %(window_start)s) AS avg_efficiency,
+        (SELECT SUM(quantity_tons)
+           FROM production_metrics
+          WHERE metric_date >= %(month_start)s
+            AND metric_date < %(next_month_start)s) AS monthly_production
+"""
+
+# Same KPIs, with the production figures read from the daily rollup table
+# (at most ~31 rows, see database/rollups.py) instead of scanning production_metrics.
+KPI_SUMMARY_QUERY = """
+    SELECT
+        (SELECT COUNT(*)
+           FROM mining_incidents
+          WHERE incident_date >= %(window_start)s) AS total_incidents,
+        (SELECT COUNT(*)
+           FROM equipment_monitoring
+          WHERE status = 'Critical') AS critical_alerts,
+        (SELECT SUM(efficiency_sum) / NULLIF(SUM(efficiency_count), 0)
+           FROM production_daily_rollup
+          WHERE metric_date >= %(window_start)s) AS avg_efficiency,
+        (SELECT SUM(total_tons)
+           FROM production_daily_rollup
+          WHERE metric_date >= %(month_start)s
+            AND metric_date < %(next_month_start)s) AS monthly_production
+"""
+
+def kpi_window(today=None):
+    """Date bounds used by the KPI queries"""
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+    return {
+        "window_start": today - timedelta(days=Config.KPI_WINDOW_DAYS),
+        "month_start": month_start,
+        "next_month_start": next_month_start,
+    }
+
+
+class KPIEngine:
+    """Computes the headline KPIs in a single round trip"""
+
+    def __init__(self, use_summary=None):
+        self.use_summary = Config.KPI_USE_SUMMARY_TABLE if use_summary is None else use_summary
+
+    def compute(self, conn, today=None):
+        """Return the KPI dict used by /api/kpis and the chat KPI block"""
+        params = kpi_window(today)
+        query = KPI_QUERY
+        if self.use_summary:
+            rollup_manager.ensure_fresh(conn, ["production_daily"])
+            query = KPI_SUMMARY_QUERY
+
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(query, params)
+            row = cursor.fetchone() or {}
+        finally:
+            cursor.close()
+
+        return {
+            "total_incidents": int(row.get("total_incidents") or 0),
+            "critical_alerts": int(row.get("critical_alerts") or 0),
+            "avg_efficiency": round(float(row.get("avg_efficiency") or 0), 2),
+            "monthly_production": float(row.get("monthly_production") or 0)
+        }
+
+
+kpi_engine = KPIEngine()
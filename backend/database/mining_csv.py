@@ -0,0 +1,209 @@
+# backend/database/mining_csv.py
+# Streaming parsers for the mysql/kaggle_data CSV files, shared by the analytics store and the bulk loader.
+# Each parser yields one normalized tuple per row (columns below), never holding the file in memory.
+from datetime import datetime, time, timezone
+import csv
+import os
+import re
+
+EQUIPMENT_STATUS_FILE = "equipment_status_logs_rows.csv"
+SHIFT_PRODUCTION_FILE = "mines_production_data by date.csv"
+TRIP_DETAILS_FILE = "mines_production_data_by date by equipment - mines_production_data_by date by equipment.csv"
+
+EQUIPMENT_STATUS_COLUMNS = [
+    "id", "equipment_name", "status", "date", "start_time", "end_time",
+    "duration_minutes", "alert", "reason", "issue", "comment", "created_at"
+]
+
+# Long format: one row per (date, shift); shift is A, B, C or Total
+SHIFT_PRODUCTION_COLUMNS = [
+    "date", "shift", "excavator", "dumper", "trips_mining", "trips_reclaim",
+    "total_trips", "qty_m3", "grader", "dozer"
+]
+
+TRIP_DETAILS_COLUMNS = [
+    "date", "source", "destination", "specification", "asset_name", "operator", "production", "total"
+]
+
+# Second header row of the shift file -> column name
+SHIFT_MEASURES = {
+    "excavator": "excavator",
+    "dumper": "dumper",
+    "trip count for mining": "trips_mining",
+    "trip count for reclaim": "trips_reclaim",
+    "total trips": "total_trips",
+    "qty (m3)": "qty_m3",
+    "grader": "grader",
+    "dozer": "dozer",
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d %b %Y", "%d %B %Y", "%d-%b-%Y", "%d/%m/%Y")
+SHIFT_LABEL = re.compile(r"^shift\s*-?\s*(\w+)$", re.IGNORECASE)
+UTC_OFFSET = re.compile(r"[+-]\d\d$")
+MISSING = {"", "-", "null", "none", "n/a"}
+
+
+def text(value):
+    """Stripped cell text, None for the placeholders the exports use for empty cells"""
+    value = (value or "").strip()
+    return None if value.lower() in MISSING else value
+
+
+def parse_date(value):
+    """``2025-09-17``, ``1 Jul 2025`` or ``1 July 2025`` -> date"""
+    value = text(value)
+    if value is None:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value!r}")
+
+
+def parse_time(value):
+    value = text(value)
+    return time.fromisoformat(value) if value else None
+
+
+def parse_timestamp(value):
+    """``2025-10-01 03:24:29.576452+00`` -> naive UTC datetime"""
+    value = text(value)
+    if value is None:
+        return None
+    if UTC_OFFSET.search(value):
+        value += ":00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_number(value, cast=float):
+    value = text(value)
+    if value is None:
+        return None
+    number = float(value.replace(",", ""))
+    return int(number) if cast is int else number
+
+
+def shift_name(label):
+    """``Shift - A`` -> ``A``, ``Total Shift`` -> ``Total``"""
+    label = label.strip()
+    match = SHIFT_LABEL.match(label)
+    if match:
+        return match.group(1).upper()
+    return label.split()[0].title() if label else label
+
+
+def open_csv(path):
+    """csv.reader over ``path`` (paths may contain spaces; a UTF-8 BOM is skipped)"""
+    handle = open(path, newline="", encoding="utf-8-sig")
+    return handle, csv.reader(handle)
+
+
+def iter_equipment_status(path):
+    handle, reader = open_csv(path)
+    with handle:
+        header = [name.strip().lower() for name in next(reader)]
+        index = {name: header.index(name) for name in EQUIPMENT_STATUS_COLUMNS}
+        for row in reader:
+            if not row or not row[index["id"]].strip():
+                continue
+            cell = lambda name: row[index[name]]
+            yield (
+                cell("id").strip(),
+                text(cell("equipment_name")),
+                (text(cell("status")) or "ACTIVE").upper(),
+                parse_date(cell("date")),
+                parse_time(cell("start_time")),
+                parse_time(cell("end_time")),
+                parse_number(cell("duration_minutes"), int) or 0,
+                "Yes" if (text(cell("alert")) or "").lower() == "yes" else "No",
+                text(cell("reason")),
+                text(cell("issue")),
+                text(cell("comment")),
+                parse_timestamp(cell("created_at")),
+            )
+
+
+def shift_columns(group_row, measure_row):
+    """Map the two header rows to ``[(column index, shift, measure)]``
+
+    The first row names each shift once, above its first measure; the
+    measures under it repeat per shift.
+    """
+    columns, shift = [], None
+    for position, (group, measure) in enumerate(zip(group_row, measure_row)):
+        if group.strip():
+            shift = shift_name(group)
+        name = SHIFT_MEASURES.get(measure.strip().lower())
+        if shift and name:
+            columns.append((position, shift, name))
+    return columns
+
+
+def iter_shift_production(path):
+    """Wide shift-wise rows -> one long row per (date, shift)"""
+    handle, reader = open_csv(path)
+    with handle:
+        group_row, measure_row = next(reader), next(reader)
+        date_index = [name.strip().lower() for name in measure_row].index("date")
+        columns = shift_columns(group_row, measure_row)
+        shifts = list(dict.fromkeys(shift for _, shift, _ in columns))
+        for row in reader:
+            if not row or not text(row[date_index]):
+                continue
+            day = parse_date(row[date_index])
+            values = {shift: {} for shift in shifts}
+            for position, shift, name in columns:
+                if position < len(row):
+                    values[shift][name] = parse_number(row[position], float if name == "qty_m3" else int)
+            for shift in shifts:
+                yield (day, shift) + tuple(values[shift].get(name) for name in SHIFT_PRODUCTION_COLUMNS[2:])
+
+
+def iter_trip_details(path):
+    handle, reader = open_csv(path)
+    with handle:
+        header = [re.sub(r"\s+", "_", name.strip().lower()) for name in next(reader)]
+        index = {name: header.index(name) for name in TRIP_DETAILS_COLUMNS}
+        for row in reader:
+            if not row or not text(row[index["date"]]):
+                continue
+            cell = lambda name: row[index[name]]
+            yield (
+                parse_date(cell("date")),
+                text(cell("source")),
+                text(cell("destination")),
+                text(cell("specification")),
+                text(cell("asset_name")),
+                text(cell("operator")),
+                parse_number(cell("production")) or 0,
+                parse_number(cell("total"), int) or 0,
+            )
+
+
+# dataset -> (file name, row parser, columns)
+DATASETS = {
+    "equipment_status": (EQUIPMENT_STATUS_FILE, iter_equipment_status, EQUIPMENT_STATUS_COLUMNS),
+    "shift_production": (SHIFT_PRODUCTION_FILE, iter_shift_production, SHIFT_PRODUCTION_COLUMNS),
+    "trip_details": (TRIP_DETAILS_FILE, iter_trip_details, TRIP_DETAILS_COLUMNS),
+}
+
+
+def dataset_path(data_dir, name):
+    return os.path.join(data_dir, DATASETS[name][0])
+
+
+def iter_batches(rows, size):
+    """Group a row iterator into lists of at most ``size`` rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
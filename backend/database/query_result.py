@@ -0,0 +1,153 @@
+# backend/database/query_result.py
+# Typed result of one SQL query: fetched once, then shared by the LLM context, tables and charts.
+# Chart payloads are columnar: {"labels": [...], "series": {name: [values aligned with labels]}}
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import math
+
+
+def json_value(value):
+    """JSON-safe cell value (dates as ISO strings, DECIMAL as float)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
+def chart_number(value):
+    """Series value: numbers as float rounded to 2 places, missing as 0"""
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    return round(float(value), 2)
+
+
+def empty_series():
+    return {"labels": [], "series": {}}
+
+
+def fetch_result(conn, name, query, params=None):
+    """Run ``query`` on a mysql.connector connection and return its QueryResult (no pandas)"""
+    cursor = conn.cursor()
+    try:
+        if params is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query, params)
+        return QueryResult.from_cursor(name, cursor, cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+class QueryResult:
+    """Column names plus row tuples, in query order"""
+
+    def __init__(self, name, columns, rows):
+        self.name = name
+        self.columns = list(columns)
+        self.rows = [tuple(row) for row in rows]
+
+    @classmethod
+    def from_cursor(cls, name, cursor, rows):
+        """Build from a DB-API cursor (tuple or dict rows) and the rows it fetched"""
+        columns = [description[0] for description in cursor.description or ()]
+        if rows and isinstance(rows[0], dict):
+            rows = [tuple(row.get(column) for column in columns) for row in rows]
+        return cls(name, columns, rows)
+
+    @property
+    def title(self):
+        return self.name.replace("_", " ").title()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def column(self, name):
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+    def records(self):
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def table(self, page_size=10, max_rows=500):
+        """JSON-safe table of the first ``max_rows`` rows, sent whole so the client can page it
+
+        Any process can answer for any table: nothing is kept server side
+        between the answer and later page changes.
+        """
+        rows = self.rows[:max_rows]
+        return {
+            "columns": self.columns,
+            "rows": [[json_value(value) for value in row] for row in rows],
+            "page": 1,
+            "page_size": page_size,
+            "total_rows": len(rows),
+            "total_pages": max(1, math.ceil(len(rows) / page_size)),
+            "truncated": len(self.rows) > len(rows)
+        }
+
+    def series(self, label_column, value_columns=None):
+        """Columnar chart payload: one label per row, one series per value column"""
+        value_columns = value_columns or [column for column in self.columns if column != label_column]
+        return {
+            "labels": [json_value(value) for value in self.column(label_column)],
+            "series": {name: [chart_number(value) for value in self.column(name)] for name in value_columns}
+        }
+
+    def pivot(self, label_column, key_column, value_column):
+        """Columnar payload from long rows, e.g. (month, severity, count) -> one series per severity
+
+        Labels and keys keep their first-seen order; missing cells are 0.
+        """
+        label_index = self.columns.index(label_column)
+        key_index = self.columns.index(key_column)
+        value_index = self.columns.index(value_column)
+        labels, positions, series = [], {}, {}
+        for row in self.rows:
+            label = json_value(row[label_index])
+            if label not in positions:
+                positions[label] = len(labels)
+                labels.append(label)
+                for values in series.values():
+                    values.append(0)
+            key = str(row[key_index]) if row[key_index] is not None else "Unknown"
+            values = series.setdefault(key, [0] * len(labels))
+            values[positions[label]] += chart_number(row[value_index])
+        return {"labels": labels, "series": series}
+
+    def count_by(self, column):
+        """Columnar counts per value of a categorical column"""
+        counts = {}
+        for value in self.column(column):
+            label = str(json_value(value)) if value is not None else "Unknown"
+            counts[label] = counts.get(label, 0) + 1
+        return {"labels": list(counts), "series": {"count": list(counts.values())}}
+
+    def sum_by(self, column, value_columns):
+        """Columnar ``value_columns`` summed per ``column`` value, in ascending label order"""
+        key_index = self.columns.index(column)
+        value_indexes = [(name, self.columns.index(name)) for name in value_columns]
+        totals = {}
+        for row in self.rows:
+            bucket = totals.setdefault(json_value(row[key_index]), [0.0] * len(value_indexes))
+            for position, (_, index) in enumerate(value_indexes):
+                if row[index] is not None:
+                    bucket[position] += float(row[index])
+        labels = sorted(totals, key=str)
+        return {
+            "labels": labels,
+            "series": {
+                name: [round(totals[label][position], 2) for label in labels]
+                for position, (name, _) in enumerate(value_indexes)
+            }
+        }
+
+    def fingerprint(self):
+        """Hashable-by-json view of the data (see SemanticAnswerCache.fingerprint)"""
+        return [self.name, self.columns, self.rows]
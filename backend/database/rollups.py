@@ -0,0 +1,266 @@
+# backend/database/rollups.py
+# Incrementally maintained rollup tables behind the KPI and trend queries
+from contextlib import contextmanager
+from datetime import date, timedelta
+from config import Config
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# First day of the month of a DATE/DATETIME column (a DATE, unlike DATE_FORMAT's string)
+MONTH_OF = "DATE_SUB(DATE({column}), INTERVAL DAYOFMONTH({column}) - 1 DAY)"
+
+PRODUCTION_COLUMNS = """
+        total_tons DECIMAL(16,2) NOT NULL DEFAULT 0,
+        efficiency_sum DOUBLE NOT NULL DEFAULT 0,
+        efficiency_count INT NOT NULL DEFAULT 0,
+        row_count INT NOT NULL DEFAULT 0,
+        refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+"""
+
+PRODUCTION_AGGREGATES = """
+        COALESCE(SUM(quantity_tons), 0),
+        COALESCE(SUM(efficiency_percentage), 0),
+        COUNT(efficiency_percentage),
+        COUNT(*)
+"""
+
+# name -> table definition. ``select`` aggregates the source rows dated on or
+# after %(since)s into the rollup columns (keys first, then values).
+ROLLUPS = {
+    "incidents_monthly": {
+        "table": "incidents_monthly_rollup",
+        "granularity": "month",
+        "keys": ["month", "severity"],
+        "values": ["incident_count"],
+        "create": """
+            CREATE TABLE IF NOT EXISTS incidents_monthly_rollup (
+                month DATE NOT NULL,
+                severity VARCHAR(20) NOT NULL,
+                incident_count INT NOT NULL DEFAULT 0,
+                refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (month, severity)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        "select": f"""
+            SELECT
+                {MONTH_OF.format(column="incident_date")} AS month,
+                COALESCE(severity, 'Unknown') AS severity,
+                COUNT(*)
+            FROM mining_incidents
+            WHERE incident_date >= %(since)s
+            GROUP BY 1, 2
+        """,
+    },
+    "production_daily": {
+        "table": "production_daily_rollup",
+        "granularity": "day",
+        "keys": ["metric_date"],
+        "values": ["total_tons", "efficiency_sum", "efficiency_count", "row_count"],
+        "create": f"""
+            CREATE TABLE IF NOT EXISTS production_daily_rollup (
+                metric_date DATE PRIMARY KEY,{PRODUCTION_COLUMNS}
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        "select": f"""
+            SELECT
+                metric_date,{PRODUCTION_AGGREGATES}
+            FROM production_metrics
+            WHERE metric_date >= %(since)s
+            GROUP BY metric_date
+        """,
+    },
+    "production_monthly": {
+        "table": "production_monthly_rollup",
+        "granularity": "month",
+        "keys": ["month"],
+        "values": ["total_tons", "efficiency_sum", "efficiency_count", "row_count"],
+        "create": f"""
+            CREATE TABLE IF NOT EXISTS production_monthly_rollup (
+                month DATE PRIMARY KEY,{PRODUCTION_COLUMNS}
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        "select": f"""
+            SELECT
+                {MONTH_OF.format(column="metric_date")} AS month,{PRODUCTION_AGGREGATES}
+            FROM production_metrics
+            WHERE metric_date >= %(since)s
+            GROUP BY 1
+        """,
+    },
+}
+
+# Earliest possible source date: a refresh from here rebuilds the whole rollup
+BEGINNING = date(1970, 1, 1)
+
+# MySQL named lock held while rollups are rewritten: one writer across all workers
+REFRESH_LOCK = "mining_copilot_rollup_refresh"
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+@contextmanager
+def refresh_lock(conn, timeout):
+    """Hold REFRESH_LOCK on ``conn`` for the block; yields False if it was not free within ``timeout`` seconds"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (REFRESH_LOCK, timeout))
+        locked = cursor.fetchone()[0] == 1
+        try:
+            yield locked
+        finally:
+            if locked:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (REFRESH_LOCK,))
+                cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+class RollupManager:
+    """Keeps the rollup tables in step with their source tables
+
+    A refresh re-aggregates only the source rows dated from the rollup's last
+    key (minus ROLLUP_LOOKBACK_DAYS for late-arriving rows, widened to whole
+    months for monthly rollups): the affected rollup rows are deleted and
+    re-inserted in one transaction, so readers never see a half-refreshed
+    period. Older periods are final; ``backfill`` rebuilds them.
+
+    Writers hold the MySQL lock REFRESH_LOCK, so the gunicorn workers never
+    rewrite the same rows at once.
+    """
+
+    def __init__(self):
+        self._ready = set()
+        self._last_attempt = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, conn, names=None, since=None):
+        """Refresh the named rollups (all by default); returns {name: rows written}
+
+        Waits up to ROLLUP_LOCK_TIMEOUT seconds for another writer to finish.
+        """
+        with refresh_lock(conn, Config.ROLLUP_LOCK_TIMEOUT) as locked:
+            if not locked:
+                raise TimeoutError("Another process is refreshing the rollups")
+            return self._refresh(conn, names, since)
+
+    def _refresh(self, conn, names=None, since=None):
+        written = {}
+        for name in names or ROLLUPS:
+            spec = ROLLUPS[name]
+            cursor = conn.cursor()
+            try:
+                self._ensure_table(cursor, name)
+                start = self._refresh_start(cursor, spec, since)
+                key = spec["keys"][0]
+                columns = ", ".join(spec["keys"] + spec["values"])
+                cursor.execute(f"DELETE FROM {spec['table']} WHERE {key} >= %(since)s", {"since": start})
+                cursor.execute(f"INSERT INTO {spec['table']} ({columns}) {spec['select']}", {"since": start})
+                conn.commit()
+                written[name] = cursor.rowcount
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return written
+
+    def ensure_fresh(self, conn, names=None):
+        """Refresh the rollups on the read path when due, never waiting for another writer
+
+        A rollup is due when this process has not tried to refresh it in the
+        last ROLLUP_REFRESH_INTERVAL seconds; failed attempts count too, so an
+        outage is not retried by every request. If another process holds
+        REFRESH_LOCK, or refreshed the rollup within the interval, the current
+        rollup is read as it is.
+        """
+        now = time.monotonic()
+        due = [
+            name for name in names or ROLLUPS
+            if now - self._last_attempt.get(name, float("-inf")) >= Config.ROLLUP_REFRESH_INTERVAL
+        ]
+        # One refresh at a time per process; a concurrent caller reads the current rollup
+        if not due or not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            for name in due:
+                self._last_attempt[name] = now
+            with refresh_lock(conn, 0) as locked:
+                stale = [name for name in due if not self._refreshed_recently(conn, name)] if locked else []
+                if stale:
+                    self._refresh(conn, stale)
+        except Exception as e:
+            logger.warning(f"⚠️ Rollup refresh failed, serving the last refreshed data: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _refreshed_recently(self, conn, name):
+        """Whether any process rewrote this rollup within ROLLUP_REFRESH_INTERVAL seconds"""
+        cursor = conn.cursor()
+        try:
+            self._ensure_table(cursor, name)
+            cursor.execute(f"SELECT TIMESTAMPDIFF(SECOND, MAX(refreshed_at), NOW()) FROM {ROLLUPS[name]['table']}")
+            age = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        return age is not None and age < Config.ROLLUP_REFRESH_INTERVAL
+
+    def backfill(self, conn, names=None, since=None):
+        """Rebuild the rollups from ``since`` (default: all history)"""
+        return self.refresh(conn, names, since or BEGINNING)
+
+    def check(self, conn, name, since=None):
+        """Compare a rollup with a fresh aggregate of its source rows
+
+        Returns a list of ``(key, expected, actual)`` mismatches (None for a
+        missing row); an empty list means the rollup is consistent.
+        """
+        spec = ROLLUPS[name]
+        start = since or BEGINNING
+        if spec["granularity"] == "month":
+            start = month_start(start)
+        size = len(spec["keys"])
+        cursor = conn.cursor()
+        try:
+            self._ensure_table(cursor, name)
+            cursor.execute(spec["select"], {"since": start})
+            expected = {tuple(row[:size]): tuple(row[size:]) for row in cursor.fetchall()}
+            cursor.execute(
+                f"SELECT {', '.join(spec['keys'] + spec['values'])} FROM {spec['table']} "
+                f"WHERE {spec['keys'][0]} >= %(since)s",
+                {"since": start}
+            )
+            actual = {tuple(row[:size]): tuple(row[size:]) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+        mismatches = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            want, got = expected.get(key), actual.get(key)
+            if want is None or got is None or any(abs(float(a) - float(b)) > 0.01 for a, b in zip(want, got)):
+                mismatches.append((key, want, got))
+        return mismatches
+
+    def _refresh_start(self, cursor, spec, since):
+        if since is None:
+            cursor.execute(f"SELECT MAX({spec['keys'][0]}) FROM {spec['table']}")
+            last = cursor.fetchone()[0]
+            since = last - timedelta(days=Config.ROLLUP_LOOKBACK_DAYS) if last else BEGINNING
+        return month_start(since) if spec["granularity"] == "month" else since
+
+    def _ensure_table(self, cursor, name):
+        if name in self._ready:
+            return
+        with self._lock:
+            if name not in self._ready:
+                cursor.execute(ROLLUPS[name]["create"])
+                self._ready.add(name)
+                logger.info(f"✅ {ROLLUPS[name]['table']} rollup table ready")
+
+
+rollup_manager = RollupManager()
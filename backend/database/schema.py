@@ -0,0 +1,440 @@
+# backend/database/schema.py
+# Versioned schema for the tables the backend queries, applied by migrate()
+from database.db_config import get_mysql_connection
+from database.rollups import ROLLUPS
+from database.telemetry_loader import TRIP_KEY_SQL
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tables with the primary keys utils/kb_sync.py syncs by and the updated_at
+# column its keyset scan uses; columns are the ones the queries read.
+TABLES = {
+    "mining_incidents": """
+        CREATE TABLE IF NOT EXISTS mining_incidents (
+            incident_id INT AUTO_INCREMENT PRIMARY KEY,
+            incident_date DATE NOT NULL,
+            mine_name VARCHAR(100) NOT NULL,
+            incident_type VARCHAR(50),
+            severity VARCHAR(20) NOT NULL DEFAULT 'Low',
+            description TEXT,
+            casualties INT DEFAULT 0,
+            injuries INT DEFAULT 0,
+            cost_impact DECIMAL(14,2) DEFAULT 0,
+            response_time_minutes INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "equipment_monitoring": """
+        CREATE TABLE IF NOT EXISTS equipment_monitoring (
+            equipment_id VARCHAR(50) PRIMARY KEY,
+            equipment_type VARCHAR(50) NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'Operational',
+            efficiency_score DECIMAL(5,2),
+            alerts VARCHAR(255),
+            location VARCHAR(100),
+            temperature_celsius DECIMAL(6,2),
+            vibration_level DECIMAL(6,2),
+            last_maintenance DATE,
+            next_maintenance DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "production_metrics": """
+        CREATE TABLE IF NOT EXISTS production_metrics (
+            metric_id INT AUTO_INCREMENT PRIMARY KEY,
+            metric_date DATE NOT NULL,
+            site_name VARCHAR(100) NOT NULL,
+            material_type VARCHAR(50),
+            quantity_tons DECIMAL(12,2) DEFAULT 0,
+            efficiency_percentage DECIMAL(5,2),
+            downtime_hours DECIMAL(6,2) DEFAULT 0,
+            target_tons DECIMAL(12,2),
+            cost_per_ton DECIMAL(10,2),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "maintenance_repairs": """
+        CREATE TABLE IF NOT EXISTS maintenance_repairs (
+            maintenance_id INT AUTO_INCREMENT PRIMARY KEY,
+            equipment_id VARCHAR(50) NOT NULL,
+            maintenance_type VARCHAR(50),
+            start_date DATETIME NOT NULL,
+            end_date DATETIME,
+            cost DECIMAL(12,2) DEFAULT 0,
+            downtime_hours DECIMAL(8,2) DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "fuel_energy": """
+        CREATE TABLE IF NOT EXISTS fuel_energy (
+            reading_id INT AUTO_INCREMENT PRIMARY KEY,
+            equipment_id VARCHAR(50) NOT NULL,
+            reading_date DATE NOT NULL,
+            fuel_liters DECIMAL(10,2) DEFAULT 0,
+            energy_kwh DECIMAL(12,2) DEFAULT 0,
+            shift VARCHAR(20),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "quality_metrics": """
+        CREATE TABLE IF NOT EXISTS quality_metrics (
+            quality_id INT AUTO_INCREMENT PRIMARY KEY,
+            site_name VARCHAR(100) NOT NULL,
+            metric_date DATE NOT NULL,
+            material_type VARCHAR(50),
+            quality_grade VARCHAR(20),
+            defects_found INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    "safety_compliance": """
+        CREATE TABLE IF NOT EXISTS safety_compliance (
+            audit_id INT AUTO_INCREMENT PRIMARY KEY,
+            audit_date DATE NOT NULL,
+            site_name VARCHAR(100) NOT NULL,
+            compliance_score DECIMAL(5,2),
+            violations INT DEFAULT 0,
+            auditor_name VARCHAR(100),
+            recommendations TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    # Authentication (same definitions as database/init_auth_tables.sql)
+    "users": """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INT AUTO_INCREMENT PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            email VARCHAR(100) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            full_name VARCHAR(100),
+            role ENUM('user', 'admin', 'manager') DEFAULT 'user',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP NULL,
+            is_active BOOLEAN DEFAULT TRUE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    "refresh_tokens": """
+        CREATE TABLE IF NOT EXISTS refresh_tokens (
+            token_id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT NOT NULL,
+            token_hash VARCHAR(255) NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            revoked BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            INDEX idx_token_hash (token_hash)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    "auth_audit_log": """
+        CREATE TABLE IF NOT EXISTS auth_audit_log (
+            log_id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id INT,
+            action VARCHAR(50) NOT NULL,
+            ip_address VARCHAR(45),
+            user_agent TEXT,
+            success BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+}
+
+# kaggle_data telemetry, filled by scripts/load_telemetry.py (upserts keyed on the primary/unique keys)
+TELEMETRY_TABLES = {
+    "equipment_status": """
+        CREATE TABLE IF NOT EXISTS equipment_status (
+            id VARCHAR(50) PRIMARY KEY,
+            equipment_name VARCHAR(100) NOT NULL,
+            status ENUM('ACTIVE','INACTIVE') DEFAULT 'ACTIVE',
+            date DATE NOT NULL,
+            start_time TIME,
+            end_time TIME,
+            duration_minutes INT DEFAULT 0,
+            alert ENUM('Yes','No') DEFAULT 'No',
+            reason VARCHAR(255),
+            issue VARCHAR(255),
+            comment TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_equipment_name (equipment_name),
+            INDEX idx_date (date),
+            INDEX idx_alert (alert)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    # Long format: one row per date and shift (A, B, C and the file's Total)
+    "production_by_date": """
+        CREATE TABLE IF NOT EXISTS production_by_date (
+            date DATE NOT NULL,
+            shift VARCHAR(10) NOT NULL,
+            excavator INT,
+            dumper INT,
+            trips_mining INT,
+            trips_reclaim INT,
+            total_trips INT,
+            qty_m3 DECIMAL(12,2),
+            grader INT,
+            dozer INT,
+            PRIMARY KEY (date, shift)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    # trip_key: SHA-1 of the descriptive columns, the upsert key (the file has no ids)
+    "trip_details": """
+        CREATE TABLE IF NOT EXISTS trip_details (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            trip_key CHAR(40) NOT NULL,
+            Date DATE NOT NULL,
+            Source VARCHAR(255),
+            Destination VARCHAR(255),
+            Specification VARCHAR(100),
+            Asset_Name VARCHAR(100),
+            Operator VARCHAR(100),
+            Production DECIMAL(10,2) DEFAULT 0,
+            Total INT DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_trip_key (trip_key),
+            INDEX idx_date (Date),
+            INDEX idx_asset (Asset_Name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+}
+
+# table -> [(index name, columns)], each fitted to the WHERE/ORDER BY of a hot query
+INDEXES = {
+    "mining_incidents": [
+        # date windows + recent-first lists; severity makes the trend/rollup GROUP BY index-only
+        ("idx_incidents_date_severity", "incident_date, severity"),
+        ("idx_incidents_mine", "mine_name"),  # known sites (DISTINCT mine_name)
+        ("idx_incidents_updated", "updated_at, incident_id"),  # kb_sync keyset scan
+    ],
+    "equipment_monitoring": [
+        # status = 'Critical' KPI, status != 'Operational' alerts, GROUP BY status
+        ("idx_equipment_status_efficiency", "status, efficiency_score"),
+        # efficiency_score < 80 branch of the alert filter, ORDER BY efficiency_score
+        ("idx_equipment_efficiency", "efficiency_score"),
+        ("idx_equipment_updated", "updated_at, equipment_id"),
+    ],
+    "production_metrics": [
+        # date windows, recent-first lists; covers the rollup/KPI SUM and AVG
+        ("idx_production_date_totals", "metric_date, quantity_tons, efficiency_percentage"),
+        ("idx_production_site", "site_name"),
+        ("idx_production_updated", "updated_at, metric_id"),
+    ],
+    "maintenance_repairs": [
+        ("idx_maintenance_start", "start_date"),
+        ("idx_maintenance_equipment", "equipment_id, start_date"),
+        ("idx_maintenance_updated", "updated_at, maintenance_id"),
+    ],
+    "fuel_energy": [
+        # reading_date window ORDER BY reading_date DESC, energy_kwh DESC
+        ("idx_fuel_date_energy", "reading_date, energy_kwh"),
+        ("idx_fuel_equipment", "equipment_id, reading_date"),
+        ("idx_fuel_updated", "updated_at, reading_id"),
+    ],
+    "quality_metrics": [
+        # metric_date window ORDER BY metric_date DESC, defects_found DESC
+        ("idx_quality_date_defects", "metric_date, defects_found"),
+        ("idx_quality_updated", "updated_at, quality_id"),
+    ],
+    "safety_compliance": [
+        ("idx_safety_audit_date", "audit_date"),
+        ("idx_safety_updated", "updated_at, audit_id"),
+    ],
+    # users: login (WHERE username = %s OR email = %s) is an index merge of its UNIQUE keys
+    "auth_audit_log": [
+        ("idx_audit_user_created", "user_id, created_at"),
+        ("idx_audit_created", "created_at"),
+    ],
+}
+
+SYNCED_PRIMARY_KEYS = {
+    "mining_incidents": "incident_id",
+    "equipment_monitoring": "equipment_id",
+    "production_metrics": "metric_id",
+    "maintenance_repairs": "maintenance_id",
+    "fuel_energy": "reading_id",
+    "quality_metrics": "quality_id",
+    "safety_compliance": "audit_id",
+}
+
+CREATE_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# Serializes migrate() across workers/containers starting at the same time
+MIGRATION_LOCK = "mining_copilot_schema_migrations"
+
+
+def table_exists(cursor, table):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return cursor.fetchone() is not None
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+
+def column_nullable(cursor, table, column):
+    cursor.execute("""
+        SELECT IS_NULLABLE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    row = cursor.fetchone()
+    return row is not None and row[0] == "YES"
+
+
+def index_exists(cursor, table, name):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+    """, (table, name))
+    return cursor.fetchone() is not None
+
+
+def _create_tables(cursor):
+    for ddl in TABLES.values():
+        cursor.execute(ddl)
+
+
+def _add_updated_at(cursor):
+    """Tables created before this schema (e.g. by the seed scripts) may lack updated_at"""
+    for table in SYNCED_PRIMARY_KEYS:
+        if not column_exists(cursor, table, "updated_at"):
+            cursor.execute(f"""
+                ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP
+                DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            """)
+            logger.info(f"➕ {table}.updated_at added")
+
+
+def _create_indexes(cursor):
+    for table, indexes in INDEXES.items():
+        for name, columns in indexes:
+            if not index_exists(cursor, table, name):
+                cursor.execute(f"ALTER TABLE {table} ADD INDEX {name} ({columns})")
+                logger.info(f"➕ {table}.{name} ({columns})")
+
+
+def _create_rollup_tables(cursor):
+    for spec in ROLLUPS.values():
+        cursor.execute(spec["create"])
+
+
+def _create_telemetry_tables(cursor):
+    """init.sql used to create production_by_date wide (one row per date, columns
+    per shift); that layout is kept as production_by_date_wide, not dropped"""
+    if table_exists(cursor, "production_by_date") and not column_exists(cursor, "production_by_date", "shift"):
+        cursor.execute("RENAME TABLE production_by_date TO production_by_date_wide")
+        logger.info("🔁 Wide production_by_date renamed to production_by_date_wide")
+    for ddl in TELEMETRY_TABLES.values():
+        cursor.execute(ddl)
+    if not column_exists(cursor, "trip_details", "trip_key"):
+        cursor.execute("ALTER TABLE trip_details ADD COLUMN trip_key CHAR(40) AFTER id")
+        logger.info("➕ trip_details.trip_key added")
+    if column_nullable(cursor, "trip_details", "trip_key"):
+        # Rows loaded before trip_key existed get the key the loader computes, so reruns match them
+        cursor.execute(f"UPDATE trip_details SET trip_key = {TRIP_KEY_SQL} WHERE trip_key IS NULL")
+        logger.info(f"🔑 trip_details.trip_key backfilled on {cursor.rowcount} rows")
+        cursor.execute("ALTER TABLE trip_details MODIFY trip_key CHAR(40) NOT NULL")
+    if not index_exists(cursor, "trip_details", "uq_trip_key"):
+        # Old loads could hold the same trip twice; the upsert key treats them as one row
+        cursor.execute("""
+            DELETE duplicate FROM trip_details duplicate
+            JOIN trip_details kept ON kept.trip_key = duplicate.trip_key AND kept.id < duplicate.id
+        """)
+        if cursor.rowcount:
+            logger.info(f"🧹 {cursor.rowcount} duplicate trip_details rows removed")
+        cursor.execute("ALTER TABLE trip_details ADD UNIQUE KEY uq_trip_key (trip_key)")
+
+
+# (version, description, step). Steps are idempotent so a half-applied
+# migration (DDL commits implicitly in MySQL) can simply be re-run.
+MIGRATIONS = [
+    (1, "Core, auth and KPI tables", _create_tables),
+    (2, "updated_at on knowledge-base tables", _add_updated_at),
+    (3, "Indexes for the hot query paths", _create_indexes),
+    (4, "Trend and KPI rollup tables", _create_rollup_tables),
+    (5, "kaggle_data telemetry tables (long-format shift production)", _create_telemetry_tables),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_MIGRATIONS_TABLE)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def migrate(conn, target=None):
+    """Apply the pending migrations up to ``target`` (default: latest); returns the versions applied"""
+    target = target or LATEST_VERSION
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK, Config.SCHEMA_LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            raise TimeoutError("Another process is migrating the schema")
+        try:
+            done = applied_versions(conn)
+            applied = []
+            for version, description, step in MIGRATIONS:
+                if version in done or version > target:
+                    continue
+                logger.info(f"🗄️ Applying schema migration {version}: {description}")
+                step(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                conn.commit()
+                applied.append(version)
+            return applied
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def migration_status(conn):
+    """[(version, description, applied)] for every known migration"""
+    done = applied_versions(conn)
+    return [(version, description, version in done) for version, description, _ in MIGRATIONS]
+
+
+def ensure_schema():
+    """Startup hook: migrate to the latest version; logs instead of raising"""
+    conn = get_mysql_connection()
+    try:
+        applied = migrate(conn)
+        if applied:
+            logger.info(f"✅ Schema migrated to version {LATEST_VERSION} (applied {applied})")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Schema migration failed: {e}")
+        return False
+    finally:
+        conn.close()
@@ -0,0 +1,127 @@
+# backend/database/telemetry_loader.py
+# Bulk loader: kaggle_data CSVs -> equipment_status, production_by_date, trip_details (MySQL)
+from database.mining_csv import DATASETS, dataset_path, iter_batches
+from config import Config
+import hashlib
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+TRIP_KEY_COLUMNS = ["date", "source", "destination", "specification", "asset_name", "operator"]
+
+# dataset -> (table, table columns in parser order, key columns). Tables are
+# created by schema migration 5 (database/schema.py).
+TARGETS = {
+    "equipment_status": (
+        "equipment_status",
+        ["id", "equipment_name", "status", "date", "start_time", "end_time",
+         "duration_minutes", "alert", "reason", "issue", "comment", "created_at"],
+        ["id"],
+    ),
+    "shift_production": (
+        "production_by_date",
+        ["date", "shift", "excavator", "dumper", "trips_mining", "trips_reclaim",
+         "total_trips", "qty_m3", "grader", "dozer"],
+        ["date", "shift"],
+    ),
+    # trip_key is prepended by trip_rows()
+    "trip_details": (
+        "trip_details",
+        ["trip_key", "Date", "Source", "Destination", "Specification", "Asset_Name",
+         "Operator", "Production", "Total"],
+        ["trip_key"],
+    ),
+}
+
+
+def upsert_sql(table, columns, keys):
+    """Multi-row friendly upsert: mysql.connector's executemany() sends each
+    batch as one INSERT ... VALUES (...), (...) statement"""
+    updates = ", ".join(f"{column} = VALUES({column})" for column in columns if column not in keys)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+
+def trip_key(row):
+    """The trip file has no ids: rows are keyed by their descriptive columns"""
+    values = dict(zip(DATASETS["trip_details"][2], row))
+    text = "|".join("" if values[name] is None else str(values[name]) for name in TRIP_KEY_COLUMNS)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# trip_key() in SQL, for rows that predate the column (schema migration 5 backfills them):
+# DATE renders as ISO text like str(date), CHAR columns are utf8mb4 like the encoded text
+TRIP_KEY_SQL = "SHA1(CONCAT_WS('|', {}))".format(
+    ", ".join(f"IFNULL({name}, '')" for name in TRIP_KEY_COLUMNS)
+)
+
+
+def trip_rows(rows):
+    for row in rows:
+        yield (trip_key(row),) + row
+
+
+class TelemetryLoader:
+    """Streams each CSV through the shared parsers into batched, idempotent upserts
+
+    Reruns overwrite rows with the same key instead of duplicating them, so a
+    file (or a ``since`` window of it) can be reloaded at any time; each batch
+    is committed on its own.
+    """
+
+    def __init__(self, conn, data_dir=None, batch_size=None):
+        self.conn = conn
+        self.data_dir = data_dir or Config.ANALYTICS_DATA_DIR
+        self.batch_size = batch_size or Config.CSV_BATCH_ROWS
+
+    def load(self, name, since=None, dry_run=False):
+        """Load one dataset; returns {"rows", "batches", "seconds", "rows_per_sec"}"""
+        table, columns, keys = TARGETS[name]
+        _, parser, parsed_columns = DATASETS[name]
+        path = dataset_path(self.data_dir, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+
+        rows = parser(path)
+        if since is not None:
+            date_index = parsed_columns.index("date")
+            rows = (row for row in rows if row[date_index] is not None and row[date_index] >= since)
+        if name == "trip_details":
+            rows = trip_rows(rows)
+
+        sql = upsert_sql(table, columns, keys)
+        started = time.monotonic()
+        count = batches = 0
+        cursor = None if dry_run else self.conn.cursor()
+        try:
+            for batch in iter_batches(rows, self.batch_size):
+                if cursor is not None:
+                    cursor.executemany(sql, batch)
+                    self.conn.commit()
+                count += len(batch)
+                batches += 1
+        except Exception:
+            if cursor is not None:
+                self.conn.rollback()
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+
+        seconds = time.monotonic() - started
+        stats = {
+            "rows": count,
+            "batches": batches,
+            "seconds": round(seconds, 2),
+            "rows_per_sec": round(count / seconds) if seconds > 0 else count
+        }
+        logger.info(f"📥 {table}: {stats}")
+        return stats
+
+    def load_all(self, names=None, since=None, dry_run=False):
+        return {name: self.load(name, since, dry_run) for name in names or TARGETS}
@@ -0,0 +1,41 @@
+# backend/gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py
+# Workers come from WEB_CONCURRENCY (read by gunicorn itself).
+import os
+
+bind = "0.0.0.0:5000"
+timeout = 120
+
+# SERVING_MODE=async serves asgi.py on uvicorn workers: one event loop per
+# worker holds many in-flight questions, so 1-2 workers are usually enough.
+serving_mode = os.getenv("SERVING_MODE", "sync").lower()
+if serving_mode == "async":
+    wsgi_app = "asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "wsgi:app"
+
+# PRELOAD_MODELS: import the app (and load the model weights) once in the
+# master; forked workers share the weights copy-on-write.
+preload_app = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+
+
+def when_ready(server):
+    from utils.process_stats import memory_usage, format_memory
+
+    server.log.info(f"📊 Master {os.getpid()} ready: {format_memory(memory_usage())}")
+
+
+def post_fork(server, worker):
+    # Sync workers set up their DB pool (and start the RAG warm-up) here, after the fork
+    # (asgi.py does the same in its before_serving hook)
+    if preload_app and serving_mode != "async":
+        from app import initialize_services
+
+        initialize_services()
+
+
+def post_worker_init(worker):
+    from utils.process_stats import memory_usage, format_memory
+
+    worker.log.info(f"👷 Worker {worker.pid} ready: {format_memory(memory_usage())}")
@@ -0,0 +1,170 @@
+from config import Config
+from datetime import date, datetime
+from decimal import Decimal
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Prompt template text around the context (see the build_prompt/build_messages of the LLM clients)
+PROMPT_OVERHEAD_TOKENS = 60
+
+
+def estimate_tokens(text):
+    """Rough token count (no tokenizer dependency): ~3.5 characters per token"""
+    return math.ceil(len(text) / Config.CONTEXT_CHARS_PER_TOKEN) if text else 0
+
+
+def format_value(value):
+    """Compact cell text: ISO dates, trimmed numbers, '-' for missing, long text cut short"""
+    if value is None:
+        return "-"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M") if (value.hour or value.minute) else value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (float, Decimal)):
+        return f"{float(value):.2f}".rstrip("0").rstrip(".")
+    text = " ".join(str(value).split())
+    limit = Config.CONTEXT_MAX_FIELD_CHARS
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def format_row(values):
+    """One SQL row as ``a | b | c``"""
+    return " | ".join(format_value(value) for value in values)
+
+
+def route_header(route, columns):
+    return f"{route.replace('_', ' ').title()} ({' | '.join(columns)}):"
+
+
+def token_set(text):
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class AssembledContext:
+    """Prompt context plus what went into it"""
+
+    def __init__(self, text, records_text, documents, record_counts, dropped, prompt_tokens):
+        self.text = text
+        self.records_text = records_text    # the "Database Records" part of text
+        self.documents = documents          # knowledge-base documents that made it into the prompt
+        self.record_counts = record_counts  # route -> rows included
+        self.dropped = dropped              # {"duplicates": n, "over_budget": n}
+        self.prompt_tokens = prompt_tokens
+
+    def stats(self):
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "documents": len(self.documents),
+            "records": self.record_counts,
+            "dropped": self.dropped
+        }
+
+
+class ContextAssembler:
+    """Builds the LLM context from vector-search chunks and routed SQL rows
+
+    1. Near-duplicate chunks (token-set Jaccard >= ``dedup_threshold``) are dropped.
+    2. Chunks and rows are ranked on one relevance scale: chunks by vector
+       distance, rows by their intent score, decaying with the row's position
+       in its (already priority-ordered) template result.
+    3. Evidence is packed best-first until ``token_budget`` is spent; rows use
+       a compact ``a | b | c`` format under one column header per route.
+    """
+
+    def __init__(self, token_budget=None, dedup_threshold=None, row_decay=None):
+        self.token_budget = token_budget or Config.CONTEXT_TOKEN_BUDGET
+        self.dedup_threshold = dedup_threshold or Config.CONTEXT_DEDUP_THRESHOLD
+        self.row_decay = row_decay or Config.CONTEXT_ROW_DECAY
+
+    def assemble(self, question, scored_documents, sql_results, intents, sql_unavailable_text):
+        """``scored_documents``: [(Document, distance)]; ``sql_results``: [QueryResult] or None"""
+        evidence = []
+        duplicates = 0
+
+        kept_sets = []
+        for doc, distance in scored_documents:
+            tokens = token_set(doc.page_content)
+            if any(jaccard(tokens, kept) >= self.dedup_threshold for kept in kept_sets):
+                duplicates += 1
+                continue
+            kept_sets.append(tokens)
+            relevance = 1.0 / (1.0 + max(float(distance), 0.0))
+            text = " ".join(doc.page_content.split())
+            evidence.append((relevance, "document", doc, text))
+
+        intent_scores = dict(intents.ranked)
+        headers = {}
+        for result in sql_results or []:
+            if not result.rows:
+                continue
+            route = result.name
+            headers[route] = route_header(route, result.columns)
+            base = min(1.0, intent_scores.get(route, Config.INTENT_THRESHOLD))
+            seen = set()
+            for position, row in enumerate(result.rows):
+                line = format_row(row)
+                if line in seen:
+                    duplicates += 1
+                    continue
+                seen.add(line)
+                evidence.append((base * self.row_decay ** position, route, position, line))
+
+        # Pack best-first; a route's header costs tokens only when its first row gets in
+        evidence.sort(key=lambda item: item[0], reverse=True)
+        budget = self.token_budget
+        chosen_documents, chosen_rows, over_budget = [], {}, 0
+        for _, kind, item, text in evidence:
+            cost = estimate_tokens(text) + 1
+            if kind != "document" and kind not in chosen_rows:
+                cost += estimate_tokens(headers[kind]) + 1
+            if cost > budget:
+                over_budget += 1
+                continue
+            budget -= cost
+            if kind == "document":
+                chosen_documents.append((item, text))
+            else:
+                chosen_rows.setdefault(kind, []).append((item, text))
+
+        sections = []
+        if chosen_documents:
+            sections.append("Knowledge base:\n" + "\n".join(
+                f"[{number}] {text}" for number, (_, text) in enumerate(chosen_documents, start=1)
+            ))
+
+        if sql_results is None:
+            records_text = sql_unavailable_text
+        elif chosen_rows:
+            # Each route's rows go back to their original (priority) order
+            records_text = "\n\n".join(
+                headers[route] + "\n" + "\n".join(text for _, text in sorted(chosen_rows[route]))
+                for route in (result.name for result in sql_results) if route in chosen_rows
+            )
+        else:
+            records_text = "No relevant data found in database for this query."
+        sections.append(f"Database Records:\n{records_text}")
+
+        text = "\n\n".join(sections)
+        prompt_tokens = estimate_tokens(text) + estimate_tokens(question) + PROMPT_OVERHEAD_TOKENS
+        context = AssembledContext(
+            text,
+            records_text,
+            [doc for doc, _ in chosen_documents],
+            {route: len(rows) for route, rows in chosen_rows.items()},
+            {"duplicates": duplicates, "over_budget": over_budget},
+            prompt_tokens
+        )
+        logger.info(f"🧩 Context: ~{prompt_tokens} prompt tokens, {context.stats()}")
+        return context
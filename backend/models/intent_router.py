@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from config import Config
+import logging
+import re
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Example questions per intent; their embeddings are the intent prototypes.
+# Every intent except "trend" has a matching SQL template in models/rag_engine.py.
+INTENT_PROTOTYPES = {
+    "incidents": [
+        "recent safety incidents and accidents",
+        "how many injuries or casualties happened at the mine",
+        "which incidents were critical or high severity",
+    ],
+    "maintenance_history": [
+        "maintenance history of the equipment",
+        "past repairs and their downtime and cost",
+        "when was the last breakdown repaired",
+    ],
+    "equipment": [
+        "which equipment needs maintenance",
+        "show me equipment with critical status",
+        "machines with low efficiency, high temperature or vibration alerts",
+    ],
+    "production": [
+        "what is our current production efficiency",
+        "tons of ore produced versus target",
+        "production output and downtime by site",
+    ],
+    "fuel": [
+        "how is our fuel consumption across sites",
+        "energy usage in kwh per equipment",
+        "diesel and power consumption by shift",
+    ],
+    "quality": [
+        "ore quality grade and defects found",
+        "quality inspection results by site",
+    ],
+    "safety": [
+        "safety compliance audit scores",
+        "safety violations found in audits and auditor recommendations",
+    ],
+    "trend": [
+        "how has this changed over time",
+        "monthly trend and history",
+    ],
+}
+
+# Keyword evidence (the old routing rules) boosts the embedding score
+INTENT_KEYWORDS = {
+    "incidents": ['incident', 'accident', 'safety', 'casualt', 'injur'],
+    "equipment": ['equipment', 'machine', 'maintenance', 'repair', 'breakdown', 'status'],
+    "production": ['production', 'output', 'tons', 'efficiency', 'downtime'],
+    "fuel": ['fuel', 'energy', 'consumption', 'power'],
+    "quality": ['quality', 'defect', 'grade', 'inspection'],
+    "safety": ['compliance', 'audit', 'violation'],
+    "trend": ['trend', 'history', 'over time'],
+}
+HISTORY_KEYWORDS = ['history', 'past', 'last', 'previous']
+
+
+class IntentResult:
+    """Ranked intents for one question, shared by SQL routing, recommendations and charts"""
+
+    def __init__(self, ranked, trend=False, embedding=None):
+        self.ranked = ranked  # [(intent, score)], best first, SQL intents only
+        self.trend = trend
+        self.embedding = embedding
+
+    @property
+    def intents(self):
+        return [intent for intent, _ in self.ranked] or ["mixed"]
+
+    def has(self, *names):
+        return any(name in self.intents for name in names)
+
+    def to_dict(self):
+        return {
+            "intents": [{"intent": intent, "score": round(score, 3)} for intent, score in self.ranked],
+            "trend": self.trend
+        }
+
+
+class IntentRouter:
+    """Classifies a question once against precomputed intent prototype embeddings"""
+
+    def __init__(self, embeddings, threshold=None, margin=None, max_intents=None, cache_size=None):
+        self.embeddings = embeddings
+        self.threshold = Config.INTENT_THRESHOLD if threshold is None else threshold
+        self.margin = Config.INTENT_MARGIN if margin is None else margin
+        self.max_intents = max_intents or Config.INTENT_MAX_INTENTS
+        self.cache_size = cache_size or Config.INTENT_CACHE_SIZE
+        self._prototype_matrix = None
+        self._prototype_owners = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(question):
+        return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", question.lower())).strip()
+
+    def classify(self, question):
+        """Return the IntentResult for ``question`` (cached per normalized question)"""
+        key = self.normalize(question)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        embedding, scores = None, {}
+        try:
+            question_embedding = self.embeddings.embed_query(question)
+            scores = self._prototype_scores(question_embedding)
+            embedding = question_embedding
+        except Exception as e:
+            logger.warning(f"⚠️ Intent embeddings unavailable, using keywords only: {e}")
+
+        for intent, boost in self._keyword_evidence(key).items():
+            scores[intent] = scores.get(intent, 0.0) + boost
+
+        result = self._select(scores, embedding)
+        if embedding is None:
+            return result  # keyword-only fallback: classify again once embeddings are back
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _select(self, scores, embedding):
+        # Without embeddings only keyword evidence is left to clear the bar
+        threshold = self.threshold if embedding is not None else Config.INTENT_KEYWORD_BOOST
+        trend = scores.pop("trend", 0.0) >= threshold
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if ranked:
+            best = ranked[0][1]
+            ranked = [
+                (intent, score) for intent, score in ranked
+                if score >= threshold and score >= best - self.margin
+            ][:self.max_intents]
+        return IntentResult(ranked, trend=trend, embedding=embedding)
+
+    def _keyword_evidence(self, normalized_question):
+        boosts = {}
+        for intent, words in INTENT_KEYWORDS.items():
+            if any(word in normalized_question for word in words):
+                boosts[intent] = Config.INTENT_KEYWORD_BOOST
+        # Equipment questions about the past want the maintenance log instead
+        if "equipment" in boosts and any(word in normalized_question for word in HISTORY_KEYWORDS):
+            boosts["maintenance_history"] = boosts.pop("equipment")
+        return boosts
+
+    def _prototype_scores(self, embedding):
+        matrix, owners = self._prototypes()
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        similarities = matrix @ query
+        scores = {}
+        for owner, similarity in zip(owners, similarities):
+            scores[owner] = max(scores.get(owner, -1.0), float(similarity))
+        return scores
+
+    def _prototypes(self):
+        """Embed every prototype once (single batch) and keep the normalized matrix"""
+        if self._prototype_matrix is None:
+            with self._lock:
+                if self._prototype_matrix is None:
+                    owners, texts = [], []
+                    for intent, examples in INTENT_PROTOTYPES.items():
+                        owners.extend([intent] * len(examples))
+                        texts.extend(examples)
+                    matrix = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+                    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+                    self._prototype_owners = owners
+                    self._prototype_matrix = matrix
+        return self._prototype_matrix, self._prototype_owners
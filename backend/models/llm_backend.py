@@ -0,0 +1,30 @@
+class LLMBackend:
+    """Interface implemented by every LLM client (MistralService, OllamaClient)
+
+    The primitives raise on failure; retries, coalescing and failover live in
+    models/llm_gateway.py and models/llm_router.py.
+    """
+
+    name = None
+    model = None
+
+    def complete(self, context, query, max_tokens=150):
+        """Return the answer text"""
+        raise NotImplementedError
+
+    def stream(self, context, query, max_tokens=150):
+        """Yield text deltas"""
+        raise NotImplementedError
+
+    async def acomplete(self, context, query, max_tokens=150):
+        """Async complete()"""
+        raise NotImplementedError
+
+    async def astream(self, context, query, max_tokens=150):
+        """Async stream() (an async generator)"""
+        raise NotImplementedError
+        yield
+
+    def check_health(self):
+        """Cheap readiness probe; True when the backend can be tried"""
+        return True
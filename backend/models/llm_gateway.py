@@ -0,0 +1,293 @@
+from config import Config
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Exception class names (anywhere in the MRO) that mean "try again": requests
+# and httpx timeouts / connection failures, without importing either library
+TRANSIENT_ERROR_NAMES = {
+    "TimeoutError", "ConnectionError", "Timeout", "TimeoutException",
+    "ConnectTimeout", "ReadTimeout", "TransportError", "RemoteProtocolError",
+}
+
+
+class LLMGatewayBusy(Exception):
+    """No LLM slot freed up within LLM_QUEUE_TIMEOUT"""
+
+
+def is_transient(error):
+    """Rate limits (429), upstream 5xx, timeouts and dropped connections are retried"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class _Flight:
+    """One upstream call that identical concurrent requests wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMGateway:
+    """Front door for an LLM client (MistralService, OllamaClient)
+
+    - identical prompts in flight at the same time share one upstream call
+    - at most ``max_concurrency`` upstream calls per process; extra callers
+      queue for up to ``queue_timeout`` seconds
+    - transient failures are retried with exponential backoff and full jitter
+    - the client (and its HTTP connection pool) lives as long as the gateway
+
+    Exposes the LLMBackend methods and raises on failure; LLMRouter turns
+    errors into answer text.
+    """
+
+    def __init__(self, backend, max_concurrency=None, queue_timeout=None,
+                 max_retries=None, backoff_base=None, backoff_max=None):
+        self.backend = backend
+        self.max_concurrency = max_concurrency or Config.LLM_MAX_CONCURRENCY
+        self.queue_timeout = Config.LLM_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or Config.LLM_BACKOFF_BASE
+        self.backoff_max = backoff_max or Config.LLM_BACKOFF_MAX
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._flights = {}
+        self._lock = threading.Lock()
+        # asyncio primitives belong to one event loop each: loop -> (slots, flights)
+        self._async_loops = {}
+        self._stats = {
+            "requests": 0, "upstream_calls": 0, "coalesced": 0, "retries": 0,
+            "failures": 0, "rejected": 0, "in_flight": 0, "queue_wait_seconds": 0.0
+        }
+
+    def fingerprint(self, context, query, max_tokens):
+        payload = json.dumps([self.backend.name, self.backend.model, context, query, max_tokens])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Blocking API
+
+    def complete(self, context, query, max_tokens=150):
+        """Answer text; raises after the retries are exhausted"""
+        key = self.fingerprint(context, query, max_tokens)
+        with self._lock:
+            self._stats["requests"] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._call_with_retries(self.backend.complete, context, query, max_tokens)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stream(self, context, query, max_tokens=150):
+        """Yield text deltas; retried only until the first delta has been sent"""
+        self._count("requests")
+        attempt = 0
+        while True:
+            self._acquire()
+            started_output = False
+            try:
+                for delta in self.backend.stream(context, query, max_tokens):
+                    started_output = True
+                    yield delta
+                return
+            except Exception as e:
+                if started_output or attempt >= self.max_retries or not is_transient(e):
+                    self._count("failures")
+                    raise
+                error = e
+            finally:
+                self._release()
+            attempt += 1
+            self._backoff(attempt, error)
+
+    def _call_with_retries(self, func, *args):
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    self._count("failures")
+                    raise
+                error = e
+            finally:
+                self._release()
+            attempt += 1
+            self._backoff(attempt, error)
+
+    def _acquire(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count("rejected")
+            raise LLMGatewayBusy(f"all {self.max_concurrency} LLM slots busy for {self.queue_timeout}s")
+        with self._lock:
+            self._stats["upstream_calls"] += 1
+            self._stats["in_flight"] += 1
+            self._stats["queue_wait_seconds"] += time.monotonic() - started
+
+    def _release(self):
+        with self._lock:
+            self._stats["in_flight"] -= 1
+        self._slots.release()
+
+    def _backoff(self, attempt, error):
+        delay = self._backoff_delay(attempt)
+        self._count("retries")
+        logger.warning(f"🔁 {self.backend.name} call failed ({error}), retry {attempt} in {delay:.2f}s")
+        time.sleep(delay)
+
+    def _backoff_delay(self, attempt):
+        """Full jitter: uniform in [0, min(max, base * 2^attempt)]"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    # Async API (async serving mode)
+
+    async def acomplete(self, context, query, max_tokens=150):
+        """Answer text; raises after the retries are exhausted
+
+        The upstream call runs as its own task that every caller (the first
+        one included) awaits through ``shield``: a cancelled caller stops
+        waiting without cancelling the call the others share.
+        """
+        key = self.fingerprint(context, query, max_tokens)
+        _, flights = self._loop_state()
+        self._count("requests")
+
+        flight = flights.get(key)
+        if flight is not None:
+            self._count("coalesced")
+        else:
+            flight = flights[key] = asyncio.ensure_future(
+                self._acall_with_retries(self.backend.acomplete, context, query, max_tokens)
+            )
+            flight.add_done_callback(lambda task: self._land(flights, key, task))
+        return await asyncio.shield(flight)
+
+    @staticmethod
+    def _land(flights, key, task):
+        if flights.get(key) is task:
+            del flights[key]
+        # Mark the exception as retrieved when every caller stopped waiting
+        if not task.cancelled():
+            task.exception()
+
+    async def astream(self, context, query, max_tokens=150):
+        self._count("requests")
+        attempt = 0
+        while True:
+            slots = await self._aacquire()
+            started_output = False
+            try:
+                async for delta in self.backend.astream(context, query, max_tokens):
+                    started_output = True
+                    yield delta
+                return
+            except Exception as e:
+                if started_output or attempt >= self.max_retries or not is_transient(e):
+                    self._count("failures")
+                    raise
+                error = e
+            finally:
+                self._arelease(slots)
+            attempt += 1
+            await self._abackoff(attempt, error)
+
+    async def _acall_with_retries(self, func, *args):
+        attempt = 0
+        while True:
+            slots = await self._aacquire()
+            try:
+                return await func(*args)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    self._count("failures")
+                    raise
+                error = e
+            finally:
+                self._arelease(slots)
+            attempt += 1
+            await self._abackoff(attempt, error)
+
+    def _loop_state(self):
+        """``(slots, flights)`` of the running event loop
+
+        Loops that have shut down (``asyncio.run`` per thread or per request)
+        are dropped whenever a new loop registers, so the map stays bounded
+        by the number of live loops.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._async_loops.get(loop)
+            if state is None:
+                for closed in [other for other in self._async_loops if other.is_closed()]:
+                    del self._async_loops[closed]
+                state = self._async_loops[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+        return state
+
+    async def _aacquire(self):
+        slots, _ = self._loop_state()
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._count("rejected")
+            raise LLMGatewayBusy(f"all {self.max_concurrency} LLM slots busy for {self.queue_timeout}s")
+        with self._lock:
+            self._stats["upstream_calls"] += 1
+            self._stats["in_flight"] += 1
+            self._stats["queue_wait_seconds"] += time.monotonic() - started
+        return slots
+
+    def _arelease(self, slots):
+        with self._lock:
+            self._stats["in_flight"] -= 1
+        slots.release()
+
+    async def _abackoff(self, attempt, error):
+        delay = self._backoff_delay(attempt)
+        self._count("retries")
+        logger.warning(f"🔁 {self.backend.name} call failed ({error}), retry {attempt} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    # Metrics
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_wait_seconds"] = round(stats["queue_wait_seconds"], 3)
+        stats["backend"] = self.backend.name
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
@@ -0,0 +1,305 @@
+from collections import deque
+from models.llm_gateway import LLMGateway, LLMGatewayBusy
+from models.mistral_client import MistralService
+from models.ollama_client import OllamaClient
+from config import Config
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Config.LLM_BACKENDS names -> client classes (all implement models/llm_backend.py)
+BACKEND_CLASSES = {
+    "mistral": MistralService,
+    "ollama": OllamaClient,
+}
+
+
+class AllBackendsFailed(Exception):
+    """Every configured LLM backend failed for this request"""
+
+
+class BackendState:
+    """Rolling latency and health of one backend (behind its own LLMGateway)
+
+    Latency samples are ``(recorded_at, seconds)`` and count for
+    LLM_LATENCY_MAX_AGE seconds, so a backend that has stopped getting
+    traffic is not judged forever on its last slow answers. The last
+    ``check_health()`` result is reused for LLM_HEALTH_CHECK_TTL seconds.
+    """
+
+    def __init__(self, gateway, priority):
+        self.gateway = gateway
+        self.priority = priority
+        self.latencies = {
+            "complete": deque(maxlen=Config.LLM_LATENCY_WINDOW),
+            "first_token": deque(maxlen=Config.LLM_LATENCY_WINDOW),
+        }
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.health_ok = True
+        self.health_checked_at = None
+        self.health_checking = False
+        self.stats = {"calls": 0, "failures": 0, "failovers_to": 0}
+
+    @property
+    def name(self):
+        return self.gateway.backend.name
+
+    def p95(self, kind, now):
+        samples = sorted(
+            seconds for recorded_at, seconds in self.latencies[kind]
+            if now - recorded_at <= Config.LLM_LATENCY_MAX_AGE
+        )
+        if len(samples) < Config.LLM_LATENCY_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+
+    def is_healthy(self, now):
+        return now >= self.unhealthy_until
+
+    def is_available(self, now):
+        """Out of cooldown and passing its last health check"""
+        return self.is_healthy(now) and self.health_ok
+
+    def needs_health_check(self, now):
+        """Never checked, check expired, or just back from a cooldown (which clears the check)"""
+        return (
+            not self.health_checking and self.is_healthy(now)
+            and (self.health_checked_at is None or now - self.health_checked_at >= Config.LLM_HEALTH_CHECK_TTL)
+        )
+
+    def is_degraded(self, now):
+        """p95 above its SLO (answers or time to first token)"""
+        p95_complete, p95_first_token = self.p95("complete", now), self.p95("first_token", now)
+        return (
+            (p95_complete is not None and p95_complete > Config.LLM_LATENCY_SLO)
+            or (p95_first_token is not None and p95_first_token > Config.LLM_FIRST_TOKEN_SLO)
+        )
+
+    def snapshot(self, now):
+        p95_complete, p95_first_token = self.p95("complete", now), self.p95("first_token", now)
+        return {
+            **self.stats,
+            "healthy": self.is_healthy(now),
+            "health_check_ok": self.health_ok,
+            "degraded": self.is_degraded(now),
+            "p95_seconds": round(p95_complete, 3) if p95_complete is not None else None,
+            "p95_first_token_seconds": round(p95_first_token, 3) if p95_first_token is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "gateway": self.gateway.stats()
+        }
+
+
+class LLMRouter:
+    """Routes each LLM call to the best backend and fails over to the next one
+
+    Backends keep their configured preference order (LLM_BACKENDS) while
+    healthy and within their latency SLOs. Backends failing their cached
+    ``check_health()`` probe (no API key, Ollama unreachable) are left out
+    without spending a user request on them. A backend whose rolling p95
+    exceeds its SLO is moved behind the others (slow ones ordered by p95),
+    except that every LLM_PROBE_EVERY-th call goes to the most preferred
+    slow backend first so its latency window keeps refreshing and it can
+    win its place back; one that fails LLM_FAILURE_THRESHOLD times in a row is skipped for
+    LLM_COOLDOWN seconds and health-checked again before it re-enters. If the chosen backend fails
+    (after its gateway's retries) the call moves on to the next backend;
+    streams fail over only before their first token.
+
+    The LLMBackend methods raise once every backend has failed;
+    ``generate_response`` / ``agenerate_response`` return an ERROR_PREFIX
+    text instead (the only place backend errors become answer text).
+    """
+
+    # Prefix of the fallback text returned when every backend failed
+    ERROR_PREFIX = "Error generating response"
+
+    def __init__(self, backends):
+        self._states = [BackendState(LLMGateway(backend), priority) for priority, backend in enumerate(backends)]
+        self._lock = threading.Lock()
+        self._calls = 0
+        if not self._states:
+            raise ValueError("LLMRouter needs at least one backend")
+
+    @classmethod
+    def from_config(cls, names=None):
+        backends = []
+        for name in names or Config.LLM_BACKENDS:
+            backend_class = BACKEND_CLASSES.get(name)
+            if backend_class is None:
+                logger.warning(f"⚠️ Unknown LLM backend '{name}' in LLM_BACKENDS, skipping")
+                continue
+            backends.append(backend_class())
+        logger.info(f"🧠 LLM backends: {', '.join(backend.name for backend in backends)}")
+        return cls(backends)
+
+    def get_backend(self, name):
+        for state in self._states:
+            if state.name == name:
+                return state.gateway.backend
+        return None
+
+    def ordered_backends(self):
+        """Candidate backends for the next call, best first"""
+        self._check_health()
+        with self._lock:
+            now = time.monotonic()
+            order = self._order(now)
+            self._calls += 1
+            if Config.LLM_PROBE_EVERY and self._calls % Config.LLM_PROBE_EVERY == 0:
+                order = self._probe(order, now)
+            return order
+
+    def _check_health(self):
+        """Refresh expired health checks, outside the lock (a probe may be an HTTP call)"""
+        with self._lock:
+            now = time.monotonic()
+            due = [state for state in self._states if state.needs_health_check(now)]
+            for state in due:
+                state.health_checking = True
+        for state in due:
+            try:
+                ok = bool(state.gateway.backend.check_health())
+            except Exception as e:
+                logger.warning(f"⚠️ Health check of LLM backend '{state.name}' failed: {e}")
+                ok = False
+            with self._lock:
+                if ok != state.health_ok:
+                    logger.info(f"🩺 LLM backend '{state.name}' {'passes' if ok else 'fails'} its health check")
+                state.health_ok, state.health_checked_at = ok, time.monotonic()
+                state.health_checking = False
+
+    def _order(self, now):
+        # Nothing available: try them all rather than fail outright
+        candidates = [state for state in self._states if state.is_available(now)] or list(self._states)
+        fast = sorted((state for state in candidates if not state.is_degraded(now)), key=lambda state: state.priority)
+        slow = sorted(
+            (state for state in candidates if state.is_degraded(now)),
+            key=lambda state: state.p95("first_token", now) or state.p95("complete", now) or 0
+        )
+        return fast + slow
+
+    def _probe(self, order, now):
+        """Move the most preferred slow backend to the front if it outranks the leader"""
+        slow = [state for state in order if state.is_degraded(now)]
+        if not slow:
+            return order
+        probe = min(slow, key=lambda state: state.priority)
+        if probe.priority > order[0].priority:
+            return order
+        return [probe] + [state for state in order if state is not probe]
+
+    # Blocking API
+
+    def complete(self, context, query, max_tokens=150):
+        errors = []
+        for position, state in enumerate(self.ordered_backends()):
+            started = time.monotonic()
+            try:
+                answer = state.gateway.complete(context, query, max_tokens)
+            except Exception as e:
+                self._record_failure(state, e, errors)
+                continue
+            self._record_success(state, "complete", time.monotonic() - started, position)
+            return answer
+        raise AllBackendsFailed("; ".join(errors))
+
+    def stream(self, context, query, max_tokens=150):
+        errors = []
+        for position, state in enumerate(self.ordered_backends()):
+            started = time.monotonic()
+            first_token = True
+            try:
+                for delta in state.gateway.stream(context, query, max_tokens):
+                    if first_token:
+                        first_token = False
+                        self._record_success(state, "first_token", time.monotonic() - started, position)
+                    yield delta
+                return
+            except Exception as e:
+                self._record_failure(state, e, errors)
+                if not first_token:
+                    raise
+        raise AllBackendsFailed("; ".join(errors))
+
+    def generate_response(self, context, query, max_tokens=150):
+        try:
+            return self.complete(context, query, max_tokens)
+        except Exception as e:
+            return f"{self.ERROR_PREFIX}: {str(e)}"
+
+    # Async API (async serving mode)
+
+    async def acomplete(self, context, query, max_tokens=150):
+        errors = []
+        for position, state in enumerate(self.ordered_backends()):
+            started = time.monotonic()
+            try:
+                answer = await state.gateway.acomplete(context, query, max_tokens)
+            except Exception as e:
+                self._record_failure(state, e, errors)
+                continue
+            self._record_success(state, "complete", time.monotonic() - started, position)
+            return answer
+        raise AllBackendsFailed("; ".join(errors))
+
+    async def astream(self, context, query, max_tokens=150):
+        errors = []
+        for position, state in enumerate(self.ordered_backends()):
+            started = time.monotonic()
+            first_token = True
+            try:
+                async for delta in state.gateway.astream(context, query, max_tokens):
+                    if first_token:
+                        first_token = False
+                        self._record_success(state, "first_token", time.monotonic() - started, position)
+                    yield delta
+                return
+            except Exception as e:
+                self._record_failure(state, e, errors)
+                if not first_token:
+                    raise
+        raise AllBackendsFailed("; ".join(errors))
+
+    async def agenerate_response(self, context, query, max_tokens=150):
+        try:
+            return await self.acomplete(context, query, max_tokens)
+        except Exception as e:
+            return f"{self.ERROR_PREFIX}: {str(e)}"
+
+    # Bookkeeping
+
+    def _record_success(self, state, kind, seconds, position):
+        with self._lock:
+            state.latencies[kind].append((time.monotonic(), seconds))
+            state.consecutive_failures = 0
+            state.stats["calls"] += 1
+            if position > 0:
+                state.stats["failovers_to"] += 1
+
+    def _record_failure(self, state, error, errors):
+        errors.append(f"{state.name}: {error}")
+        with self._lock:
+            state.stats["calls"] += 1
+            state.stats["failures"] += 1
+            # A full queue says nothing about the backend's health
+            if isinstance(error, LLMGatewayBusy):
+                return
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= Config.LLM_FAILURE_THRESHOLD:
+                state.unhealthy_until = time.monotonic() + Config.LLM_COOLDOWN
+                state.consecutive_failures = 0
+                state.health_checked_at = None  # check again before it re-enters
+                logger.warning(f"🚑 LLM backend '{state.name}' unhealthy, skipping it for {Config.LLM_COOLDOWN}s")
+                return
+        logger.warning(f"↪️ LLM backend '{state.name}' failed ({error}), failing over")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "order": [state.name for state in self._order(now)],
+                "backends": {state.name: state.snapshot(now) for state in self._states}
+            }
@@ -1,15 +1,17 @@
 from mistralai import Mistral
+from models.llm_backend import LLMBackend
 from config import Config
 
-class MistralService:
+class MistralService(LLMBackend):
+    name = "mistral"
+
     def __init__(self):
+        # One client per process: its HTTP connection pool stays warm across requests
         self.client = Mistral(api_key=Config.MISTRAL_API_KEY)
         self.model = "mistral-small-latest"
-    
-    def generate_response(self, context, query, max_tokens=150):
-        """
-        Generate concise 3-4 sentence response
-        """
+
+    def build_messages(self, context, query):
+        """Chat messages for the concise manager-facing answer"""
         prompt = f"""You are an expert mining and infrastructure management assistant.
 Using the following context, provide a concise answer in 3-4 sentences maximum.
 Be specific, actionable, and focus on key insights for managers.
@@ -21,17 +23,54 @@ Question: {query}
 
 Concise Answer (3-4 sentences):"""
 
-        messages = [{"role": "user", "content": prompt}]
-        
-        try:
-            response = self.client.chat.complete(
-                model=self.model,
-                messages=messages,
-                max_tokens=max_tokens,
-                temperature=0.7
-            )
-            
-            answer = response.choices[0].message.content.strip()
-            return answer
-        except Exception as e:
-            return f"Error generating response: {str(e)}"
\ No newline at end of file
+        return [{"role": "user", "content": prompt}]
+
+    def complete(self, context, query, max_tokens=150):
+        """Answer text; raises on API errors (retries live in models/llm_gateway.py)"""
+        response = self.client.chat.complete(
+            model=self.model,
+            messages=self.build_messages(context, query),
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        return response.choices[0].message.content.strip()
+
+    def stream(self, context, query, max_tokens=150):
+        """Yield text deltas; raises on API errors"""
+        stream = self.client.chat.stream(
+            model=self.model,
+            messages=self.build_messages(context, query),
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        for event in stream:
+            delta = event.data.choices[0].delta.content
+            if delta:
+                yield delta
+
+    async def acomplete(self, context, query, max_tokens=150):
+        """Async complete() (no thread is held while waiting)"""
+        response = await self.client.chat.complete_async(
+            model=self.model,
+            messages=self.build_messages(context, query),
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        return response.choices[0].message.content.strip()
+
+    async def astream(self, context, query, max_tokens=150):
+        """Async stream()"""
+        stream = await self.client.chat.stream_async(
+            model=self.model,
+            messages=self.build_messages(context, query),
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+        async for event in stream:
+            delta = event.data.choices[0].delta.content
+            if delta:
+                yield delta
+
+    def check_health(self):
+        """No API key, no cloud answers"""
+        return bool(Config.MISTRAL_API_KEY)
@@ -1,21 +1,29 @@
 import requests
+import httpx
 import json
+from models.llm_backend import LLMBackend
 from config import Config
 
-class OllamaClient:
+class OllamaClient(LLMBackend):
     """
     FREE Local LLM using Ollama
     Models: mistral, llama2, codellama, etc.
     """
+    name = "ollama"
+
     def __init__(self):
         self.base_url = f"http://{Config.OLLAMA_HOST}:{Config.OLLAMA_PORT}"
         self.model = Config.OLLAMA_MODEL
-        
-    def generate_response(self, context, query, max_tokens=150):
-        """
-        Generate 3-4 sentence concise response
-        """
-        prompt = f"""You are an expert mining and infrastructure management assistant.
+        # (connect, read) seconds; read applies between streamed chunks
+        self.timeout = (Config.OLLAMA_CONNECT_TIMEOUT, Config.OLLAMA_READ_TIMEOUT)
+        # Keep-alive connection pool reused by every request of this process
+        self.session = requests.Session()
+        # Created on first async call (bound to the serving event loop)
+        self._async_client = None
+
+    def build_prompt(self, context, query):
+        """Prompt for the concise manager-facing answer"""
+        return f"""You are an expert mining and infrastructure management assistant.
 Using the following context, provide a concise answer in 3-4 sentences maximum.
 Be specific, actionable, and focus on key insights for managers.
 
@@ -26,34 +34,90 @@ Question: {query}
 
 Concise Answer (3-4 sentences):"""
 
-        try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "num_predict": max_tokens,
-                        "temperature": 0.7
-                    }
-                },
-                timeout=30
+    def build_payload(self, context, query, max_tokens, stream):
+        return {
+            "model": self.model,
+            "prompt": self.build_prompt(context, query),
+            "stream": stream,
+            # Keep the model loaded between questions instead of Ollama's 5 minute default
+            "keep_alive": Config.OLLAMA_KEEP_ALIVE,
+            "options": {
+                "num_predict": max_tokens,
+                "temperature": 0.7
+            }
+        }
+
+    def complete(self, context, query, max_tokens=150):
+        """Answer text; raises on HTTP/connection errors (retries live in models/llm_gateway.py)"""
+        response = self.session.post(
+            f"{self.base_url}/api/generate",
+            json=self.build_payload(context, query, max_tokens, stream=False),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()['response'].strip()
+
+    def stream(self, context, query, max_tokens=150):
+        """Yield text deltas from Ollama's NDJSON stream; raises on errors"""
+        with self.session.post(
+            f"{self.base_url}/api/generate",
+            json=self.build_payload(context, query, max_tokens, stream=True),
+            stream=True,
+            timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+    def _async_http(self):
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(Config.OLLAMA_READ_TIMEOUT, connect=Config.OLLAMA_CONNECT_TIMEOUT)
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result['response'].strip()
-            else:
-                return "Unable to generate response. Please try again."
-                
-        except Exception as e:
-            return f"Error: {str(e)}"
-    
+        return self._async_client
+
+    async def acomplete(self, context, query, max_tokens=150):
+        """Async complete()"""
+        response = await self._async_http().post(
+            "/api/generate",
+            json=self.build_payload(context, query, max_tokens, stream=False)
+        )
+        response.raise_for_status()
+        return response.json()['response'].strip()
+
+    async def astream(self, context, query, max_tokens=150):
+        """Async stream()"""
+        async with self._async_http().stream(
+            "POST",
+            "/api/generate",
+            json=self.build_payload(context, query, max_tokens, stream=True)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
     def check_health(self):
-        """Check if Ollama is running"""
+        """Check if Ollama is running (used by models/llm_router.py before routing to it)"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=Config.OLLAMA_CONNECT_TIMEOUT)
             return response.status_code == 200
-        except:
-            return False
\ No newline at end of file
+        except requests.RequestException:
+            return False
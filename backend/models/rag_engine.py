@@ -1,80 +1,671 @@
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.docstore.document import Document
-from utils.langchain_setup import langchain_setup
+from utils.langchain_setup import get_langchain_setup
 from utils.chromadb_manager import ChromaDBManager
+from utils.answer_cache import SemanticAnswerCache
+from utils.embedding_service import get_embedding_service
 from database.db_config import get_mysql_connection
-from models.mistral_client import MistralService
+from database import aggregates, async_db
+from database.analytics_store import analytics_store
+from database.availability_engine import availability_engine
+from database.query_result import QueryResult
+from models.llm_router import LLMRouter
+from models.intent_router import IntentRouter
+from models.context_assembler import ContextAssembler
 from config import Config
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import date, timedelta
+import asyncio
 import logging
+import re
+import time
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Routed SQL context queries, one per intent (see models/intent_router.py)
+SQL_TEMPLATES = {
+    "incidents": """
+        SELECT
+            incident_date,
+            mine_name,
+            incident_type,
+            severity,
+            description,
+            casualties,
+            injuries,
+            cost_impact,
+            response_time_minutes
+        FROM mining_incidents
+        WHERE incident_date >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)
+        ORDER BY
+            CASE severity
+                WHEN 'Critical' THEN 4
+                WHEN 'High' THEN 3
+                WHEN 'Medium' THEN 2
+                ELSE 1
+            END DESC,
+            incident_date DESC
+        LIMIT 8
+    """,
+    "maintenance_history": """
+        SELECT
+            mr.equipment_id,
+            mr.maintenance_type,
+            mr.start_date,
+            mr.end_date,
+            mr.cost,
+            mr.downtime_hours,
+            em.equipment_type
+        FROM maintenance_repairs mr
+        LEFT JOIN equipment_monitoring em ON mr.equipment_id = em.equipment_id
+        ORDER BY mr.start_date DESC
+        LIMIT 6
+    """,
+    "equipment": """
+        SELECT
+            equipment_id,
+            equipment_type,
+            status,
+            efficiency_score,
+            alerts,
+            temperature_celsius,
+            vibration_level,
+            last_maintenance,
+            next_maintenance
+        FROM equipment_monitoring
+        WHERE status != 'Operational' OR efficiency_score < 80
+        ORDER BY
+            CASE status
+                WHEN 'Critical' THEN 4
+                WHEN 'Maintenance' THEN 3
+                WHEN 'Offline' THEN 2
+                ELSE 1
+            END DESC,
+            efficiency_score ASC
+        LIMIT 8
+    """,
+    "production": """
+        SELECT
+            metric_date,
+            site_name,
+            material_type,
+            quantity_tons,
+            efficiency_percentage,
+            downtime_hours,
+            target_tons,
+            cost_per_ton
+        FROM production_metrics
+        WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+        ORDER BY metric_date DESC, quantity_tons DESC
+        LIMIT 8
+    """,
+    "fuel": """
+        SELECT
+            equipment_id,
+            reading_date,
+            fuel_liters,
+            energy_kwh,
+            shift
+        FROM fuel_energy
+        WHERE reading_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
+        ORDER BY reading_date DESC, energy_kwh DESC
+        LIMIT 6
+    """,
+    "quality": """
+        SELECT
+            site_name,
+            metric_date,
+            material_type,
+            quality_grade,
+            defects_found
+        FROM quality_metrics
+        WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+        ORDER BY metric_date DESC, defects_found DESC
+        LIMIT 6
+    """,
+    "safety": """
+        SELECT
+            audit_date,
+            site_name,
+            compliance_score,
+            violations,
+            auditor_name,
+            recommendations
+        FROM safety_compliance
+        ORDER BY audit_date DESC
+        LIMIT 5
+    """,
+    "mixed": """
+        (SELECT
+            'incident' as source_type,
+            incident_date as date,
+            mine_name as name,
+            severity as metric,
+            description as details
+        FROM mining_incidents
+        ORDER BY incident_date DESC
+        LIMIT 2)
+
+        UNION ALL
+
+        (SELECT
+            'equipment' as source_type,
+            updated_at as date,
+            equipment_id as name,
+            status as metric,
+            alerts as details
+        FROM equipment_monitoring
+        WHERE status != 'Operational'
+        ORDER BY updated_at DESC
+        LIMIT 2)
+
+        UNION ALL
+
+        (SELECT
+            'production' as source_type,
+            metric_date as date,
+            site_name as name,
+            efficiency_percentage as metric,
+            CONCAT('Production: ', quantity_tons, ' tons') as details
+        FROM production_metrics
+        ORDER BY metric_date DESC
+        LIMIT 2)
+
+        ORDER BY date DESC
+    """,
+}
+
+# Knowledge-base document types worth searching for each intent (None = whole collection)
+ROUTE_DOC_TYPES = {
+    "incidents": ["incidents", "safety"],
+    "maintenance_history": ["maintenance", "equipment"],
+    "equipment": ["equipment", "maintenance"],
+    "production": ["production"],
+    "fuel": ["fuel"],
+    "quality": ["quality"],
+    "safety": ["safety", "incidents"],
+    "mixed": None,
+}
+
+# Chart derived from each route's rows: (chart type, label column, summed value columns or None to count)
+ROUTE_CHARTS = {
+    "incidents": ("doughnut", "severity", None),
+    "equipment": ("doughnut", "status", None),
+    "maintenance_history": ("bar", "start_date", ["downtime_hours"]),
+    "production": ("line", "metric_date", ["quantity_tons", "target_tons"]),
+    "fuel": ("bar", "reading_date", ["fuel_liters", "energy_kwh"]),
+    "quality": ("bar", "metric_date", ["defects_found"]),
+    "safety": ("line", "audit_date", ["compliance_score", "violations"]),
+    "availability": ("bar", "equipment", ["uptime_pct"]),
+}
+
+# Routes whose context also gets the per-equipment availability table (database/availability_engine.py)
+AVAILABILITY_ROUTES = {"equipment", "maintenance_history", "mixed"}
+
+RELATIVE_PERIOD = re.compile(r"\b(?:last|past|previous)\s+(\d+)\s+(day|week|month|year)s?\b")
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+
+def answer_cache_status(answer, cache_key):
+    return "hit" if answer is not None else ("miss" if cache_key else "disabled")
+
+
+class _StreamedAnswer:
+    """Text of an answer streamed as ``token`` events (query_stream/aquery_stream)
+
+    Cached answers are replayed as one token; a fresh answer is remembered
+    only when the LLM stream finished without an error.
+    """
+
+    def __init__(self, cached, cache_key):
+        self.parts = []
+        self.cached = cached
+        self.cache_key = cache_key
+        self.failed = False
+        self.cache_status = answer_cache_status(cached, cache_key)
+
+    def token(self, delta):
+        self.parts.append(delta)
+        return "token", {"text": delta}
+
+    def fail(self, error):
+        # Partial text plus the error is shown, but never cached
+        self.failed = True
+        return self.token(f"{LLMRouter.ERROR_PREFIX}: {str(error)}")
+
+    @property
+    def text(self):
+        if self.cached is not None:
+            return self.cached
+        return "".join(self.parts).strip()
+
+
 class RAGEngine:
+    # Placeholder context when the SQL stage misses its budget
+    SQL_CONTEXT_UNAVAILABLE = "Database records unavailable for this answer."
+
     def __init__(self):
-        self.chroma_manager = ChromaDBManager()
-        self.mistral = MistralService()
+        self.embeddings = get_embedding_service()
+        self.chroma_manager = ChromaDBManager(embeddings=self.embeddings)
+        # LLM backends (LLM_BACKENDS), each behind its own gateway, with latency-aware failover
+        self.llm = LLMRouter.from_config()
+        self.mistral = self.llm.get_backend("mistral")
+        self.intent_router = IntentRouter(self.embeddings)
+        # Dedups and packs vector + SQL evidence into the prompt token budget
+        self.context_assembler = ContextAssembler()
         # ✅ ADDED: Initialize LangChain prompt and components
-        self.prompt = langchain_setup.create_custom_prompt()
+        self.prompt = get_langchain_setup().create_custom_prompt()
+        self.answer_cache = (
+            SemanticAnswerCache(
+                max_entries=Config.ANSWER_CACHE_MAX_ENTRIES,
+                threshold=Config.ANSWER_CACHE_SIMILARITY
+            )
+            if Config.ANSWER_CACHE_ENABLED else None
+        )
+        # Bounded pool shared by all requests for the independent query stages
+        self.executor = ThreadPoolExecutor(
+            max_workers=Config.RAG_MAX_WORKERS,
+            thread_name_prefix="rag-stage"
+        )
         
     def query(self, question, language='en'):
         """
         Returns structured response for chat interface
         """
         try:
-            # 1. Vector Search + SQL Context + AI Answer (existing code)
-            relevant_docs = self.chroma_manager.similarity_search(question, k=Config.TOP_K_RESULTS)
-            sql_context = self.get_sql_context(question)
-            vector_context = "\n\n".join([doc.page_content for doc in relevant_docs])
-            full_context = f"{vector_context}\n\nDatabase Records:\n{sql_context}"
-            answer = self.mistral.generate_response(full_context, question)
-            
-            # 2. Get Enhanced Visualization Data
-            viz_data = self.get_enhanced_visualization_data(question)
-            
-            # 3. Generate Manager Recommendations
-            recommendations = self.generate_recommendations(question, answer, viz_data)
-            
-            return {
-                "answer": answer,
-                "type": "ai_response",  # ✅ Identify response type
-                "visualizations": {
-                    "kpis": viz_data["kpis"],
-                    "charts": self.filter_relevant_charts(question, viz_data["charts"]),
-                    "tables": self.extract_data_tables(question, sql_context)
-                },
-                "recommendations": recommendations,
-                "sources": [doc.metadata for doc in relevant_docs],
-                "language": language
-            }
+            started = time.monotonic()
+            dropped_sections = []
+
+            # 1. Independent stages run in parallel: vector search, SQL context, visualizations
+            intents, stages = self._start_stages(question)
+            (scored_docs, question_embedding), sql_results = self._collect_context(
+                stages, started, dropped_sections
+            )
+
+            # 2. AI Answer (only depends on retrieval + SQL context)
+            context = self._assemble_context(question, scored_docs, sql_results, intents)
+            answer, cache_key = self._cached_answer(sql_results, question_embedding)
+            cache_status = answer_cache_status(answer, cache_key)
+            if answer is None:
+                answer = self.llm.generate_response(context.text, question)
+                self._remember_answer(cache_key, question, answer)
+
+            # 3. Visualization data has been loading while the LLM was answering
+            viz_data = self._collect_visualizations(stages, started, dropped_sections)
+
+            # 4. Generate Manager Recommendations
+            recommendations = self.generate_recommendations(question, answer, viz_data, intents)
+
+            return self._answer_payload(
+                answer, recommendations, context, intents, dropped_sections, cache_status, language,
+                visualizations=self._build_visualizations(question, viz_data, sql_results, intents)
+            )
         except Exception as e:
             logger.error(f"❌ RAG query error: {e}")
-            return {
-                "answer": f"Error processing query: {str(e)}",
-                "type": "error",
-                "visualizations": {},
-                "recommendations": [],
-                "sources": [],
-                "language": language
-            }
+            return self._error_payload(e, language)
+
+    async def aquery(self, question, language='en'):
+        """
+        Async variant of query() for the async serving mode (asgi.py).
+
+        SQL runs on the aiomysql pool and the LLM call is awaited, so no
+        thread is held while the model answers; embedding and Chroma work
+        (CPU bound, synchronous libraries) run on the stage executor.
+        """
+        try:
+            started = time.monotonic()
+            dropped_sections = []
+
+            intents, stages = await self._astart_stages(question)
+            scored_docs, question_embedding = await self._acollect_stage(
+                stages["retrieval"], "sources", started, Config.RAG_RETRIEVAL_TIMEOUT,
+                ([], None), dropped_sections
+            )
+            sql_results = await self._acollect_stage(
+                stages["sql"], "tables", started, Config.RAG_SQL_TIMEOUT,
+                None, dropped_sections
+            )
+
+            context = self._assemble_context(question, scored_docs, sql_results, intents)
+            answer, cache_key = await self._in_executor(self._cached_answer, sql_results, question_embedding)
+            cache_status = answer_cache_status(answer, cache_key)
+            if answer is None:
+                answer = await self.llm.agenerate_response(context.text, question)
+                self._remember_answer(cache_key, question, answer)
+
+            viz_data = await self._acollect_visualizations(stages, started, dropped_sections)
+            recommendations = self.generate_recommendations(question, answer, viz_data, intents)
+
+            return self._answer_payload(
+                answer, recommendations, context, intents, dropped_sections, cache_status, language,
+                visualizations=self._build_visualizations(question, viz_data, sql_results, intents)
+            )
+        except Exception as e:
+            logger.error(f"❌ RAG async query error: {e}")
+            return self._error_payload(e, language)
+
+    def _answer_payload(self, answer, recommendations, context, intents,
+                        dropped_sections, cache_status, language, **extra):
+        """query() result and the stream's ``done`` event (which sent its visualizations first)"""
+        return {
+            "answer": answer,
+            "type": "ai_response",  # ✅ Identify response type
+            **extra,
+            "recommendations": recommendations,
+            "sources": [doc.metadata for doc in context.documents],
+            "intents": intents.to_dict(),
+            "prompt_tokens": context.prompt_tokens,
+            "dropped_sections": dropped_sections,
+            "answer_cache": cache_status,
+            "language": language
+        }
+
+    def _error_payload(self, error, language):
+        return {
+            "answer": f"Error processing query: {str(error)}",
+            "type": "error",
+            "visualizations": {},
+            "recommendations": [],
+            "sources": [],
+            "dropped_sections": [],
+            "language": language
+        }
+
+    def query_stream(self, question, language='en'):
+        """
+        Streaming variant of query(): yields ``(event, payload)`` pairs.
+
+        ``visualizations`` is sent as soon as the SQL stage is done, followed
+        by ``token`` events while the LLM generates, and a final ``done``
+        event with recommendations, sources, prompt size and dropped sections.
+        """
+        started = time.monotonic()
+        dropped_sections = []
+
+        try:
+            intents, stages = self._start_stages(question)
+            sql_results = self._collect_stage(
+                stages["sql"], "tables", started, Config.RAG_SQL_TIMEOUT,
+                None, dropped_sections
+            )
+            viz_data = self._collect_visualizations(stages, started, dropped_sections)
+            yield "visualizations", self._build_visualizations(question, viz_data, sql_results, intents)
+
+            scored_docs, question_embedding = self._collect_stage(
+                stages["retrieval"], "sources", started, Config.RAG_RETRIEVAL_TIMEOUT,
+                ([], None), dropped_sections
+            )
+            context = self._assemble_context(question, scored_docs, sql_results, intents)
+            answer = _StreamedAnswer(*self._cached_answer(sql_results, question_embedding))
+            if answer.cached is not None:
+                yield answer.token(answer.cached)
+            else:
+                try:
+                    for delta in self.llm.stream(context.text, question):
+                        yield answer.token(delta)
+                except Exception as e:
+                    yield answer.fail(e)
+
+            yield "done", self._stream_done(question, answer, viz_data, intents, context, dropped_sections, language)
+        except Exception as e:
+            logger.error(f"❌ RAG stream error: {e}")
+            yield "error", self._stream_error(e, language)
+
+    async def aquery_stream(self, question, language='en'):
+        """Async variant of query_stream() (same events) for the async serving mode"""
+        started = time.monotonic()
+        dropped_sections = []
+
+        try:
+            intents, stages = await self._astart_stages(question)
+            sql_results = await self._acollect_stage(
+                stages["sql"], "tables", started, Config.RAG_SQL_TIMEOUT,
+                None, dropped_sections
+            )
+            viz_data = await self._acollect_visualizations(stages, started, dropped_sections)
+            yield "visualizations", self._build_visualizations(question, viz_data, sql_results, intents)
+
+            scored_docs, question_embedding = await self._acollect_stage(
+                stages["retrieval"], "sources", started, Config.RAG_RETRIEVAL_TIMEOUT,
+                ([], None), dropped_sections
+            )
+            context = self._assemble_context(question, scored_docs, sql_results, intents)
+            answer = _StreamedAnswer(*await self._in_executor(self._cached_answer, sql_results, question_embedding))
+            if answer.cached is not None:
+                yield answer.token(answer.cached)
+            else:
+                try:
+                    async for delta in self.llm.astream(context.text, question):
+                        yield answer.token(delta)
+                except Exception as e:
+                    yield answer.fail(e)
+
+            yield "done", self._stream_done(question, answer, viz_data, intents, context, dropped_sections, language)
+        except Exception as e:
+            logger.error(f"❌ RAG async stream error: {e}")
+            yield "error", self._stream_error(e, language)
+
+    def _stream_done(self, question, answer, viz_data, intents, context, dropped_sections, language):
+        """``done`` event payload; caches a freshly streamed answer that completed"""
+        text = answer.text
+        if answer.cached is None and not answer.failed:
+            self._remember_answer(answer.cache_key, question, text)
+        return self._answer_payload(
+            text, self.generate_recommendations(question, text, viz_data, intents),
+            context, intents, dropped_sections, answer.cache_status, language
+        )
+
+    def _stream_error(self, error, language):
+        return {
+            "answer": f"Error processing query: {str(error)}",
+            "type": "error",
+            "language": language
+        }
+
+    def _start_stages(self, question):
+        """Classify the question, then submit the independent stages to the bounded executor
+
+        Returns ``(intents, stages)``. The intent result (and the question
+        embedding it carries) is shared by every stage and by the
+        recommendation and chart filters.
+        """
+        intents = self.intent_router.classify(question)
+        logger.info(f"🧭 Question intents: {intents.intents}")
+        return intents, {
+            "retrieval": self.executor.submit(self.retrieve_documents, question, intents),
+            "sql": self.executor.submit(self.get_sql_rows, question, intents),
+            "viz": self.executor.submit(self.get_enhanced_visualization_data, question),
+        }
+
+    async def _astart_stages(self, question):
+        """Async _start_stages(): the SQL stage is a coroutine, the rest use the stage executor"""
+        intents = await self._in_executor(self.intent_router.classify, question)
+        logger.info(f"🧭 Question intents: {intents.intents}")
+        return intents, {
+            "retrieval": asyncio.ensure_future(self._in_executor(self.retrieve_documents, question, intents)),
+            "sql": asyncio.ensure_future(self.aget_sql_rows(question, intents)),
+            "viz": asyncio.ensure_future(self._in_executor(self.get_enhanced_visualization_data, question)),
+        }
+
+    def _in_executor(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def retrieve_documents(self, question, intents=None):
+        """Run a scoped vector search with the question embedding
+
+        Returns ``([(document, distance)], question_embedding)``; distances
+        rank the chunks in the context assembler and the embedding is reused
+        by the answer cache.
+        """
+        intents = intents or self.intent_router.classify(question)
+        embedding = intents.embedding
+        if embedding is None:
+            embedding = self.embeddings.embed_query(question)
+        scopes = self.build_search_scopes(question, intents)
+        pairs, where = self.chroma_manager.similarity_search_scoped(
+            question, scopes, k=Config.TOP_K_RESULTS, embedding=embedding
+        )
+        logger.info(f"🔎 Vector search scope: {where}")
+        return pairs, embedding
+
+    def build_search_scopes(self, question, intents):
+        """Chroma `where` filters for the question, narrowest first, ending with no filter"""
+        doc_types = []
+        for intent in intents.intents:
+            if ROUTE_DOC_TYPES.get(intent) is None:
+                doc_types = []
+                break
+            doc_types.extend(t for t in ROUTE_DOC_TYPES[intent] if t not in doc_types)
+        type_filter = None
+        if doc_types:
+            type_filter = {"type": {"$in": doc_types}} if len(doc_types) > 1 else {"type": doc_types[0]}
+
+        narrowing = []
+        query_lower = question.lower()
+        known_sites, _ = aggregates.get_aggregate("known_sites")
+        sites = [site for site in known_sites if site in query_lower]
+        if sites:
+            narrowing.append({"site": {"$in": sites}} if len(sites) > 1 else {"site": sites[0]})
+        date_floor = self._question_date_floor(query_lower)
+        if date_floor is not None:
+            narrowing.append({"date_key": {"$gte": int(date_floor.strftime("%Y%m%d"))}})
+
+        scopes = []
+        conditions = [type_filter] if type_filter else []
+        if narrowing:
+            full = conditions + narrowing
+            scopes.append({"$and": full} if len(full) > 1 else full[0])
+        if type_filter:
+            scopes.append(type_filter)
+        scopes.append(None)
+        return scopes
+
+    def _question_date_floor(self, query_lower):
+        """Earliest date implied by phrases like "last 3 months" or "this week" """
+        today = date.today()
+        match = RELATIVE_PERIOD.search(query_lower)
+        if match:
+            return today - timedelta(days=int(match.group(1)) * PERIOD_DAYS[match.group(2)])
+        if "today" in query_lower:
+            return today
+        if "yesterday" in query_lower:
+            return today - timedelta(days=1)
+        if "this week" in query_lower:
+            return today - timedelta(days=today.weekday())
+        if "this month" in query_lower:
+            return today.replace(day=1)
+        if "this year" in query_lower:
+            return today.replace(month=1, day=1)
+        return None
+
+    def _collect_context(self, stages, started, dropped_sections):
+        retrieval = self._collect_stage(
+            stages["retrieval"], "sources", started, Config.RAG_RETRIEVAL_TIMEOUT,
+            ([], None), dropped_sections
+        )
+        sql_results = self._collect_stage(
+            stages["sql"], "tables", started, Config.RAG_SQL_TIMEOUT,
+            None, dropped_sections
+        )
+        return retrieval, sql_results
+
+    def _collect_visualizations(self, stages, started, dropped_sections):
+        return self._collect_stage(
+            stages["viz"], "visualizations", started, Config.RAG_VISUALIZATION_TIMEOUT,
+            {"kpis": {}, "charts": {}}, dropped_sections
+        )
+
+    async def _acollect_visualizations(self, stages, started, dropped_sections):
+        return await self._acollect_stage(
+            stages["viz"], "visualizations", started, Config.RAG_VISUALIZATION_TIMEOUT,
+            {"kpis": {}, "charts": {}}, dropped_sections
+        )
+
+    def _assemble_context(self, question, scored_docs, sql_results, intents):
+        """Prompt context within the token budget (``sql_results`` is None when the SQL stage was dropped)"""
+        return self.context_assembler.assemble(
+            question, scored_docs, sql_results, intents, self.SQL_CONTEXT_UNAVAILABLE
+        )
+
+    def _build_visualizations(self, question, viz_data, sql_results, intents):
+        return {
+            "kpis": viz_data["kpis"],
+            "charts": self.filter_relevant_charts(question, viz_data["charts"], intents),
+            "tables": self.extract_data_tables(question, sql_results),
+            "cache_age": viz_data.get("cache_age", {})
+        }
+
+    def _cached_answer(self, sql_results, embedding):
+        """Look up an answer for a similar question over unchanged data
 
-    def generate_recommendations(self, question, answer, viz_data):
+        Returns ``(answer, cache_key)``; answer is None on a miss and
+        cache_key is None when the answer cache is disabled or the question
+        embedding is unavailable (retrieval stage dropped).
+        """
+        if self.answer_cache is None or embedding is None:
+            return None, None
+
+        try:
+            kpis, _ = aggregates.get_kpis()
+            data = None if sql_results is None else [result.fingerprint() for result in sql_results]
+            fingerprint = self.answer_cache.fingerprint(data, kpis)
+            cached_answer, similarity = self.answer_cache.lookup(embedding, fingerprint)
+        except Exception as e:
+            logger.warning(f"⚠️ Answer cache skipped: {e}")
+            return None, None
+
+        if cached_answer is not None:
+            logger.info(f"⚡ Answer cache hit (similarity {similarity:.3f})")
+        return cached_answer, (embedding, fingerprint)
+
+    def _remember_answer(self, cache_key, question, answer):
+        if cache_key is None or not answer or answer.startswith(LLMRouter.ERROR_PREFIX):
+            return
+        embedding, fingerprint = cache_key
+        self.answer_cache.store(embedding, fingerprint, question, answer)
+
+    def _collect_stage(self, future, section, started, budget, fallback, dropped_sections):
+        """Wait for a pipeline stage within its budget (measured from query start).
+
+        A stage that is late or fails is replaced by ``fallback`` and its
+        section name is recorded in ``dropped_sections``.
+        """
+        remaining = max(0.0, budget - (time.monotonic() - started))
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(f"⏱️ Stage '{section}' exceeded its {budget}s budget, dropping it")
+        except Exception as e:
+            logger.error(f"❌ Stage '{section}' failed: {e}")
+        dropped_sections.append(section)
+        return fallback
+
+    async def _acollect_stage(self, task, section, started, budget, fallback, dropped_sections):
+        """Async _collect_stage(): await a stage task within its budget"""
+        remaining = max(0.0, budget - (time.monotonic() - started))
+        try:
+            return await asyncio.wait_for(task, timeout=remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Stage '{section}' exceeded its {budget}s budget, dropping it")
+        except Exception as e:
+            logger.error(f"❌ Stage '{section}' failed: {e}")
+        dropped_sections.append(section)
+        return fallback
+
+    def generate_recommendations(self, question, answer, viz_data, intents=None):
         """Generate actionable recommendations for managers"""
         recommendations = []
         
-        # Analyze question context for specific recommendations
-        query_lower = question.lower()
+        # Question intents (shared with the SQL stage) drive the recommendations
+        intents = intents or self.intent_router.classify(question)
         
-        if any(word in query_lower for word in ['equipment', 'machine', 'status']):
+        if intents.has('equipment', 'maintenance_history'):
             critical_count = viz_data["kpis"].get("critical_alerts", 0)
             if critical_count > 0:
                 recommendations.append(f"🚨 Immediate attention needed for {critical_count} critical equipment")
                 recommendations.append("Schedule maintenance for equipment with efficiency below 70%")
                 recommendations.append("Review equipment alerts in the maintenance dashboard")
         
-        if any(word in query_lower for word in ['production', 'output', 'efficiency']):
+        if intents.has('production'):
             efficiency = viz_data["kpis"].get("avg_efficiency", 0)
             if efficiency < 80:
                 recommendations.append(f"📊 Production efficiency ({efficiency}%) below target - investigate bottlenecks")
@@ -82,7 +673,7 @@ class RAGEngine:
             else:
                 recommendations.append(f"✅ Good production efficiency ({efficiency}%) - maintain current processes")
         
-        if any(word in query_lower for word in ['safety', 'incident', 'accident']):
+        if intents.has('incidents', 'safety'):
             incidents = viz_data["kpis"].get("total_incidents", 0)
             if incidents > 0:
                 recommendations.append(f"⚠️ {incidents} safety incidents reported - review safety protocols")
@@ -101,374 +692,154 @@ class RAGEngine:
         
         return recommendations[:4]  # Return top 4 recommendations
 
-    def filter_relevant_charts(self, question, charts_data):
+    def filter_relevant_charts(self, question, charts_data, intents=None):
         """Return only charts relevant to the question"""
-        query_lower = question.lower()
+        intents = intents or self.intent_router.classify(question)
         relevant_charts = {}
         
-        if any(word in query_lower for word in ['trend', 'history', 'over time']):
+        if intents.trend:
             if "incidents_trend" in charts_data:
                 relevant_charts["incidents_trend"] = charts_data["incidents_trend"]
             if "production_metrics" in charts_data:
                 relevant_charts["production_trend"] = charts_data["production_metrics"]
         
-        if any(word in query_lower for word in ['equipment', 'machine', 'status']):
+        if intents.has('equipment', 'maintenance_history'):
             if "equipment_status" in charts_data:
                 relevant_charts["equipment_status"] = charts_data["equipment_status"]
         
-        if any(word in query_lower for word in ['production', 'output', 'efficiency']):
+        if intents.has('production'):
             if "production_metrics" in charts_data:
                 relevant_charts["production_trend"] = charts_data["production_metrics"]
         
         return relevant_charts
 
-    def extract_data_tables(self, question, sql_context):
-        """Extract structured data tables from SQL context"""
-        # This would parse the SQL response into table format
-        # For now, return simplified version
-        return {
-            "summary": f"Data from {len(sql_context.splitlines())} records",
-            "preview": sql_context[:200] + "..." if len(sql_context) > 200 else sql_context
-        }
+    def extract_data_tables(self, question, sql_results):
+        """Tables (all rows, up to TABLE_MAX_ROWS; the client pages them) and their charts from the routed SQL rows"""
+        if sql_results is None:
+            return {"summary": self.SQL_CONTEXT_UNAVAILABLE, "results": []}
 
-    def get_enhanced_visualization_data(self, query):
-        """Get enhanced visualization data with additional charts"""
-        try:
-            conn = get_mysql_connection()
-            
-            viz_data = {
-                "kpis": self.get_kpis(conn),
-                "charts": {
-                    "incidents_trend": self.get_incidents_trend(conn),
-                    "equipment_status": self.get_equipment_status(conn),
-                    "production_metrics": self.get_production_trend(conn),
-                    "efficiency_trend": self.get_efficiency_trend(conn)
-                }
+        tables = []
+        for result in sql_results:
+            if not len(result):
+                continue
+            table = {
+                "id": uuid.uuid4().hex,
+                "name": result.name,
+                "title": result.title,
+                **result.table(Config.TABLE_PAGE_SIZE, Config.TABLE_MAX_ROWS)
             }
-            
-            conn.close()
-            return viz_data
-        except Exception as e:
-            logger.error(f"❌ Enhanced visualization data error: {e}")
-            return {"kpis": {}, "charts": {}}
+            chart = self._route_chart(result)
+            if chart:
+                table["chart"] = chart
+            tables.append(table)
+        total = sum(len(result) for result in sql_results)
+        return {"summary": f"Data from {total} records", "results": tables}
 
-    def get_efficiency_trend(self, conn):
-        """Get efficiency trend data"""
+    def _route_chart(self, result):
+        spec = ROUTE_CHARTS.get(result.name)
+        if spec is None:
+            return None
+        chart_type, label_column, value_columns = spec
         try:
-            query = """
-                SELECT 
-                    DATE_FORMAT(metric_date, '%Y-%m') as month,
-                    AVG(efficiency_percentage) as avg_efficiency
-                FROM production_metrics
-                WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)
-                GROUP BY month
-                ORDER BY month DESC
-            """
-            return pd.read_sql(query, conn).to_dict(orient='records')
-        except Exception as e:
-            logger.error(f"❌ Efficiency trend error: {e}")
-            return []
+            if value_columns is None:
+                data = result.count_by(label_column)
+            else:
+                data = result.sum_by(label_column, value_columns)
+        except ValueError:
+            return None  # column missing from this result
+        return {"type": chart_type, "data": data}
 
-    def get_sql_context(self, query):
-        """Fetch relevant MySQL data with enhanced query routing"""
-        conn = get_mysql_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        query_lower = query.lower()
-        
+    def get_enhanced_visualization_data(self, query):
+        """Get enhanced visualization data with additional charts (cached snapshots)"""
+        kpis, kpis_age = aggregates.get_kpis()
+        charts = {}
+        cache_age = {"kpis": kpis_age}
+        for chart_name, aggregate_name in (
+            ("incidents_trend", "incidents_trend"),
+            ("equipment_status", "equipment_status"),
+            ("production_metrics", "production_trend"),
+            ("efficiency_trend", "efficiency_trend"),
+        ):
+            charts[chart_name], cache_age[chart_name] = aggregates.get_aggregate(aggregate_name)
+
+        return {"kpis": kpis, "charts": charts, "cache_age": cache_age}
+
+    def get_sql_rows(self, query, intents=None):
+        """Fetch relevant MySQL rows for every intent of the question (one template each)
+
+        Returns one QueryResult per route. When MySQL fails, the routes the
+        embedded analytics store can answer are served from it; otherwise
+        the error is raised so the stage is dropped rather than sending the
+        error text to the LLM.
+        """
+        routes = self._sql_routes(query, intents)
         try:
-            # Enhanced query routing with multiple conditions
-            if any(word in query_lower for word in ['incident', 'accident', 'safety', 'casualt', 'injur']):
-                cursor.execute("""
-                    SELECT 
-                        incident_date, 
-                        mine_name, 
-                        incident_type, 
-                        severity, 
-                        description, 
-                        casualties,
-                        injuries,
-                        cost_impact,
-                        response_time_minutes
-                    FROM mining_incidents 
-                    WHERE incident_date >= DATE_SUB(CURDATE(), INTERVAL 6 MONTH)
-                    ORDER BY 
-                        CASE severity 
-                            WHEN 'Critical' THEN 4
-                            WHEN 'High' THEN 3
-                            WHEN 'Medium' THEN 2
-                            ELSE 1 
-                        END DESC,
-                        incident_date DESC 
-                    LIMIT 8
-                """)
-                
-            elif any(word in query_lower for word in ['equipment', 'machine', 'maintenance', 'repair', 'breakdown']):
-                # Check if query is about maintenance history or current status
-                if any(word in query_lower for word in ['history', 'past', 'last', 'previous']):
-                    cursor.execute("""
-                        SELECT 
-                            mr.equipment_id,
-                            mr.maintenance_type,
-                            mr.start_date,
-                            mr.end_date,
-                            mr.cost,
-                            mr.downtime_hours,
-                            em.equipment_type
-                        FROM maintenance_repairs mr
-                        LEFT JOIN equipment_monitoring em ON mr.equipment_id = em.equipment_id
-                        ORDER BY mr.start_date DESC 
-                        LIMIT 6
-                    """)
-                else:
-                    cursor.execute("""
-                        SELECT 
-                            equipment_id, 
-                            equipment_type, 
-                            status, 
-                            efficiency_score, 
-                            alerts,
-                            temperature_celsius,
-                            vibration_level,
-                            last_maintenance,
-                            next_maintenance
-                        FROM equipment_monitoring 
-                        WHERE status != 'Operational' OR efficiency_score < 80
-                        ORDER BY 
-                            CASE status 
-                                WHEN 'Critical' THEN 4
-                                WHEN 'Maintenance' THEN 3
-                                WHEN 'Offline' THEN 2
-                                ELSE 1 
-                            END DESC,
-                            efficiency_score ASC 
-                        LIMIT 8
-                    """)
-                    
-            elif any(word in query_lower for word in ['production', 'output', 'tons', 'efficiency', 'downtime']):
-                cursor.execute("""
-                    SELECT 
-                        metric_date, 
-                        site_name, 
-                        material_type, 
-                        quantity_tons, 
-                        efficiency_percentage,
-                        downtime_hours,
-                        target_tons,
-                        cost_per_ton
-                    FROM production_metrics 
-                    WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-                    ORDER BY metric_date DESC, quantity_tons DESC 
-                    LIMIT 8
-                """)
-                
-            elif any(word in query_lower for word in ['fuel', 'energy', 'consumption', 'power']):
-                cursor.execute("""
-                    SELECT 
-                        equipment_id,
-                        reading_date,
-                        fuel_liters,
-                        energy_kwh,
-                        shift
-                    FROM fuel_energy 
-                    WHERE reading_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-                    ORDER BY reading_date DESC, energy_kwh DESC 
-                    LIMIT 6
-                """)
-                
-            elif any(word in query_lower for word in ['quality', 'defect', 'grade', 'inspection']):
-                cursor.execute("""
-                    SELECT 
-                        site_name,
-                        metric_date,
-                        material_type,
-                        quality_grade,
-                        defects_found
-                    FROM quality_metrics 
-                    WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-                    ORDER BY metric_date DESC, defects_found DESC 
-                    LIMIT 6
-                """)
-                
-            elif any(word in query_lower for word in ['safety', 'compliance', 'audit', 'violation']):
-                cursor.execute("""
-                    SELECT 
-                        audit_date,
-                        site_name,
-                        compliance_score,
-                        violations,
-                        auditor_name,
-                        recommendations
-                    FROM safety_compliance 
-                    ORDER BY audit_date DESC 
-                    LIMIT 5
-                """)
-                
-            else:
-                # Default: mixed context from multiple tables
-                cursor.execute("""
-                    (SELECT 
-                        'incident' as source_type,
-                        incident_date as date,
-                        mine_name as name,
-                        severity as metric,
-                        description as details
-                    FROM mining_incidents 
-                    ORDER BY incident_date DESC 
-                    LIMIT 2)
-                    
-                    UNION ALL
-                    
-                    (SELECT 
-                        'equipment' as source_type,
-                        updated_at as date,
-                        equipment_id as name,
-                        status as metric,
-                        alerts as details
-                    FROM equipment_monitoring 
-                    WHERE status != 'Operational'
-                    ORDER BY updated_at DESC 
-                    LIMIT 2)
-                    
-                    UNION ALL
-                    
-                    (SELECT 
-                        'production' as source_type,
-                        metric_date as date,
-                        site_name as name,
-                        efficiency_percentage as metric,
-                        CONCAT('Production: ', quantity_tons, ' tons') as details
-                    FROM production_metrics 
-                    ORDER BY metric_date DESC 
-                    LIMIT 2)
-                    
-                    ORDER BY date DESC
-                """)
-            
-            results = cursor.fetchall()
-            
-            # Format results for better readability
-            if results:
-                df = pd.DataFrame(results)
-                
-                # Add context summary
-                summary = f"Retrieved {len(results)} records from database.\n\n"
-                
-                return summary + df.to_string(index=False, max_colwidth=50)
-            else:
-                return "No relevant data found in database for this query."
-                
+            results = self._mysql_rows(routes)
         except Exception as e:
             logger.error(f"❌ SQL context error: {e}")
-            return f"Database query error: {str(e)}"
-        
-        finally:
-            cursor.close()
-            conn.close()
-    
-    def get_visualization_data(self, query):
-        """Get data for charts and KPIs"""
-        try:
-            conn = get_mysql_connection()
-            
-            viz_data = {
-                "kpis": self.get_kpis(conn),
-                "charts": {
-                    "incidents_trend": self.get_incidents_trend(conn),
-                    "equipment_status": self.get_equipment_status(conn),
-                    "production_metrics": self.get_production_trend(conn)
-                }
-            }
-            
-            conn.close()
-            return viz_data
-        except Exception as e:
-            logger.error(f"❌ Visualization data error: {e}")
-            return {"kpis": {}, "charts": {}}
-    
-    def get_kpis(self, conn):
-        """Calculate KPIs"""
+            results = self._analytics_rows(routes)
+            if results is None:
+                raise
+        return results + self._availability_rows(routes)
+
+    def _mysql_rows(self, routes):
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                results = []
+                for route in routes:
+                    cursor.execute(SQL_TEMPLATES[route])
+                    results.append(QueryResult.from_cursor(route, cursor, cursor.fetchall()))
+                return results
+            finally:
+                cursor.close()
+
+    async def aget_sql_rows(self, query, intents=None):
+        """Async get_sql_rows() on the aiomysql pool"""
+        routes = self._sql_routes(query, intents)
         try:
-            cursor = conn.cursor(dictionary=True)
-            
-            # Total incidents
-            cursor.execute("SELECT COUNT(*) as total_incidents FROM mining_incidents")
-            total_incidents = cursor.fetchone()['total_incidents']
-            
-            # Critical alerts
-            cursor.execute("SELECT COUNT(*) as critical_alerts FROM equipment_monitoring WHERE status='Critical'")
-            critical_alerts = cursor.fetchone()['critical_alerts']
-            
-            # Average efficiency
-            cursor.execute("SELECT AVG(efficiency_percentage) as avg_efficiency FROM production_metrics WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)")
-            avg_efficiency = cursor.fetchone()['avg_efficiency'] or 0
-            
-            # Monthly production
-            cursor.execute("SELECT SUM(quantity_tons) as monthly_production FROM production_metrics WHERE MONTH(metric_date) = MONTH(CURDATE())")
-            monthly_production = cursor.fetchone()['monthly_production'] or 0
-            
-            cursor.close()
-            
-            return {
-                "total_incidents": total_incidents,
-                "critical_alerts": critical_alerts,
-                "avg_efficiency": round(float(avg_efficiency), 2),
-                "monthly_production": float(monthly_production)
-            }
+            results = []
+            async with async_db.get_async_cursor() as cursor:
+                for route in routes:
+                    await cursor.execute(SQL_TEMPLATES[route])
+                    results.append(QueryResult.from_cursor(route, cursor, await cursor.fetchall()))
+
         except Exception as e:
-            logger.error(f"❌ KPI calculation error: {e}")
-            return {
-                "total_incidents": 0,
-                "critical_alerts": 0,
-                "avg_efficiency": 0,
-                "monthly_production": 0
-            }
-    
-    def get_incidents_trend(self, conn):
-        """Get incident trend data"""
+            logger.error(f"❌ SQL context error: {e}")
+            results = await asyncio.to_thread(self._analytics_rows, routes)
+            if results is None:
+                raise
+        return results + await asyncio.to_thread(self._availability_rows, routes)
+
+    def _analytics_rows(self, routes):
+        """Routed rows from the embedded analytics store while MySQL is unavailable
+
+        Returns None when the store is disabled, fails, or answers none of
+        the routes (the SQL stage is then dropped as before).
+        """
+        if not Config.ANALYTICS_ENABLED:
+            return None
         try:
-            query = """
-                SELECT 
-                    DATE_FORMAT(incident_date, '%Y-%m') as month,
-                    severity,
-                    COUNT(*) as count
-                FROM mining_incidents
-                WHERE incident_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
-                GROUP BY month, severity
-                ORDER BY month DESC
-            """
-            return pd.read_sql(query, conn).to_dict(orient='records')
+            results = analytics_store.route_results(routes)
         except Exception as e:
-            logger.error(f"❌ Incidents trend error: {e}")
+            logger.error(f"❌ Analytics fallback error: {e}")
+            return None
+        if not results:
+            return None
+        logger.info(f"📊 SQL context served from the analytics store ({analytics_store.engine})")
+        return results
+
+    def _availability_rows(self, routes):
+        """Per-equipment availability for equipment questions (cached per window; [] on failure)"""
+        if not AVAILABILITY_ROUTES.intersection(routes):
             return []
-    
-    def get_equipment_status(self, conn):
-        """Get equipment status distribution"""
         try:
-            query = """
-                SELECT status, COUNT(*) as count
-                FROM equipment_monitoring
-                GROUP BY status
-            """
-            return pd.read_sql(query, conn).to_dict(orient='records')
+            report, _ = availability_engine.get()
         except Exception as e:
-            logger.error(f"❌ Equipment status error: {e}")
+            logger.warning(f"⚠️ Availability context skipped: {e}")
             return []
-    
-    def get_production_trend(self, conn):
-        """Get production trend"""
-        try:
-            query = """
-                SELECT 
-                    DATE_FORMAT(metric_date, '%Y-%m') as month,
-                    SUM(quantity_tons) as production,
-                    AVG(efficiency_percentage) as efficiency
-                FROM production_metrics
-                WHERE metric_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
-                GROUP BY month
-                ORDER BY month DESC
-            """
-            return pd.read_sql(query, conn).to_dict(orient='records')
-        except Exception as e:
-            logger.error(f"❌ Production trend error: {e}")
-            return []
\ No newline at end of file
+        return [availability_engine.result(report)] if report["equipment"] else []
+
+    def _sql_routes(self, query, intents):
+        intents = intents or self.intent_router.classify(query)
+        return [intent for intent in intents.intents if intent in SQL_TEMPLATES] or ["mixed"]
@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_config import get_mysql_connection
+from database.rollups import ROLLUPS, rollup_manager
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Rebuild the rollup tables from the raw tables (all history, or from --since)"""
+    parser = argparse.ArgumentParser(description="Backfill the trend/KPI rollup tables")
+    parser.add_argument("--rollups", nargs="+", choices=sorted(ROLLUPS),
+                        help="Rollups to rebuild (default: all)")
+    parser.add_argument("--since", type=date.fromisoformat,
+                        help="Only rebuild periods from this date (YYYY-MM-DD); default: all history")
+    args = parser.parse_args()
+
+    conn = get_mysql_connection()
+    try:
+        started = time.monotonic()
+        written = rollup_manager.backfill(conn, args.rollups, args.since)
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        return 1
+    finally:
+        conn.close()
+
+    for name, rows in written.items():
+        print(f"✅ {ROLLUPS[name]['table']}: {rows} rows")
+    print(f"🔄 Backfill finished in {time.monotonic() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
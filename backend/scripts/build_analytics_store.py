@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.analytics_store import AnalyticsStore
+from config import Config
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Prebuild the embedded analytics store from the kaggle_data CSVs (served via ANALYTICS_DB_PATH)"""
+    parser = argparse.ArgumentParser(description="Build the embedded analytics store file")
+    parser.add_argument("--output", default=Config.ANALYTICS_DB_PATH or "./analytics.db",
+                        help="Database file to write (default: ANALYTICS_DB_PATH or ./analytics.db)")
+    parser.add_argument("--data-dir", default=Config.ANALYTICS_DATA_DIR,
+                        help="Folder with the kaggle_data CSV files")
+    parser.add_argument("--engine", choices=["auto", "duckdb", "sqlite"], default=Config.ANALYTICS_ENGINE)
+    parser.add_argument("--replace", action="store_true", help="Overwrite an existing output file")
+    args = parser.parse_args()
+
+    if os.path.exists(args.output):
+        if not args.replace:
+            print(f"❌ {args.output} already exists (use --replace to rebuild it)")
+            return 1
+        os.remove(args.output)
+
+    store = AnalyticsStore(engine=args.engine, data_dir=args.data_dir, db_path=args.output)
+    started = time.monotonic()
+    try:
+        loaded = store.build(args.output)
+    except Exception as e:
+        print(f"❌ Build failed: {e}")
+        return 1
+
+    for table, rows in loaded.items():
+        print(f"✅ {table}: {rows} rows")
+    print(f"📦 {store.engine} store written to {args.output} in {time.monotonic() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+from datetime import date
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_config import get_mysql_connection
+from database.rollups import ROLLUPS, rollup_manager
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Fail (exit 1) when a rollup table disagrees with a fresh aggregate of its source rows"""
+    parser = argparse.ArgumentParser(description="Check the rollup tables against the raw tables")
+    parser.add_argument("--rollups", nargs="+", choices=sorted(ROLLUPS),
+                        help="Rollups to check (default: all)")
+    parser.add_argument("--since", type=date.fromisoformat,
+                        help="Only check periods from this date (YYYY-MM-DD); default: all history")
+    parser.add_argument("--show", type=int, default=10,
+                        help="Mismatches to print per rollup (default: 10)")
+    args = parser.parse_args()
+
+    conn = get_mysql_connection()
+    failures = 0
+    try:
+        for name in args.rollups or ROLLUPS:
+            mismatches = rollup_manager.check(conn, name, args.since)
+            if not mismatches:
+                print(f"✅ {ROLLUPS[name]['table']}: consistent")
+                continue
+            failures += 1
+            print(f"❌ {ROLLUPS[name]['table']}: {len(mismatches)} mismatched rows")
+            for key, expected, actual in mismatches[:args.show]:
+                print(f"   {key}: expected {expected}, rollup has {actual}")
+    finally:
+        conn.close()
+
+    if failures:
+        print("Run scripts/backfill_rollups.py to rebuild the rollups that drifted")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_config import get_mysql_connection
+from database.mining_csv import DATASETS, dataset_path
+from database.schema import migrate
+from database.telemetry_loader import TARGETS, TelemetryLoader
+from config import Config
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Bulk-load the kaggle_data CSVs into MySQL (idempotent: safe to rerun)"""
+    parser = argparse.ArgumentParser(description="Load equipment status, shift production and trip CSVs")
+    parser.add_argument("--data-dir", default=Config.ANALYTICS_DATA_DIR,
+                        help="Folder with the kaggle_data CSV files")
+    parser.add_argument("--datasets", nargs="+", choices=sorted(TARGETS),
+                        help="Datasets to load (default: all)")
+    parser.add_argument("--since", type=date.fromisoformat,
+                        help="Only load rows dated from this day (YYYY-MM-DD), e.g. to reload a month")
+    parser.add_argument("--batch-size", type=int, default=Config.CSV_BATCH_ROWS,
+                        help="Rows per upsert statement and commit")
+    parser.add_argument("--dry-run", action="store_true", help="Parse the files without writing")
+    args = parser.parse_args()
+
+    names = args.datasets or list(TARGETS)
+    missing = [dataset_path(args.data_dir, name) for name in names
+               if not os.path.exists(dataset_path(args.data_dir, name))]
+    if missing:
+        print(f"❌ Missing file(s): {', '.join(missing)}")
+        return 1
+
+    conn = None if args.dry_run else get_mysql_connection()
+    try:
+        if conn is not None:
+            migrate(conn)  # creates the telemetry tables on a fresh database
+        loader = TelemetryLoader(conn, args.data_dir, args.batch_size)
+        started = time.monotonic()
+        results = {}
+        for name in names:
+            results[name] = loader.load(name, args.since, args.dry_run)
+            stats = results[name]
+            print(
+                f"✅ {TARGETS[name][0]} ← {DATASETS[name][0]}: {stats['rows']} rows "
+                f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)"
+            )
+    except Exception as e:
+        print(f"❌ Load failed: {e}")
+        return 1
+    finally:
+        if conn is not None:
+            conn.close()
+
+    total = sum(stats["rows"] for stats in results.values())
+    elapsed = time.monotonic() - started
+    print(f"📦 {total} rows {'parsed' if args.dry_run else 'upserted'} in {elapsed:.1f}s "
+          f"({round(total / elapsed) if elapsed > 0 else total} rows/sec)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_config import get_mysql_connection
+from database.schema import LATEST_VERSION, migrate, migration_status
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Apply pending schema migrations (database/schema.py), or list them with --status"""
+    parser = argparse.ArgumentParser(description="Migrate the MySQL schema")
+    parser.add_argument("--status", action="store_true",
+                        help="Only show which migrations are applied")
+    parser.add_argument("--to", type=int, default=LATEST_VERSION,
+                        help=f"Target version (default: latest, {LATEST_VERSION})")
+    args = parser.parse_args()
+
+    conn = get_mysql_connection()
+    try:
+        if not args.status:
+            applied = migrate(conn, args.to)
+            print(f"✅ Applied migrations: {applied}" if applied else "✅ Schema already up to date")
+        for version, description, done in migration_status(conn):
+            print(f"  {'✔' if done else ' '} {version:>3}  {description}")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
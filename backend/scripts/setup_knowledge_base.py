@@ -5,7 +5,8 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.chromadb_manager import ChromaDBManager
-from utils.langchain_setup import langchain_setup  # ✅ ADDED
+from utils.embedding_service import get_embedding_service
+from utils.kb_sync import SYNC_TABLES
 import logging
 
 # Configure logging
@@ -15,12 +16,13 @@ logger = logging.getLogger(__name__)
 def setup_complete_knowledge_base():
     """Setup ChromaDB with all CSV data"""
     
-    # ✅ ADDED: Initialize and log LangChain setup
-    embedding_info = langchain_setup.get_embedding_model_info()
-    print(f"🔧 LangChain initialized with: {embedding_info.get('model_name', 'Unknown')}")
+    # Shared embedding model (same instance the ChromaDB manager embeds with)
+    embeddings = get_embedding_service()
+    embedding_info = embeddings.info()
+    print(f"🔧 Embeddings: {embedding_info['model_name']} ({embedding_info['embedding_size']} dims)")
     
     # Initialize ChromaDB manager
-    chroma = ChromaDBManager()
+    chroma = ChromaDBManager(embeddings=embeddings)
     
     # Path to your CSV folder
     csv_folder = r"C:\Users\pavit\OneDrive\Desktop\mit\thanucheck\bhooom\mysql\kaggle_data"
@@ -47,9 +49,14 @@ def setup_complete_knowledge_base():
         
         if os.path.exists(csv_path):
             print(f"📁 Loading {csv_file} as {doc_type}...")
-            if chroma.add_csv_data(csv_path, doc_type):
+            # Exports of a synced table share its vector ids, so a later sync updates them in place
+            table = os.path.splitext(csv_file)[0]
+            pk = SYNC_TABLES.get(table, {}).get("pk")
+            if chroma.add_csv_data(csv_path, doc_type, table if pk else None, pk):
                 success_count += 1
-                print(f"✅ Successfully loaded {csv_file}")
+                stats = chroma.last_ingest_stats
+                print(f"✅ Successfully loaded {csv_file}: {stats['rows']} rows "
+                      f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)")
             else:
                 print(f"❌ Failed to load {csv_file}")
         else:
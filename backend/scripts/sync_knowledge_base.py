@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.chromadb_manager import ChromaDBManager
+from utils.kb_sync import KnowledgeBaseSync, SYNC_TABLES
+from config import Config
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Incrementally sync MySQL tables into ChromaDB (once, or every --interval seconds)"""
+    parser = argparse.ArgumentParser(description="Sync the knowledge base from MySQL")
+    parser.add_argument("--tables", nargs="+", choices=sorted(SYNC_TABLES),
+                        help="Tables to sync (default: all)")
+    parser.add_argument("--full", action="store_true",
+                        help="Forget high-water marks, re-embed every row and drop vectors of deleted rows")
+    parser.add_argument("--interval", type=int, default=0,
+                        help=f"Run periodically every N seconds (e.g. {Config.KB_SYNC_INTERVAL})")
+    args = parser.parse_args()
+
+    sync = KnowledgeBaseSync(ChromaDBManager())
+    full = args.full
+
+    while True:
+        started = time.monotonic()
+        report = sync.run(tables=args.tables, full=full)
+        upserted = sum(stats.get("upserted", 0) for stats in report.values())
+        deleted = sum(stats.get("deleted", 0) for stats in report.values())
+        failed = [table for table, stats in report.items() if "error" in stats]
+        print(f"🔄 Sync finished in {time.monotonic() - started:.1f}s: "
+              f"{upserted} upserted, {deleted} deleted"
+              + (f", failed: {', '.join(failed)}" if failed else ""))
+
+        if not args.interval:
+            return 1 if failed else 0
+        full = False  # only the first pass of a periodic job is forced
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    sys.exit(main())
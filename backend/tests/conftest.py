@@ -0,0 +1,7 @@
+# backend/tests/conftest.py
+# Run from backend/: python -m pytest -q tests
+import os
+import sys
+
+# Import application modules the way the app does (backend/ on the path)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
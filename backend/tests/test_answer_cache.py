@@ -0,0 +1,124 @@
+# backend/tests/test_answer_cache.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from database import aggregates
+from models.rag_engine import RAGEngine
+from utils.answer_cache import SemanticAnswerCache
+
+
+def test_similar_question_over_same_data_hits():
+    cache = SemanticAnswerCache(threshold=0.9)
+    fingerprint = cache.fingerprint(["rows"], {"kpi": 1})
+    cache.store([1.0, 0.0], fingerprint, "Which excavator is down?", "EX-02")
+    answer, similarity = cache.lookup([0.99, 0.05], fingerprint)
+    assert answer == "EX-02"
+    assert similarity > 0.9
+
+
+def test_changed_data_or_different_question_misses():
+    cache = SemanticAnswerCache(threshold=0.9)
+    fingerprint = cache.fingerprint(["rows"], {"kpi": 1})
+    cache.store([1.0, 0.0], fingerprint, "q", "a")
+    assert cache.lookup([1.0, 0.0], cache.fingerprint(["rows"], {"kpi": 2}))[0] is None
+    assert cache.lookup([0.0, 1.0], fingerprint)[0] is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_oldest_entries_are_evicted():
+    cache = SemanticAnswerCache(max_entries=2)
+    for i in range(3):
+        cache.store([1.0, float(i)], "data", f"q{i}", f"a{i}")
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+
+
+class BrokenStreamLLM:
+    """Sends one delta, then the backend drops the stream"""
+
+    def stream(self, context, query, max_tokens=150):
+        yield "EX-02 is "
+        raise ConnectionError("stream reset")
+
+    async def astream(self, context, query, max_tokens=150):
+        yield "EX-02 is "
+        raise ConnectionError("stream reset")
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(aggregates, "get_kpis", lambda: ({"total_incidents": 1}, 0))
+    engine = RAGEngine.__new__(RAGEngine)
+    engine.executor = ThreadPoolExecutor(max_workers=2)
+    engine.answer_cache = SemanticAnswerCache(threshold=0.9)
+    engine.llm = BrokenStreamLLM()
+    intents = SimpleNamespace(intents=["equipment"], to_dict=lambda: {"intents": ["equipment"]})
+    engine.intent_router = SimpleNamespace(classify=lambda question: intents)
+    engine.retrieve_documents = lambda question, intents=None: ([], [1.0, 0.0])
+    engine.get_sql_rows = lambda question, intents=None: []
+
+    async def aget_sql_rows(question, intents=None):
+        return []
+
+    engine.aget_sql_rows = aget_sql_rows
+    engine.get_enhanced_visualization_data = lambda question: {"kpis": {}, "charts": {}}
+    engine._build_visualizations = lambda *args: {}
+    engine._assemble_context = lambda *args: SimpleNamespace(text="ctx", documents=[], prompt_tokens=1)
+    engine.generate_recommendations = lambda *args: []
+    yield engine
+    engine.executor.shutdown()
+
+
+def test_failed_stream_is_shown_but_not_cached(engine):
+    events = list(engine.query_stream("Which excavator is down?"))
+    done = dict(events)["done"]
+    assert done["answer"].startswith("EX-02 is")
+    assert "stream reset" in done["answer"]
+    assert engine.answer_cache.stats()["stores"] == 0
+
+
+def test_complete_stream_is_cached(engine):
+    class WorkingLLM:
+        def stream(self, context, query, max_tokens=150):
+            yield "EX-02 is down."
+
+    engine.llm = WorkingLLM()
+    assert dict(engine.query_stream("Which excavator is down?"))["done"]["answer"] == "EX-02 is down."
+    assert engine.answer_cache.stats()["stores"] == 1
+    assert dict(engine.query_stream("Which excavator is down?"))["done"]["answer_cache"] == "hit"
+
+
+def test_failed_async_stream_is_not_cached(engine):
+    async def collect():
+        return [event async for event in engine.aquery_stream("Which excavator is down?")]
+
+    events = asyncio.run(collect())
+    assert "stream reset" in dict(events)["done"]["answer"]
+    assert engine.answer_cache.stats()["stores"] == 0
+
+
+def test_sync_and_async_streams_send_the_same_events(engine):
+    class WorkingLLM:
+        def stream(self, context, query, max_tokens=150):
+            yield "EX-02 "
+            yield "is down."
+
+        async def astream(self, context, query, max_tokens=150):
+            yield "EX-02 "
+            yield "is down."
+
+    async def collect():
+        return [event async for event in engine.aquery_stream("Which excavator is down?")]
+
+    engine.llm = WorkingLLM()
+    sync_events = list(engine.query_stream("Which excavator is down?"))
+    engine.answer_cache = SemanticAnswerCache(threshold=0.9)
+    assert asyncio.run(collect()) == sync_events
+    assert asyncio.run(collect())[1:] == [
+        ("token", {"text": "EX-02 is down."}),
+        ("done", {**dict(sync_events)["done"], "answer_cache": "hit"})
+    ]
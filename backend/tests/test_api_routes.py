@@ -0,0 +1,68 @@
+# backend/tests/test_api_routes.py
+# app.py (Flask) and asgi.py (Quart) build their responses from api_payloads,
+# so the same request gets the same status and JSON from either entry point.
+import asyncio
+import importlib
+import os
+
+import pytest
+
+from config import Config
+
+
+class StubEngine:
+    def query(self, question, language="en"):
+        return {"answer": f"answer to {question}", "language": language}
+
+    async def aquery(self, question, language="en"):
+        return self.query(question, language)
+
+
+@pytest.fixture
+def entry_points(monkeypatch):
+    monkeypatch.setattr(Config, "PRELOAD_MODELS", False)
+    sync_app = importlib.import_module("app")
+    async_app = importlib.import_module("asgi")
+    monkeypatch.setattr(sync_app, "rag_engine", StubEngine())
+    monkeypatch.setattr(sync_app, "_services_pid", os.getpid())
+    return sync_app.app, async_app.app
+
+
+def call_both(entry_points, method, path, json=None):
+    flask_app, quart_app = entry_points
+    flask_response = getattr(flask_app.test_client(), method)(path, json=json)
+
+    async def quart_call():
+        response = await getattr(quart_app.test_client(), method)(path, json=json)
+        return response.status_code, await response.get_json()
+
+    return (flask_response.status_code, flask_response.get_json()), asyncio.run(quart_call())
+
+
+@pytest.mark.parametrize("method, path, json, status", [
+    ("get", "/api/quick-actions", None, 200),
+    ("get", "/api/languages", None, None),  # 500 with the fallback list while Config has no SUPPORTED_LANGUAGES
+    ("get", "/api/availability?days=0", None, 400),
+    ("get", "/api/availability?start=2025-09-02&end=2025-09-01", None, 400),
+    ("post", "/api/cache/invalidate", {"keys": ["no_such_aggregate"]}, 400),
+    ("post", "/api/query", {"question": ""}, 400),
+    ("post", "/api/query", {"question": "Which pumps failed?", "language": "hi"}, 200),
+    ("post", "/api/query/stream", {"question": ""}, 400),
+])
+def test_entry_points_agree(entry_points, method, path, json, status):
+    sync_response, async_response = call_both(entry_points, method, path, json)
+    if status is not None:
+        assert sync_response[0] == status
+    assert sync_response == async_response
+
+
+def test_query_answer_payload(entry_points):
+    (status, payload), _ = call_both(entry_points, "post", "/api/query", {"question": "Which pumps failed?"})
+    assert status == 200
+    assert payload == {"success": True, "response": {"answer": "answer to Which pumps failed?", "language": "en"}}
+
+
+def test_health_reports_the_serving_mode(entry_points):
+    (_, sync_health), (_, async_health) = call_both(entry_points, "get", "/api/health")
+    assert sync_health == {"status": "healthy", "rag_engine_ready": True}
+    assert async_health == {**sync_health, "serving_mode": "async"}
@@ -0,0 +1,65 @@
+# backend/tests/test_availability.py
+from database.availability_engine import AVAILABILITY_COLUMNS, summarize
+
+# Status intervals in time order, two pieces of equipment interleaved
+INTERVALS = [
+    ("Excavator-1", "ACTIVE", 60, "No"),
+    ("Dumper-7", "ACTIVE", 120, "No"),
+    ("Excavator-1", "INACTIVE", 30, "Yes"),
+    ("Excavator-1", "INACTIVE", 20, "No"),  # same outage as the row above
+    ("Excavator-1", "ACTIVE", 90, "No"),
+    ("Excavator-1", "INACTIVE", 10, "No"),
+]
+
+
+def run(intervals):
+    names, statuses, minutes, alerts = zip(*intervals) if intervals else ((), (), (), ())
+    return summarize(list(names), list(statuses), list(minutes), list(alerts))
+
+
+def test_consecutive_inactive_rows_are_one_outage():
+    rows, _ = run(INTERVALS)
+    excavator = rows[0]
+
+    assert excavator["equipment"] == "Excavator-1"
+    assert excavator["failures"] == 2
+    assert excavator["longest_outage_minutes"] == 50.0
+    assert excavator["mtbf_hours"] == 1.25  # 150 active minutes / 2 failures
+    assert excavator["mttr_hours"] == 0.5   # 60 inactive minutes / 2 failures
+    assert excavator["uptime_pct"] == 71.43
+    assert excavator["alerts"] == 1 and excavator["alert_rate_pct"] == 20.0
+
+
+def test_equipment_without_failures():
+    rows, _ = run(INTERVALS)
+    dumper = rows[1]
+
+    assert dumper["equipment"] == "Dumper-7"
+    assert dumper["failures"] == 0
+    assert dumper["mtbf_hours"] is None and dumper["mttr_hours"] is None
+    assert dumper["uptime_pct"] == 100.0
+    assert dumper["longest_outage_minutes"] == 0.0
+
+
+def test_fleet_totals():
+    _, fleet = run(INTERVALS)
+
+    assert fleet == {
+        "equipment": 2, "uptime_pct": 81.82, "mtbf_hours": 2.25, "mttr_hours": 0.5, "failures": 2,
+        "alerts": 1, "alert_rate_pct": 16.67, "longest_outage_minutes": 50.0, "logged_hours": 5.5,
+    }
+
+
+def test_empty_window_keeps_the_fleet_shape():
+    rows, fleet = run([])
+    _, populated = run(INTERVALS)
+
+    assert rows == []
+    assert fleet.keys() == populated.keys()
+    assert fleet["equipment"] == 0 and fleet["failures"] == 0
+    assert fleet["uptime_pct"] is None and fleet["mtbf_hours"] is None
+
+
+def test_rows_carry_every_table_column():
+    rows, _ = run(INTERVALS)
+    assert all(list(row) == AVAILABILITY_COLUMNS for row in rows)
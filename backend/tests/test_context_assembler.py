@@ -0,0 +1,174 @@
+# backend/tests/test_context_assembler.py
+from datetime import date
+
+import pytest
+from langchain_core.documents import Document
+
+from config import Config
+from database.query_result import QueryResult
+from models.context_assembler import (
+    PROMPT_OVERHEAD_TOKENS, ContextAssembler, estimate_tokens, format_row, route_header,
+)
+from models.intent_router import IntentResult
+
+UNAVAILABLE = "Database records are unavailable right now."
+
+PUMP_FAILURE = ("Hydraulic pump failure on excavator EX-01 at the north pit caused "
+                "four hours of downtime during shift B on 17 September")
+# The same chunk ingested twice with one extra word
+PUMP_FAILURE_AGAIN = PUMP_FAILURE + " again"
+CONVEYOR = "Conveyor belt C3 inspection found worn idlers; replacement is scheduled for next week"
+
+PRODUCTION = QueryResult(
+    "production",
+    ["site_name", "metric_date", "quantity_tons"],
+    [("North Pit", date(2025, 9, 17), 1200.5), ("South Pit", date(2025, 9, 17), 980.0),
+     ("East Pit", date(2025, 9, 16), 750.25)],
+)
+EQUIPMENT = QueryResult(
+    "equipment",
+    ["equipment_id", "status", "efficiency_score"],
+    [("EX-01", "Critical", 61.5), ("DMP-07", "Maintenance", 74.0)],
+)
+
+
+@pytest.fixture(autouse=True)
+def config(monkeypatch):
+    monkeypatch.setattr(Config, "CONTEXT_CHARS_PER_TOKEN", 4.0)
+    monkeypatch.setattr(Config, "CONTEXT_MAX_FIELD_CHARS", 120)
+
+
+def docs(*contents):
+    return [(Document(page_content=content), distance) for content, distance in contents]
+
+
+def intents(*ranked):
+    return IntentResult(list(ranked))
+
+
+def line_cost(text):
+    return estimate_tokens(text) + 1
+
+
+def route_cost(result, rows=None):
+    """Tokens for the route header once plus each row line"""
+    lines = [format_row(row) for row in (result.rows if rows is None else rows)]
+    return line_cost(route_header(result.name, result.columns)) + sum(line_cost(line) for line in lines)
+
+
+def test_near_duplicate_chunks_are_dropped():
+    assembler = ContextAssembler(token_budget=10_000, dedup_threshold=0.85)
+    context = assembler.assemble(
+        "pump failures?",
+        docs((PUMP_FAILURE, 0.2), (PUMP_FAILURE_AGAIN, 0.3), (CONVEYOR, 0.4)),
+        [], intents(), UNAVAILABLE,
+    )
+
+    assert [doc.page_content for doc in context.documents] == [PUMP_FAILURE, CONVEYOR]
+    assert context.dropped["duplicates"] == 1
+    assert PUMP_FAILURE_AGAIN not in context.text
+
+
+def test_over_budget_item_is_skipped_and_smaller_ones_still_fit():
+    long_chunk = " ".join(["Shift report with a very long narrative"] * 20)
+    budget = line_cost(CONVEYOR) + 2
+    assembler = ContextAssembler(token_budget=budget)
+    context = assembler.assemble(
+        "conveyor status?",
+        # The long chunk is the most relevant but does not fit
+        docs((long_chunk, 0.0), (CONVEYOR, 0.5)),
+        [], intents(), UNAVAILABLE,
+    )
+
+    assert [doc.page_content for doc in context.documents] == [CONVEYOR]
+    assert context.dropped == {"duplicates": 0, "over_budget": 1}
+
+
+def test_route_header_is_paid_once():
+    # Exactly enough for the header and all three rows; charging the header per row would not fit
+    assembler = ContextAssembler(token_budget=route_cost(PRODUCTION), row_decay=0.9)
+    context = assembler.assemble("production?", [], [PRODUCTION], intents(("production", 0.9)), UNAVAILABLE)
+
+    assert context.record_counts == {"production": 3}
+    assert context.dropped["over_budget"] == 0
+    assert context.records_text.count(route_header("production", PRODUCTION.columns)) == 1
+
+
+def test_mixed_evidence_is_ranked_on_one_scale():
+    blasting = "Blasting schedule moved to Thursday at the south pit"
+    # Room for the header and the first two rows, or for the chunk - not both
+    budget = route_cost(PRODUCTION, PRODUCTION.rows[:2]) + 1
+    assert line_cost(blasting) > 1
+
+    strong_rows = ContextAssembler(token_budget=budget, row_decay=0.9).assemble(
+        "production?", docs((blasting, 4.0)), [PRODUCTION], intents(("production", 0.9)), UNAVAILABLE)
+    close_chunk = ContextAssembler(token_budget=line_cost(blasting) + 1, row_decay=0.9).assemble(
+        "production?", docs((blasting, 0.0)), [PRODUCTION], intents(("production", 0.4)), UNAVAILABLE)
+
+    # A strong intent's rows outrank a distant chunk...
+    assert strong_rows.record_counts == {"production": 2}
+    assert strong_rows.documents == []
+    # ...and a close chunk outranks weak rows
+    assert [doc.page_content for doc in close_chunk.documents] == [blasting]
+    assert close_chunk.record_counts == {}
+
+
+def test_routes_and_rows_keep_their_original_order():
+    # Equipment scores higher, but sections follow the SQL result order
+    assembler = ContextAssembler(token_budget=10_000, row_decay=0.5)
+    context = assembler.assemble(
+        "status?", [], [PRODUCTION, EQUIPMENT],
+        intents(("equipment", 0.95), ("production", 0.5)), UNAVAILABLE,
+    )
+
+    production_header = route_header("production", PRODUCTION.columns)
+    equipment_header = route_header("equipment", EQUIPMENT.columns)
+    assert context.records_text == (
+        production_header + "\n" + "\n".join(format_row(row) for row in PRODUCTION.rows)
+        + "\n\n" + equipment_header + "\n" + "\n".join(format_row(row) for row in EQUIPMENT.rows)
+    )
+    assert format_row(PRODUCTION.rows[0]) == "North Pit | 2025-09-17 | 1200.5"
+
+
+def test_repeated_rows_are_dropped():
+    repeated = QueryResult("equipment", EQUIPMENT.columns, EQUIPMENT.rows + EQUIPMENT.rows[:1])
+    context = ContextAssembler(token_budget=10_000).assemble(
+        "status?", [], [repeated], intents(("equipment", 0.9)), UNAVAILABLE)
+
+    assert context.record_counts == {"equipment": 2}
+    assert context.dropped["duplicates"] == 1
+
+
+def test_unavailable_sql_stage_is_reported():
+    context = ContextAssembler(token_budget=10_000).assemble(
+        "status?", docs((CONVEYOR, 0.1)), None, intents(("equipment", 0.9)), UNAVAILABLE)
+
+    assert context.records_text == UNAVAILABLE
+    assert context.text.endswith(f"Database Records:\n{UNAVAILABLE}")
+    assert context.record_counts == {}
+
+
+def test_no_rows_found():
+    context = ContextAssembler(token_budget=10_000).assemble(
+        "status?", [], [QueryResult("equipment", EQUIPMENT.columns, [])], intents(), UNAVAILABLE)
+
+    assert context.records_text == "No relevant data found in database for this query."
+
+
+def test_prompt_tokens_and_stats_match_the_text():
+    question = "Which equipment needs attention?"
+    context = ContextAssembler(token_budget=10_000).assemble(
+        question, docs((PUMP_FAILURE, 0.2), (PUMP_FAILURE_AGAIN, 0.3)), [EQUIPMENT],
+        intents(("equipment", 0.9)), UNAVAILABLE,
+    )
+
+    assert context.prompt_tokens == (
+        estimate_tokens(context.text) + estimate_tokens(question) + PROMPT_OVERHEAD_TOKENS
+    )
+    assert context.stats() == {
+        "prompt_tokens": context.prompt_tokens,
+        "documents": 1,
+        "records": {"equipment": 2},
+        "dropped": {"duplicates": 1, "over_budget": 0},
+    }
+    assert context.text.startswith(f"Knowledge base:\n[1] {PUMP_FAILURE}")
@@ -0,0 +1,167 @@
+# backend/tests/test_db_pool.py
+import threading
+import time
+
+import mysql.connector
+import pytest
+
+from database import db_config
+from database.db_config import MySQLConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.in_transaction = False
+        self.closed = False
+        self.fail_rollback = False
+
+    def cursor(self, *args, **kwargs):
+        return self
+
+    def execute(self, query, params=None):
+        raise RuntimeError("query failed")
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise RuntimeError("connection lost")
+        self.in_transaction = False
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    opened = []
+
+    def fake_connect(**kwargs):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(mysql.connector, "connect", fake_connect)
+    return opened
+
+
+def make_pool(size=3, timeout=2.0):
+    return MySQLConnectionPool(size=size, timeout=timeout, ping_interval=10.0, recycle=3600)
+
+
+def test_failed_queries_return_their_connections(connect):
+    pool = make_pool(size=3, timeout=0.2)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            with pool.acquire() as conn:
+                conn.cursor().execute("SELECT 1")
+
+    assert pool.metrics()["in_use"] == 0
+    # The whole pool is still available
+    held = [pool.acquire() for _ in range(3)]
+    assert pool.metrics()["in_use"] == 3
+    for conn in held:
+        conn.close()
+
+
+def test_returned_connection_is_reused(connect):
+    pool = make_pool(size=1)
+    with pool.acquire():
+        pass
+    with pool.acquire():
+        pass
+    assert len(connect) == 1
+    assert pool.metrics()["checkouts"] == 2
+
+
+def test_closed_wrapper_rejects_use(connect):
+    pool = make_pool()
+    conn = pool.acquire()
+    conn.close()
+    with pytest.raises(Exception):
+        conn.cursor()
+
+
+def test_exhausted_pool_times_out(connect):
+    pool = make_pool(size=1, timeout=0.1)
+    with pool.acquire():
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+    assert pool.metrics()["wait_timeouts"] == 1
+
+
+def acquire_in_thread(pool):
+    result = {}
+
+    def run():
+        started = time.monotonic()
+        try:
+            with pool.acquire():
+                result["ok"] = True
+        except Exception as e:
+            result["error"] = e
+        result["seconds"] = time.monotonic() - started
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+def wait_for_waiter(pool):
+    deadline = time.monotonic() + 2
+    while pool.metrics()["waits"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_discard_wakes_a_waiter(connect):
+    pool = make_pool(size=1, timeout=5.0)
+    held = pool.acquire()
+    thread, result = acquire_in_thread(pool)
+    wait_for_waiter(pool)
+
+    # A broken connection is discarded on return, freeing its slot
+    connect[0].in_transaction = True
+    connect[0].fail_rollback = True
+    held.close()
+    thread.join(timeout=5)
+
+    assert result.get("ok"), result
+    assert result["seconds"] < 1.0
+    assert pool.metrics()["discarded"] == 1
+
+
+def test_failed_connect_wakes_a_waiter(monkeypatch):
+    pool = make_pool(size=1, timeout=5.0)
+    release_connect = threading.Event()
+    calls = []
+
+    def flaky_connect(**kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            release_connect.wait(5)
+            raise mysql.connector.Error("server restarting")
+        return FakeConnection()
+
+    monkeypatch.setattr(mysql.connector, "connect", flaky_connect)
+    first, first_result = acquire_in_thread(pool)
+    while not calls:
+        time.sleep(0.01)
+    second, second_result = acquire_in_thread(pool)
+    wait_for_waiter(pool)
+
+    release_connect.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+
+    assert isinstance(first_result.get("error"), mysql.connector.Error)
+    assert second_result.get("ok"), second_result
+    assert second_result["seconds"] < 1.0
+
+
+def test_pool_is_rebuilt_after_fork(connect, monkeypatch):
+    monkeypatch.setattr(db_config, "_pool", None)
+    pool = db_config.get_connection_pool()
+    assert db_config.get_connection_pool() is pool
+    monkeypatch.setattr(pool, "pid", -1)
+    assert db_config.get_connection_pool() is not pool
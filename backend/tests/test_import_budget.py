@@ -0,0 +1,57 @@
+# backend/tests/test_import_budget.py
+# The web server must start without the AI stack: startup modules are imported
+# in a fresh interpreter and may neither load a heavy module nor exceed the budget.
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the web server must not import before the RAG engine (or the analytics store) is first needed
+HEAVY_MODULES = [
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "langchain",
+    "langchain_community",
+    "chromadb",
+    "pandas",
+    "numpy",
+    "duckdb",
+    "sqlalchemy",
+]
+
+# Modules on the fast startup path (health, dashboard and MySQL routes)
+ENTRY_MODULES = ["app", "mysql_routes"]
+
+IMPORT_BUDGET_SECONDS = 1.0
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def probe(module):
+    """Import ``module`` in a fresh interpreter; return its import time and the heavy modules it loaded"""
+    env = dict(os.environ, PRELOAD_MODELS="false", RAG_WARMUP_ON_START="false")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ENTRY_MODULES)
+def test_startup_module_skips_the_ai_stack(module):
+    report = probe(module)
+    assert report["heavy"] == []
+    assert report["seconds"] <= IMPORT_BUDGET_SECONDS
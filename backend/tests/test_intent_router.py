@@ -0,0 +1,57 @@
+# backend/tests/test_intent_router.py
+from models.intent_router import INTENT_PROTOTYPES, IntentRouter
+
+INTENTS = list(INTENT_PROTOTYPES)
+
+
+def one_hot(intent):
+    return [1.0 if name == intent else 0.0 for name in INTENTS]
+
+
+class FakeEmbeddings:
+    """Prototypes embed to their intent's axis; questions embed to ``self.question_intent``"""
+
+    def __init__(self, question_intent="production"):
+        self.question_intent = question_intent
+        self.failing = False
+        self.query_calls = 0
+
+    def embed_documents(self, texts):
+        owners = {text: intent for intent, examples in INTENT_PROTOTYPES.items() for text in examples}
+        return [one_hot(owners[text]) for text in texts]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        if self.failing:
+            raise ConnectionError("embedding service down")
+        return one_hot(self.question_intent)
+
+
+def test_embedding_routes_question():
+    router = IntentRouter(FakeEmbeddings("fuel"), threshold=0.35, margin=0.15)
+    result = router.classify("How much diesel did we burn?")
+    assert result.intents == ["fuel"]
+    assert result.embedding is not None
+
+
+def test_results_are_cached_per_normalized_question():
+    embeddings = FakeEmbeddings("production")
+    router = IntentRouter(embeddings)
+    router.classify("Production output?")
+    router.classify("production   output")
+    assert embeddings.query_calls == 1
+
+
+def test_keyword_fallback_is_not_cached():
+    embeddings = FakeEmbeddings("fuel")
+    router = IntentRouter(embeddings)
+    embeddings.failing = True
+    degraded = router.classify("What is our fuel and energy consumption?")
+    assert degraded.embedding is None
+    assert degraded.intents == ["fuel"]
+
+    # The embedding service is back: the question is classified properly
+    embeddings.failing = False
+    recovered = router.classify("What is our fuel and energy consumption?")
+    assert recovered.embedding is not None
+    assert embeddings.query_calls == 2
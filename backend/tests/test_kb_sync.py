@@ -0,0 +1,142 @@
+# backend/tests/test_kb_sync.py
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+from config import Config
+from utils import kb_sync
+from utils.chromadb_manager import record_id
+from utils.kb_sync import KnowledgeBaseSync
+
+TABLE = "mining_incidents"
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = []
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        self.db.executed.append(query)
+        if "information_schema.COLUMNS" in query:
+            self.result = [{"COLUMN_NAME": "incident_id", "DATA_TYPE": "varchar"},
+                           {"COLUMN_NAME": "updated_at", "DATA_TYPE": "datetime"}]
+        elif query.startswith("SELECT incident_id AS pk"):
+            self.result = [{"pk": row["incident_id"]} for row in self.db.rows]
+        else:
+            last_updated, _, last_pk, _ = params
+            self.result = [
+                row for row in self.db.rows
+                if (row["updated_at"], row["incident_id"]) > (last_updated, last_pk)
+            ]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+
+class FakeChroma:
+    def __init__(self):
+        self.vectors = {}
+        self.listed = 0
+
+    def upsert_records(self, ids, records, document_type, metadatas):
+        self.vectors.update(zip(ids, metadatas))
+
+    def list_ids(self, where):
+        self.listed += 1
+        return {vector_id for vector_id, metadata in self.vectors.items() if metadata["table"] == where["table"]}
+
+    def delete_ids(self, ids):
+        for vector_id in ids:
+            del self.vectors[vector_id]
+
+
+def incident(incident_id, day):
+    return {"incident_id": incident_id, "updated_at": datetime(2024, 1, day), "Incident_Type": "Fall"}
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    db = FakeDatabase([incident("INC1", 1), incident("INC2", 2)])
+    monkeypatch.setattr(kb_sync, "get_mysql_connection", db.connect)
+    monkeypatch.setattr(Config, "KB_SYNC_RECONCILE_INTERVAL", 3600)
+    chroma = FakeChroma()
+    sync = KnowledgeBaseSync(chroma, state_path=str(tmp_path / "state.json"), batch_size=10)
+    return db, chroma, sync
+
+
+def scanned_pks(db):
+    return [query for query in db.executed if query.startswith("SELECT incident_id AS pk")]
+
+
+def test_vector_ids_match_csv_seeding(setup):
+    db, chroma, sync = setup
+    sync.run([TABLE])
+    assert set(chroma.vectors) == {record_id(TABLE, "INC1"), record_id(TABLE, "INC2")}
+
+
+def test_incremental_run_skips_the_deletion_scan(setup):
+    db, chroma, sync = setup
+    first = sync.run([TABLE])[TABLE]
+    assert first["reconciled"] is True
+
+    db.rows = [incident("INC1", 1), incident("INC3", 3)]
+    db.executed.clear()
+    chroma.listed = 0
+    report = sync.run([TABLE])[TABLE]
+
+    assert report["upserted"] == 1
+    assert report["reconciled"] is False and report["deleted"] == 0
+    assert scanned_pks(db) == [] and chroma.listed == 0
+    assert record_id(TABLE, "INC2") in chroma.vectors
+
+
+def test_full_run_deletes_removed_rows(setup):
+    db, chroma, sync = setup
+    sync.run([TABLE])
+    db.rows = [incident("INC1", 1)]
+
+    report = sync.run([TABLE], full=True)[TABLE]
+
+    assert report["reconciled"] is True and report["deleted"] == 1
+    assert set(chroma.vectors) == {record_id(TABLE, "INC1")}
+
+
+def test_reconcile_runs_again_once_the_interval_passes(setup, monkeypatch):
+    db, chroma, sync = setup
+    sync.run([TABLE])
+    db.rows = [incident("INC2", 2)]
+    sync.state[TABLE]["reconciled_at"] -= Config.KB_SYNC_RECONCILE_INTERVAL
+
+    report = sync.run([TABLE])[TABLE]
+
+    assert report["reconciled"] is True and report["deleted"] == 1
+
+
+def test_zero_interval_reconciles_only_on_full_runs(setup, monkeypatch):
+    db, chroma, sync = setup
+    monkeypatch.setattr(Config, "KB_SYNC_RECONCILE_INTERVAL", 0)
+    sync.run([TABLE])
+    db.rows = []
+    sync.state[TABLE]["reconciled_at"] = 0
+
+    assert sync.run([TABLE])[TABLE]["reconciled"] is False
+    assert sync.run([TABLE], full=True)[TABLE]["deleted"] == 2
@@ -0,0 +1,108 @@
+# backend/tests/test_kpi_engine.py
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from config import Config
+from database import kpi_engine as kpi_module
+from database.kpi_engine import KPI_QUERY, KPI_SUMMARY_QUERY, KPIEngine, kpi_window
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        self.conn.executed.append((query, params))
+
+    def fetchone(self):
+        return self.conn.row
+
+    def close(self):
+        self.conn.closed += 1
+
+
+class FakeConnection:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+        self.closed = 0
+
+    def cursor(self, dictionary=False):
+        assert dictionary
+        return FakeCursor(self)
+
+
+@pytest.fixture(autouse=True)
+def window_days(monkeypatch):
+    monkeypatch.setattr(Config, "KPI_WINDOW_DAYS", 30)
+
+
+def test_window_rolls_over_the_year():
+    assert kpi_window(date(2024, 12, 31)) == {
+        "window_start": date(2024, 12, 1),
+        "month_start": date(2024, 12, 1),
+        "next_month_start": date(2025, 1, 1),
+    }
+    assert kpi_window(date(2025, 1, 1)) == {
+        "window_start": date(2024, 12, 2),
+        "month_start": date(2025, 1, 1),
+        "next_month_start": date(2025, 2, 1),
+    }
+
+
+@pytest.mark.parametrize("today, window_start", [
+    (date(2024, 2, 29), date(2024, 1, 30)),  # leap year
+    (date(2025, 2, 28), date(2025, 1, 29)),
+])
+def test_window_in_february(today, window_start):
+    window = kpi_window(today)
+    assert window["window_start"] == window_start
+    assert window["month_start"] == today.replace(day=1)
+    assert window["next_month_start"] == date(today.year, 3, 1)
+
+
+ROW = {
+    "total_incidents": 7,
+    "critical_alerts": 2,
+    "avg_efficiency": Decimal("81.456"),
+    "monthly_production": Decimal("12500.5"),
+}
+
+
+def test_live_query_runs_once_with_the_window():
+    conn = FakeConnection(ROW)
+    kpis = KPIEngine(use_summary=False).compute(conn, today=date(2024, 12, 31))
+
+    assert conn.executed == [(KPI_QUERY, kpi_window(date(2024, 12, 31)))]
+    assert conn.closed == 1
+    assert kpis == {
+        "total_incidents": 7,
+        "critical_alerts": 2,
+        "avg_efficiency": 81.46,
+        "monthly_production": 12500.5,
+    }
+
+
+def test_summary_query_refreshes_the_rollup_first(monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(kpi_module.rollup_manager, "ensure_fresh", lambda conn, names: refreshed.append(names))
+    conn = FakeConnection(ROW)
+    kpis = KPIEngine(use_summary=True).compute(conn, today=date(2024, 2, 29))
+
+    assert refreshed == [["production_daily"]]
+    assert conn.executed == [(KPI_SUMMARY_QUERY, kpi_window(date(2024, 2, 29)))]
+    assert kpis["monthly_production"] == 12500.5
+
+
+def test_empty_tables_map_to_zero():
+    conn = FakeConnection({
+        "total_incidents": 0, "critical_alerts": 0, "avg_efficiency": None, "monthly_production": None
+    })
+    assert KPIEngine(use_summary=False).compute(conn, today=date(2025, 1, 1)) == {
+        "total_incidents": 0,
+        "critical_alerts": 0,
+        "avg_efficiency": 0.0,
+        "monthly_production": 0.0,
+    }
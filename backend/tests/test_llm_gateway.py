@@ -0,0 +1,83 @@
+# backend/tests/test_llm_gateway.py
+import asyncio
+
+import pytest
+
+from models.llm_gateway import LLMGateway
+
+
+class SlowBackend:
+    name = "fake"
+    model = "fake-model"
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = None
+
+    async def acomplete(self, context, query, max_tokens=150):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return f"answer to {query}"
+
+
+def gateway(backend):
+    return LLMGateway(backend, max_concurrency=2, queue_timeout=1, max_retries=0)
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        backend = SlowBackend()
+        backend.release = asyncio.Event()
+        llm = gateway(backend)
+
+        leader = asyncio.ensure_future(llm.acomplete("ctx", "q"))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(llm.acomplete("ctx", "q"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        backend.release.set()
+
+        assert await follower == "answer to q"
+        assert leader.cancelled()
+        assert backend.calls == 1
+        assert llm.stats()["coalesced"] == 1
+        assert llm.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_followers_see_the_shared_error():
+    async def scenario():
+        backend = SlowBackend(error=ValueError("bad prompt"))
+        backend.release = asyncio.Event()
+        llm = gateway(backend)
+
+        callers = [asyncio.ensure_future(llm.acomplete("ctx", "q")) for _ in range(3)]
+        await asyncio.sleep(0)
+        backend.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert backend.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_primitives_of_closed_loops_are_dropped():
+    backend = SlowBackend()
+    llm = gateway(backend)
+
+    async def one_call():
+        backend.release = asyncio.Event()
+        backend.release.set()
+        return await llm.acomplete("ctx", "q")
+
+    for _ in range(3):
+        assert asyncio.run(one_call()) == "answer to q"
+
+    assert len(llm._async_loops) == 1
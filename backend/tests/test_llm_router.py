@@ -0,0 +1,176 @@
+# backend/tests/test_llm_router.py
+import pytest
+
+from config import Config
+from models import llm_router
+from models.llm_backend import LLMBackend
+from models.llm_router import AllBackendsFailed, LLMRouter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBackend(LLMBackend):
+    """Answers instantly in real time; ``latency(call)`` advances the fake clock"""
+
+    def __init__(self, name, clock, latency):
+        self.name = name
+        self.model = name
+        self.clock = clock
+        self.latency = latency
+        self.calls = 0
+
+    def complete(self, context, query, max_tokens=150):
+        self.calls += 1
+        self.clock.now += self.latency(self.calls)
+        return f"{self.name} answer"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_router.time, "monotonic", clock)
+    monkeypatch.setattr(Config, "LLM_LATENCY_MIN_SAMPLES", 3)
+    monkeypatch.setattr(Config, "LLM_LATENCY_SLO", 8.0)
+    monkeypatch.setattr(Config, "LLM_LATENCY_MAX_AGE", 300.0)
+    monkeypatch.setattr(Config, "LLM_PROBE_EVERY", 10)
+    return clock
+
+
+def order(router):
+    return router.stats()["order"]
+
+
+def test_preference_order_while_within_slo(clock):
+    mistral = FakeBackend("mistral", clock, lambda call: 1.0)
+    ollama = FakeBackend("ollama", clock, lambda call: 1.0)
+    router = LLMRouter([mistral, ollama])
+    for i in range(5):
+        assert router.complete("ctx", f"q{i}") == "mistral answer"
+    assert order(router) == ["mistral", "ollama"]
+
+
+def test_slow_backend_is_demoted_then_recovers(clock):
+    # Mistral is slow for its first 3 calls, then fast again
+    mistral = FakeBackend("mistral", clock, lambda call: 20.0 if call <= 3 else 0.5)
+    ollama = FakeBackend("ollama", clock, lambda call: 2.0)
+    router = LLMRouter([mistral, ollama])
+
+    for i in range(3):
+        router.complete("ctx", f"slow{i}")
+    assert order(router) == ["ollama", "mistral"]
+
+    for i in range(50):
+        router.complete("ctx", f"q{i}")
+    # Probe traffic keeps reaching the demoted backend...
+    assert mistral.calls > 3
+    # ...and once the slow samples age out it leads again
+    for i in range(150):
+        router.complete("ctx", f"later{i}")
+    assert order(router) == ["mistral", "ollama"]
+    calls_before = mistral.calls
+    router.complete("ctx", "final")
+    assert mistral.calls == calls_before + 1
+
+
+def test_old_samples_stop_counting(clock):
+    mistral = FakeBackend("mistral", clock, lambda call: 20.0)
+    router = LLMRouter([mistral, FakeBackend("ollama", clock, lambda call: 1.0)])
+    for i in range(3):
+        router.complete("ctx", f"q{i}")
+    state = router._states[0]
+    assert state.is_degraded(clock.now)
+    clock.now += Config.LLM_LATENCY_MAX_AGE + 1
+    assert not state.is_degraded(clock.now)
+
+
+def test_failover_and_cooldown(clock, monkeypatch):
+    monkeypatch.setattr(Config, "LLM_MAX_RETRIES", 0)
+    monkeypatch.setattr(Config, "LLM_FAILURE_THRESHOLD", 2)
+
+    class Broken(FakeBackend):
+        def complete(self, context, query, max_tokens=150):
+            self.calls += 1
+            raise ValueError("down")
+
+    broken = Broken("mistral", clock, None)
+    router = LLMRouter([broken, FakeBackend("ollama", clock, lambda call: 1.0)])
+    assert router.complete("ctx", "a") == "ollama answer"
+    assert router.complete("ctx", "b") == "ollama answer"
+    # Cooling down: not tried at all
+    assert router.complete("ctx", "c") == "ollama answer"
+    assert broken.calls == 2
+    assert router.stats()["backends"]["mistral"]["healthy"] is False
+
+
+def test_all_backends_failing_raises(clock, monkeypatch):
+    monkeypatch.setattr(Config, "LLM_MAX_RETRIES", 0)
+
+    class Broken(FakeBackend):
+        def complete(self, context, query, max_tokens=150):
+            raise ValueError("down")
+
+    router = LLMRouter([Broken("mistral", clock, None)])
+    with pytest.raises(AllBackendsFailed):
+        router.complete("ctx", "q")
+    assert router.generate_response("ctx", "q").startswith(LLMRouter.ERROR_PREFIX)
+
+
+def test_backend_failing_its_health_check_is_never_called(clock, monkeypatch):
+    monkeypatch.setattr(Config, "LLM_HEALTH_CHECK_TTL", 30.0)
+
+    class NoKey(FakeBackend):
+        health_checks = 0
+
+        def check_health(self):
+            self.health_checks += 1
+            return False
+
+    mistral = NoKey("mistral", clock, lambda call: 1.0)
+    router = LLMRouter([mistral, FakeBackend("ollama", clock, lambda call: 1.0)])
+    for i in range(5):
+        assert router.complete("ctx", f"q{i}") == "ollama answer"
+
+    assert mistral.calls == 0
+    assert mistral.health_checks == 1  # cached between calls
+    assert order(router) == ["ollama"]
+    assert router.stats()["backends"]["mistral"]["health_check_ok"] is False
+
+
+def test_backend_is_health_checked_before_it_reenters(clock, monkeypatch):
+    monkeypatch.setattr(Config, "LLM_MAX_RETRIES", 0)
+    monkeypatch.setattr(Config, "LLM_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(Config, "LLM_COOLDOWN", 30.0)
+    monkeypatch.setattr(Config, "LLM_HEALTH_CHECK_TTL", 600.0)
+
+    class Flaky(FakeBackend):
+        up = True
+
+        def complete(self, context, query, max_tokens=150):
+            self.calls += 1
+            raise ValueError("down")
+
+        def check_health(self):
+            return self.up
+
+    flaky = Flaky("mistral", clock, None)
+    router = LLMRouter([flaky, FakeBackend("ollama", clock, lambda call: 1.0)])
+    assert router.complete("ctx", "a") == "ollama answer"
+    assert flaky.calls == 1
+
+    # Still down when the cooldown ends: the health check keeps it out
+    flaky.up = False
+    clock.now += 31
+    assert router.complete("ctx", "b") == "ollama answer"
+    assert flaky.calls == 1
+
+    # Back up: it passes the next check and is tried first again
+    flaky.up = True
+    clock.now += 601
+    router.complete("ctx", "c")
+    assert flaky.calls == 2
@@ -0,0 +1,104 @@
+# backend/tests/test_mining_csv.py
+from datetime import date, datetime, time
+
+import pytest
+
+from database.mining_csv import (
+    iter_batches, iter_equipment_status, iter_shift_production, iter_trip_details,
+    parse_date, parse_number, parse_timestamp, shift_name,
+)
+
+
+def write(tmp_path, name, lines):
+    path = tmp_path / name
+    # Exports start with a UTF-8 BOM and their names contain spaces
+    path.write_text("\ufeff" + "\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-09-17", date(2025, 9, 17)),
+    ("1 Jul 2025", date(2025, 7, 1)),
+    ("1 July 2025", date(2025, 7, 1)),
+    (" - ", None),
+])
+def test_parse_date(value, expected):
+    assert parse_date(value) == expected
+
+
+def test_parse_date_rejects_unknown_formats():
+    with pytest.raises(ValueError):
+        parse_date("July the first")
+
+
+def test_parse_timestamp_converts_to_naive_utc():
+    assert parse_timestamp("2025-10-01 03:24:29.576452+00") == datetime(2025, 10, 1, 3, 24, 29, 576452)
+    assert parse_timestamp("2025-10-01 08:54:29+05:30") == datetime(2025, 10, 1, 3, 24, 29)
+
+
+def test_parse_number():
+    assert parse_number("1,234.5") == 1234.5
+    assert parse_number("12.0", int) == 12
+    assert parse_number("n/a") is None
+
+
+def test_shift_name():
+    assert shift_name("Shift - A") == "A"
+    assert shift_name("shift b") == "B"
+    assert shift_name("Total Shift") == "Total"
+
+
+def test_iter_equipment_status(tmp_path):
+    path = write(tmp_path, "equipment status.csv", [
+        "id,equipment_name,status,date,start_time,end_time,duration_minutes,alert,reason,issue,comment,created_at",
+        "e1,EX-01,inactive,2025-09-17,06:00:00,07:30:00,90,yes,Breakdown,Hydraulics,-,2025-10-01 03:24:29+00",
+        ",EX-02,ACTIVE,2025-09-17,06:00:00,07:00:00,60,No,,,,",  # no id: skipped
+        "e2,EX-02,,2025-09-17,07:00:00,08:00:00,,No,,,,",
+    ])
+
+    rows = list(iter_equipment_status(path))
+
+    assert rows == [
+        ("e1", "EX-01", "INACTIVE", date(2025, 9, 17), time(6), time(7, 30), 90, "Yes",
+         "Breakdown", "Hydraulics", None, datetime(2025, 10, 1, 3, 24, 29)),
+        ("e2", "EX-02", "ACTIVE", date(2025, 9, 17), time(7), time(8), 0, "No",
+         None, None, None, None),
+    ]
+
+
+def test_iter_shift_production_emits_one_row_per_shift(tmp_path):
+    measures = "Excavator,Dumper,Trip Count for Mining,Trip Count for Reclaim,Total Trips,Qty (m3),Grader,Dozer"
+    path = write(tmp_path, "mines_production_data by date.csv", [
+        ",Shift - A,,,,,,,,Total Shift,,,,,,,",
+        f"Date,{measures},{measures}",
+        "1 Jul 2025,2,6,40,5,45,\"1,200.5\",1,1,6,18,120,15,135,\"3,600\",2,3",
+        ",,,,,,,,,,,,,,,,",  # blank line between months: skipped
+    ])
+
+    rows = list(iter_shift_production(path))
+
+    assert rows == [
+        (date(2025, 7, 1), "A", 2, 6, 40, 5, 45, 1200.5, 1, 1),
+        (date(2025, 7, 1), "Total", 6, 18, 120, 15, 135, 3600.0, 2, 3),
+    ]
+
+
+def test_iter_trip_details(tmp_path):
+    path = write(tmp_path, "trips by equipment.csv", [
+        "Date,Source,Destination,Specification,Asset Name,Operator,Production,Total",
+        "17 Sep 2025,Pit 1,Crusher,100T,DMP-07,Ravi,\"1,050.5\",12",
+        "17 Sep 2025,Pit 2,Dump,,DMP-08,-,,",
+        ",Pit 3,Dump,100T,DMP-09,Asha,10,1",  # no date: skipped
+    ])
+
+    rows = list(iter_trip_details(path))
+
+    assert rows == [
+        (date(2025, 9, 17), "Pit 1", "Crusher", "100T", "DMP-07", "Ravi", 1050.5, 12),
+        (date(2025, 9, 17), "Pit 2", "Dump", None, "DMP-08", None, 0, 0),
+    ]
+
+
+def test_iter_batches():
+    assert list(iter_batches(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_batches(iter([]), 2)) == []
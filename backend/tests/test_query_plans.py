@@ -0,0 +1,97 @@
+# backend/tests/test_query_plans.py
+# EXPLAINs every production query against the migrated schema and fails on
+# full table scans. Needs a MySQL-compatible server (e.g. the docker-compose
+# mysql service or a local MariaDB); skipped when none is reachable.
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database.db_config import get_mysql_connection
+from database.schema import migrate
+
+# Queries whose full scan is intentional and bounded
+ALLOWED_FULL_SCANS = {
+    "mysql_routes.CONTEXT_EQUIPMENT_QUERY": "unfiltered LIMIT 20 sample, stops after 20 rows",
+}
+
+
+@pytest.fixture(scope="module")
+def mysql():
+    try:
+        connection = get_mysql_connection()
+    except Exception as e:
+        pytest.skip(f"MySQL unavailable: {e}")
+    with connection as conn:
+        migrate(conn)
+        yield conn
+
+
+def production_queries():
+    """name -> (sql, params) for every query the backend runs against MySQL"""
+    import app
+    import mysql_routes
+    from database import aggregates, auth_routes, kpi_engine, rollups
+    from models.rag_engine import SQL_TEMPLATES
+    from utils.kb_sync import SYNC_TABLES, UPDATED_AT_BATCH_QUERY
+
+    since = date.today() - timedelta(days=30)
+    queries = {}
+    for route, sql in SQL_TEMPLATES.items():
+        queries[f"rag.{route}"] = (sql, None)
+    queries["app.INCIDENTS_QUERY"] = (app.INCIDENTS_QUERY, (5,))
+    queries["app.MAINTENANCE_ALERTS_QUERY"] = (app.MAINTENANCE_ALERTS_QUERY, None)
+    for name in (
+        "EQUIPMENT_QUERY", "PRODUCTION_QUERY", "MAINTENANCE_ALERTS_QUERY", "INCIDENTS_QUERY",
+        "CONTEXT_EQUIPMENT_QUERY", "CONTEXT_PRODUCTION_QUERY", "CONTEXT_ALERTS_QUERY",
+    ):
+        queries[f"mysql_routes.{name}"] = (getattr(mysql_routes, name), None)
+    queries["kpi.KPI_QUERY"] = (kpi_engine.KPI_QUERY, kpi_engine.kpi_window())
+    queries["kpi.KPI_SUMMARY_QUERY"] = (kpi_engine.KPI_SUMMARY_QUERY, kpi_engine.kpi_window())
+    for name in (
+        "INCIDENTS_TREND_ROLLUP", "PRODUCTION_TREND_ROLLUP", "EFFICIENCY_TREND_ROLLUP",
+        "INCIDENTS_TREND_RAW", "PRODUCTION_TREND_RAW", "EFFICIENCY_TREND_RAW",
+        "EQUIPMENT_STATUS_QUERY", "KNOWN_SITES_QUERY",
+    ):
+        queries[f"aggregates.{name}"] = (getattr(aggregates, name), None)
+    for name, spec in rollups.ROLLUPS.items():
+        queries[f"rollups.{name}"] = (spec["select"], {"since": since})
+    for table, spec in SYNC_TABLES.items():
+        last_pk = "" if spec["pk"] == "equipment_id" else 0
+        queries[f"kb_sync.{table}"] = (
+            UPDATED_AT_BATCH_QUERY.format(table=table, pk=spec["pk"]),
+            (datetime(2024, 1, 1), datetime(2024, 1, 1), last_pk, 500),
+        )
+    queries["auth.USER_EXISTS_QUERY"] = (auth_routes.USER_EXISTS_QUERY, ("manager", "manager@example.com"))
+    queries["auth.LOGIN_QUERY"] = (auth_routes.LOGIN_QUERY, ("manager", "manager"))
+    queries["auth.PROFILE_QUERY"] = (auth_routes.PROFILE_QUERY, (1,))
+    return queries
+
+
+def explain(cursor, sql, params):
+    if params is None:
+        cursor.execute("EXPLAIN " + sql)
+    else:
+        cursor.execute("EXPLAIN " + sql, params)
+    return cursor.fetchall()
+
+
+def test_production_queries_use_indexes(mysql):
+    cursor = mysql.cursor(dictionary=True)
+    # Make the optimizer cost plans as if tables were large, so a near-empty
+    # schema shows the plan production would get instead of "scan, it's tiny"
+    cursor.execute("SET SESSION max_seeks_for_key = 1")
+    failures = []
+    for name, (sql, params) in production_queries().items():
+        try:
+            plan = explain(cursor, sql, params)
+        except Exception as e:
+            failures.append(f"{name}: EXPLAIN failed ({e})")
+            continue
+        for row in plan:
+            table = row.get("table") or ""
+            # Derived/union temp tables (<derived2>, <union1,2>) are scanned by design
+            if row.get("type") == "ALL" and not table.startswith("<") and name not in ALLOWED_FULL_SCANS:
+                failures.append(f"{name}: full scan of {table} ({row.get('Extra') or 'no index usable'})")
+    cursor.close()
+
+    assert failures == []
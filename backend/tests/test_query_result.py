@@ -0,0 +1,60 @@
+# backend/tests/test_query_result.py
+from datetime import date
+from decimal import Decimal
+
+from database.query_result import QueryResult, json_value
+
+
+def make_result(count):
+    return QueryResult("equipment_status", ["equipment", "hours"], [(f"EX-{i:02d}", i) for i in range(count)])
+
+
+def test_table_carries_every_row_for_client_paging():
+    table = make_result(23).table(page_size=10, max_rows=500)
+    assert len(table["rows"]) == 23
+    assert table["page"] == 1
+    assert table["total_pages"] == 3
+    assert table["total_rows"] == 23
+    assert table["truncated"] is False
+
+
+def test_table_is_bounded():
+    table = make_result(30).table(page_size=10, max_rows=25)
+    assert len(table["rows"]) == 25
+    assert table["total_pages"] == 3
+    assert table["truncated"] is True
+
+
+def test_empty_table_has_one_page():
+    table = make_result(0).table()
+    assert table["rows"] == []
+    assert table["total_pages"] == 1
+
+
+def test_json_values():
+    assert json_value(date(2025, 7, 1)) == "2025-07-01"
+    assert json_value(Decimal("1.50")) == 1.5
+    assert json_value(b"ok") == "ok"
+
+
+def test_from_cursor_accepts_dict_rows():
+    class Cursor:
+        description = [("equipment",), ("hours",)]
+
+    result = QueryResult.from_cursor("equipment", Cursor(), [{"hours": 3, "equipment": "DZ-1"}])
+    assert result.rows == [("DZ-1", 3)]
+
+
+def test_chart_payloads_are_columnar():
+    result = QueryResult("incidents", ["month", "severity", "count"], [
+        ("2025-07", "High", 2), ("2025-07", "Low", 1), ("2025-08", "High", 4),
+    ])
+    assert result.pivot("month", "severity", "count") == {
+        "labels": ["2025-07", "2025-08"],
+        "series": {"High": [2, 4], "Low": [1, 0]},
+    }
+    assert result.count_by("severity") == {"labels": ["High", "Low"], "series": {"count": [2, 1]}}
+    assert result.sum_by("month", ["count"]) == {
+        "labels": ["2025-07", "2025-08"],
+        "series": {"count": [3.0, 4.0]},
+    }
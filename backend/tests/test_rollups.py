@@ -0,0 +1,96 @@
+# backend/tests/test_rollups.py
+import pytest
+
+from config import Config
+from database.rollups import RollupManager
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = None
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        query = " ".join(query.split())
+        self.conn.executed.append(query)
+        if query.startswith("SELECT GET_LOCK"):
+            self.result = (1 if self.conn.lock_free else 0,)
+        elif query.startswith("SELECT RELEASE_LOCK"):
+            self.result = (1,)
+        elif query.startswith("SELECT TIMESTAMPDIFF"):
+            self.result = (self.conn.rollup_age,)
+        elif query.startswith("SELECT MAX"):
+            self.result = (None,)
+        elif query.startswith("DELETE") and self.conn.fail_writes:
+            raise RuntimeError("Lock wait timeout exceeded")
+        else:
+            self.result = None
+
+    def fetchone(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, lock_free=True, rollup_age=None, fail_writes=False):
+        self.lock_free = lock_free
+        self.rollup_age = rollup_age
+        self.fail_writes = fail_writes
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def writes(self):
+        return [query for query in self.executed if query.startswith(("DELETE", "INSERT"))]
+
+
+@pytest.fixture(autouse=True)
+def interval(monkeypatch):
+    monkeypatch.setattr(Config, "ROLLUP_REFRESH_INTERVAL", 30.0)
+
+
+def test_refresh_rewrites_due_rollup_under_the_lock():
+    conn = FakeConnection()
+    RollupManager().ensure_fresh(conn, ["production_daily"])
+    assert len(conn.writes()) == 2
+    assert conn.executed[0].startswith("SELECT GET_LOCK")
+    assert conn.executed[-1].startswith("SELECT RELEASE_LOCK")
+
+
+def test_other_worker_holding_the_lock_skips_the_refresh():
+    conn = FakeConnection(lock_free=False)
+    RollupManager().ensure_fresh(conn, ["production_daily"])
+    assert conn.writes() == []
+    assert not any(query.startswith("SELECT RELEASE_LOCK") for query in conn.executed)
+
+
+def test_rollup_refreshed_by_another_worker_is_not_rewritten():
+    conn = FakeConnection(rollup_age=5)
+    RollupManager().ensure_fresh(conn, ["production_daily"])
+    assert conn.writes() == []
+
+
+def test_failed_refresh_waits_out_the_interval():
+    manager = RollupManager()
+    conn = FakeConnection(fail_writes=True)
+    manager.ensure_fresh(conn, ["production_daily"])
+    attempts = len(conn.executed)
+    assert attempts > 0
+
+    manager.ensure_fresh(conn, ["production_daily"])
+    assert len(conn.executed) == attempts
+
+
+def test_backfill_refuses_to_run_alongside_another_writer():
+    with pytest.raises(TimeoutError):
+        RollupManager().backfill(FakeConnection(lock_free=False))
@@ -0,0 +1,121 @@
+# backend/tests/test_snapshot_cache.py
+import threading
+
+import pytest
+
+from utils import snapshot_cache
+from utils.snapshot_cache import SnapshotCache, SnapshotUnavailable
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(snapshot_cache.time, "monotonic", clock)
+    return clock
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def __call__(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {"value": self.calls}
+
+
+def test_fresh_snapshot_is_reused_until_ttl(clock):
+    cache, loader = SnapshotCache(default_ttl=60), Loader()
+    assert cache.get("kpis", loader) == ({"value": 1}, 0.0)
+    clock.now += 30
+    assert cache.get("kpis", loader) == ({"value": 1}, 30.0)
+    clock.now += 31
+    assert cache.get("kpis", loader) == ({"value": 2}, 0.0)
+
+
+def test_failed_refresh_serves_last_snapshot_with_its_age(clock):
+    cache, loader = SnapshotCache(default_ttl=60, error_ttl=10), Loader()
+    cache.get("kpis", loader)
+    clock.now += 90
+    loader.error = ConnectionError("MySQL down")
+    assert cache.get("kpis", loader) == ({"value": 1}, 90.0)
+    assert cache.stats()["failures"] == 1
+
+
+def test_failed_refresh_is_not_retried_within_error_ttl(clock):
+    cache, loader = SnapshotCache(default_ttl=60, error_ttl=10), Loader()
+    cache.get("kpis", loader)
+    clock.now += 61
+    loader.error = ConnectionError("MySQL down")
+    for _ in range(5):
+        cache.get("kpis", loader)
+        clock.now += 1
+    assert loader.calls == 2
+
+    clock.now += 10
+    loader.error = None
+    assert cache.get("kpis", loader) == ({"value": 3}, 0.0)
+
+
+def test_never_loaded_key_raises_until_error_ttl_passes(clock):
+    cache, loader = SnapshotCache(error_ttl=10), Loader()
+    loader.error = ConnectionError("MySQL down")
+    for _ in range(3):
+        with pytest.raises(SnapshotUnavailable):
+            cache.get("kpis", loader)
+    assert loader.calls == 1
+
+    clock.now += 10
+    loader.error = None
+    assert cache.get("kpis", loader)[0] == {"value": 2}
+
+
+def test_invalidate_forgets_failures(clock):
+    cache, loader = SnapshotCache(error_ttl=10), Loader()
+    loader.error = ConnectionError("MySQL down")
+    with pytest.raises(SnapshotUnavailable):
+        cache.get("kpis", loader)
+    cache.invalidate("kpis")
+    loader.error = None
+    assert cache.get("kpis", loader)[0] == {"value": 2}
+
+
+def test_max_keys_evicts_oldest(clock):
+    cache = SnapshotCache(max_keys=2)
+    for key in ("a", "b", "c"):
+        cache.get(key, lambda: key)
+        clock.now += 1
+    assert set(cache.ages()) == {"b", "c"}
+
+
+def test_concurrent_readers_share_one_load():
+    cache = SnapshotCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", slow_loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert [value for value, _ in results] == ["value"] * 4
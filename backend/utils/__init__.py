@@ -1,9 +1,18 @@
 # utils/__init__.py
-from .chromadb_manager import ChromaDBManager
-from .langchain_setup import LangChainSetup, langchain_setup
-
-__all__ = [
-    'ChromaDBManager',
-    'LangChainSetup',
-    'langchain_setup'
-]
+# Exports resolve on first access so that importing a light helper
+# (e.g. utils.embedding_service) does not pull in chromadb and langchain.
+import importlib
+
+_EXPORTS = {
+    'ChromaDBManager': '.chromadb_manager',
+    'LangChainSetup': '.langchain_setup',
+    'langchain_setup': '.langchain_setup',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
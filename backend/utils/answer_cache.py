@@ -0,0 +1,91 @@
+from collections import OrderedDict
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """LRU cache of LLM answers matched by question-embedding similarity
+
+    An entry is only reused when the cosine similarity of the questions is at
+    least ``threshold`` *and* the data fingerprint (SQL context + KPI
+    snapshot) is identical, so answers never outlive the data they describe.
+    """
+
+    def __init__(self, max_entries=512, threshold=0.92):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries = OrderedDict()  # entry_id -> (fingerprint, unit vector, question, answer)
+        self._by_fingerprint = {}      # fingerprint -> set of entry ids
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def fingerprint(*parts):
+        """Stable hash of the data an answer was generated from"""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def lookup(self, embedding, fingerprint):
+        """Return ``(answer, similarity)`` for the closest match, or ``(None, best_similarity)``"""
+        query = self._normalize(embedding)
+        with self._lock:
+            candidate_ids = list(self._by_fingerprint.get(fingerprint, ()))
+            best_id, best_score = None, 0.0
+            if candidate_ids:
+                matrix = np.stack([self._entries[entry_id][1] for entry_id in candidate_ids])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                best_id, best_score = candidate_ids[best], float(scores[best])
+
+            if best_id is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best_id)
+                self._stats["hits"] += 1
+                return self._entries[best_id][3], best_score
+
+            self._stats["misses"] += 1
+            return None, best_score
+
+    def store(self, embedding, fingerprint, question, answer):
+        vector = self._normalize(embedding)
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = (fingerprint, vector, question, answer)
+            self._by_fingerprint.setdefault(fingerprint, set()).add(entry_id)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_fingerprint.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _evict_oldest(self):
+        entry_id, (fingerprint, _, _, _) = self._entries.popitem(last=False)
+        ids = self._by_fingerprint.get(fingerprint)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._by_fingerprint[fingerprint]
+        self._stats["evictions"] += 1
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -1,42 +1,87 @@
 import chromadb
 from chromadb.config import Settings
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
 from config import Config
+from utils.embedding_service import get_embedding_service
 import logging
 import pandas as pd
 import os
+import threading
+import time
+from datetime import date, datetime
 
 logger = logging.getLogger(__name__)
 
+# Row columns copied into vector metadata so searches can be scoped with `where` filters
+DOC_DATE_COLUMNS = {
+    "equipment": "last_maintenance",
+    "incidents": "incident_date",
+    "production": "metric_date",
+    "safety": "audit_date",
+    "maintenance": "start_date",
+    "fuel": "reading_date",
+    "quality": "metric_date",
+}
+DOC_SITE_COLUMNS = {
+    "equipment": "location",
+    "incidents": "mine_name",
+    "production": "site_name",
+    "safety": "site_name",
+    "quality": "site_name",
+}
+
+
+def date_key(value):
+    """YYYYMMDD integer for a date-like value (None when missing/unparseable)"""
+    if value is None:
+        return None
+    try:
+        if not isinstance(value, (datetime, date)):
+            value = pd.Timestamp(value)
+        return int(value.strftime("%Y%m%d"))
+    except (TypeError, ValueError):
+        return None
+
+
+def record_id(table, pk_value):
+    """Vector id of one MySQL row, shared by CSV seeding and the MySQL sync (utils/kb_sync.py)"""
+    return f"{table}:{pk_value}"
+
+
+def scope_metadata(row, doc_type):
+    """Date/site metadata used by scoped similarity search"""
+    metadata = {}
+    key = date_key(row.get(DOC_DATE_COLUMNS.get(doc_type)))
+    if key is not None:
+        metadata["date_key"] = key
+    site = row.get(DOC_SITE_COLUMNS.get(doc_type))
+    if isinstance(site, str) and site.strip():
+        metadata["site"] = site.strip().lower()
+    return metadata
+
+
 class ChromaDBManager:
     def __init__(self, embeddings=None):
         """Initialize ChromaDB manager with LOCAL storage"""
+        # Collection + LangChain wrapper are resolved once and shared by all threads
+        self.collection_name = "mining_knowledge_base"
+        self.collection = None
+        self._vectorstore = None
+        self._handle_lock = threading.RLock()
+        self.last_ingest_stats = None
         try:
-            # ✅ Initialize embeddings first (HuggingFace)
-            if embeddings is None:
-                self.embeddings = HuggingFaceEmbeddings(
-                    model_name=Config.EMBEDDING_MODEL,
-                    model_kwargs={'device': 'cpu'},
-                    encode_kwargs={'normalize_embeddings': False}
-                )
-            else:
-                self.embeddings = embeddings
+            # ✅ Shared embedding service (one model copy per process, loaded on first use)
+            self.embeddings = embeddings or get_embedding_service()
             
             # ✅ Use LOCAL persistent storage instead of server
             self.client = chromadb.PersistentClient(
                 path="./chroma_data"  # Local directory to store data
             )
             
-            self.collection_name = "mining_knowledge_base"
-            
-            # ✅ Create or get collection
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"description": "Mining Knowledge Base"}
-            )
+            # ✅ Create or get collection (long-lived handle, see _refresh_handles)
+            self._refresh_handles()
 
             logger.info(f"✅ Connected to ChromaDB (Local): {self.collection_name}")
         
@@ -45,10 +90,7 @@ class ChromaDBManager:
             # Fallback: try ephemeral client (in-memory)
             try:
                 self.client = chromadb.EphemeralClient()
-                self.collection = self.client.get_or_create_collection(
-                    name=self.collection_name,
-                    metadata={"description": "Mining Knowledge Base"}
-                )
+                self._refresh_handles()
                 logger.info(f"✅ Connected to ChromaDB (In-Memory): {self.collection_name}")
             except Exception as e2:
                 logger.error(f"❌ ChromaDB fallback also failed: {e2}")
@@ -72,13 +114,7 @@ class ChromaDBManager:
             chunks = text_splitter.split_documents(documents)
             
             # Add to ChromaDB with automatic embedding
-            vectorstore = Chroma(
-                client=self.client,
-                collection_name=self.collection_name,
-                embedding_function=self.embeddings
-            )
-            
-            vectorstore.add_documents(chunks)
+            self._get_vectorstore().add_documents(chunks)
             logger.info(f"✅ Added {len(chunks)} document chunks to ChromaDB")
             return True
             
@@ -86,47 +122,117 @@ class ChromaDBManager:
             logger.error(f"❌ Failed to add documents: {e}")
             return False
     
-    def add_csv_data(self, csv_file_path, document_type):
-        """Load data from CSV files and add to ChromaDB"""
+    def add_csv_data(self, csv_file_path, document_type, table=None, pk=None):
+        """Stream a CSV into ChromaDB: read in chunks, embed and write batch by batch
+
+        Memory stays bounded by INGEST_CHUNK_ROWS regardless of file size.
+        A CSV export of a MySQL table (``table`` with primary key column
+        ``pk``) is upserted under the ``<table>:<pk>`` ids the MySQL sync
+        uses, so seeding and syncing never index the same row twice; other
+        files use ``<file>:<row>`` ids. Either way re-running is idempotent.
+        Throughput is logged and kept in ``self.last_ingest_stats``.
+        """
+        if not self.client or not self.collection:
+            logger.error("ChromaDB not initialized")
+            return False
+
+        source = os.path.basename(csv_file_path)
+        started = time.monotonic()
+        total_rows = 0
+
         try:
-            # Read CSV file
-            df = pd.read_csv(csv_file_path)
-            
-            documents = []
-            # Convert each row to a document
-            for idx, row in df.iterrows():
-                # Create meaningful text content from the row
-                content = self._row_to_text(row, document_type)
-                
-                # Create document with metadata
-                doc = Document(
-                    page_content=content,
-                    metadata={
-                        "source": os.path.basename(csv_file_path),
-                        "type": document_type,
-                        "row_id": idx
-                    }
-                )
-                documents.append(doc)
-            
-            # Add to ChromaDB
-            if documents:
-                success = self.add_documents(documents)
-                if success:
-                    logger.info(f"✅ Added {len(documents)} documents from {csv_file_path}")
-                    return True
+            for chunk in pd.read_csv(csv_file_path, chunksize=Config.INGEST_CHUNK_ROWS):
+                # Plain dicts instead of iterrows(): no per-row Series construction
+                records = chunk.to_dict(orient='records')
+                if table and pk in chunk.columns:
+                    row_ids = [str(value) for value in chunk[pk].tolist()]
+                    ids = [record_id(table, row_id) for row_id in row_ids]
+                    table_metadata = {"source": table, "table": table}
                 else:
-                    return False
-            else:
+                    row_ids = chunk.index.tolist()
+                    ids = [f"{source}:{row_id}" for row_id in row_ids]
+                    table_metadata = {"source": source}
+
+                for start in range(0, len(records), Config.EMBED_BATCH_SIZE):
+                    batch = records[start:start + Config.EMBED_BATCH_SIZE]
+                    batch_ids = row_ids[start:start + Config.EMBED_BATCH_SIZE]
+                    self._upsert_batch(
+                        ids=ids[start:start + Config.EMBED_BATCH_SIZE],
+                        texts=[self._row_to_text(row, document_type) for row in batch],
+                        metadatas=[
+                            {
+                                **table_metadata,
+                                "type": document_type,
+                                "row_id": row_id,
+                                **scope_metadata(row, document_type)
+                            }
+                            for row, row_id in zip(batch, batch_ids)
+                        ]
+                    )
+
+                total_rows += len(records)
+                elapsed = time.monotonic() - started
+                logger.info(
+                    f"📥 {source}: {total_rows} rows ingested "
+                    f"({total_rows / elapsed if elapsed else 0:.0f} rows/sec)"
+                )
+
+            elapsed = time.monotonic() - started
+            self.last_ingest_stats = {
+                "source": source,
+                "rows": total_rows,
+                "seconds": round(elapsed, 2),
+                "rows_per_sec": round(total_rows / elapsed, 1) if elapsed else None
+            }
+
+            if total_rows == 0:
                 logger.warning(f"⚠️ No documents created from {csv_file_path}")
                 return False
+
+            logger.info(f"✅ Added {total_rows} documents from {csv_file_path} in {elapsed:.1f}s")
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Failed to load CSV {csv_file_path}: {e}")
             return False
+
+    def upsert_records(self, ids, records, document_type, metadatas):
+        """Embed and upsert already-loaded rows (dicts) under caller-chosen ids"""
+        for start in range(0, len(records), Config.EMBED_BATCH_SIZE):
+            end = start + Config.EMBED_BATCH_SIZE
+            self._upsert_batch(
+                ids=ids[start:end],
+                texts=[self._row_to_text(row, document_type) for row in records[start:end]],
+                metadatas=metadatas[start:end]
+            )
+
+    def delete_ids(self, ids):
+        """Remove vectors by id"""
+        ids = list(ids)
+        for start in range(0, len(ids), Config.INGEST_CHUNK_ROWS):
+            self.collection.delete(ids=ids[start:start + Config.INGEST_CHUNK_ROWS])
+
+    def list_ids(self, where):
+        """Ids of every vector matching a metadata filter"""
+        return set(self.collection.get(where=where, include=[])["ids"])
+
+    def get_metadata_by_id(self, where):
+        """``{id: metadata}`` for every vector matching a metadata filter (no documents/embeddings)"""
+        result = self.collection.get(where=where, include=["metadatas"])
+        return dict(zip(result["ids"], result["metadatas"]))
+
+    def _upsert_batch(self, ids, texts, metadatas):
+        """Embed one batch and write it straight to the collection"""
+        embeddings = self.embeddings.embed_documents(texts)
+        self.collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas
+        )
     
     def _row_to_text(self, row, doc_type):
-        """Convert CSV row to meaningful text content"""
+        """Convert CSV row (a plain dict) to meaningful text content"""
         if doc_type == "equipment":
             return f"""
             Equipment Monitoring:
@@ -209,25 +315,112 @@ class ChromaDBManager:
         
         else:
             # Generic fallback - convert all columns to text
-            content_parts = [f"{col}: {row.get(col, 'N/A')}" for col in row.index]
+            content_parts = [f"{col}: {value}" for col, value in row.items()]
             return "\n".join(content_parts)
     
-    def similarity_search(self, query, k=5):
+    def similarity_search(self, query, k=5, embedding=None):
         """Perform semantic search with embeddings"""
+        return [doc for doc, _ in self.similarity_search_with_scores(query, k=k, embedding=embedding)]
+
+    def similarity_search_with_scores(self, query, k=5, embedding=None):
+        """Semantic search returning ``(Document, distance)`` pairs
+
+        Pass a precomputed ``embedding`` to skip re-embedding the query.
+        """
         if not self.client or not self.collection:
             logger.warning("⚠️ ChromaDB not initialized, returning empty results")
             return []
         
         try:
-            vectorstore = Chroma(
-                client=self.client,
-                collection_name=self.collection_name,
-                embedding_function=self.embeddings
-            )
-            return vectorstore.similarity_search(query, k=k)
+            if embedding is None:
+                embedding = self.embeddings.embed_query(query)
+            return self.query_by_embedding(embedding, k=k)
         except Exception as e:
             logger.error(f"❌ Similarity search failed: {e}")
             return []
+
+    def similarity_search_scoped(self, query, scopes, k=5, embedding=None, min_results=None):
+        """Search with the narrowest metadata scope that returns enough results
+
+        ``scopes`` is a list of Chroma ``where`` filters ordered from narrowest
+        to broadest (``None`` means the whole collection). Returns
+        ``(pairs, where)`` with the ``(Document, distance)`` pairs and the
+        filter that produced them.
+        """
+        if not self.client or not self.collection:
+            logger.warning("⚠️ ChromaDB not initialized, returning empty results")
+            return [], None
+
+        min_results = min_results or Config.VECTOR_SCOPE_MIN_RESULTS
+        pairs, where = [], None
+        try:
+            if embedding is None:
+                embedding = self.embeddings.embed_query(query)
+            for where in scopes or [None]:
+                pairs = self.query_by_embedding(embedding, k=k, where=where)
+                if len(pairs) >= min(k, min_results):
+                    break
+                logger.info(f"🔎 Scope {where} returned {len(pairs)} results, broadening search")
+        except Exception as e:
+            logger.error(f"❌ Scoped similarity search failed: {e}")
+        return pairs, where
+
+    def query_by_embedding(self, embedding, k=5, where=None):
+        """Native query path: calls collection.query directly, bypassing the LangChain wrapper"""
+        try:
+            result = self._query_collection(embedding, k, where)
+        except Exception as e:
+            # The collection may have been recreated underneath us: re-resolve once and retry
+            logger.warning(f"⚠️ Chroma query failed ({e}), refreshing collection handle")
+            self._refresh_handles()
+            result = self._query_collection(embedding, k, where)
+
+        documents = result.get("documents", [[]])[0]
+        metadatas = result.get("metadatas", [[]])[0]
+        distances = result.get("distances", [[]])[0]
+        return [
+            (Document(page_content=text or "", metadata=metadata or {}), distance)
+            for text, metadata, distance in zip(documents, metadatas, distances)
+        ]
+
+    def reset_collection(self):
+        """Drop and recreate the collection, then refresh the shared handles"""
+        with self._handle_lock:
+            try:
+                self.client.delete_collection(self.collection_name)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not delete collection {self.collection_name}: {e}")
+            self._refresh_handles()
+        logger.info(f"♻️ Recreated collection {self.collection_name}")
+
+    def _query_collection(self, embedding, k, where):
+        return self.collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=where or None,
+            include=["documents", "metadatas", "distances"]
+        )
+
+    def _refresh_handles(self):
+        """(Re)resolve the collection and drop the cached vector store wrapper"""
+        with self._handle_lock:
+            self.collection = self.client.get_or_create_collection(
+                name=self.collection_name,
+                metadata={"description": "Mining Knowledge Base"}
+            )
+            self._vectorstore = None
+
+    def _get_vectorstore(self):
+        """Long-lived LangChain Chroma wrapper (used for document ingestion)"""
+        if self._vectorstore is None:
+            with self._handle_lock:
+                if self._vectorstore is None:
+                    self._vectorstore = Chroma(
+                        client=self.client,
+                        collection_name=self.collection_name,
+                        embedding_function=self.embeddings
+                    )
+        return self._vectorstore
     
     def get_collection_info(self):
         """Get information about the collection"""
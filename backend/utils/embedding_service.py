@@ -0,0 +1,82 @@
+from config import Config
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """Single SentenceTransformer shared by ChromaDB, the RAG engine and scripts
+
+    The model is loaded on first use. The object implements the LangChain
+    embeddings interface (``embed_documents`` / ``embed_query``) so it can be
+    handed to the Chroma vector store directly.
+    """
+
+    def __init__(self, model_name=None, device="cpu"):
+        self.model_name = model_name or Config.EMBEDDING_MODEL
+        self.device = device
+        self.load_seconds = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    started = time.monotonic()
+                    self._model = SentenceTransformer(self.model_name, device=self.device)
+                    self.load_seconds = round(time.monotonic() - started, 2)
+                    logger.info(f"✅ Embedding model {self.model_name} loaded in {self.load_seconds}s")
+        return self._model
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    @property
+    def dimension(self):
+        """Embedding size reported by the model itself"""
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed_documents(self, texts, batch_size=None):
+        """Embed a batch of texts"""
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self.model.encode(
+            texts,
+            batch_size=batch_size or Config.EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        """Embed a single query string"""
+        return self.model.encode([text], convert_to_numpy=True, show_progress_bar=False)[0].tolist()
+
+    def info(self):
+        return {
+            "model_name": self.model_name,
+            "embedding_size": self.dimension,
+            "load_seconds": self.load_seconds
+        }
+
+
+_embedding_service = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service():
+    """Process-wide shared EmbeddingService (model itself is still loaded lazily)"""
+    global _embedding_service
+    if _embedding_service is None:
+        with _service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService()
+    return _embedding_service
@@ -0,0 +1,253 @@
+from database.db_config import get_mysql_connection
+from utils.chromadb_manager import record_id, scope_metadata
+from config import Config
+from datetime import datetime
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# MySQL tables mirrored into the knowledge base: table -> document type + primary key
+SYNC_TABLES = {
+    "equipment_monitoring": {"doc_type": "equipment", "pk": "equipment_id"},
+    "mining_incidents": {"doc_type": "incidents", "pk": "incident_id"},
+    "production_metrics": {"doc_type": "production", "pk": "metric_id"},
+    "maintenance_repairs": {"doc_type": "maintenance", "pk": "maintenance_id"},
+    "fuel_energy": {"doc_type": "fuel", "pk": "reading_id"},
+    "quality_metrics": {"doc_type": "quality", "pk": "quality_id"},
+    "safety_compliance": {"doc_type": "safety", "pk": "audit_id"},
+}
+
+EPOCH = datetime(1970, 1, 1)
+
+# Keyset pagination on (updated_at, pk) so ties on updated_at are not skipped
+UPDATED_AT_BATCH_QUERY = """
+    SELECT * FROM {table}
+    WHERE updated_at > %s OR (updated_at = %s AND {pk} > %s)
+    ORDER BY updated_at, {pk}
+    LIMIT %s
+"""
+
+
+def row_hash(row):
+    """Content hash of a row, used to skip unchanged rows"""
+    payload = json.dumps(row, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class KnowledgeBaseSync:
+    """Incrementally mirrors MySQL tables into the ChromaDB knowledge base
+
+    Each table is synced with the cheapest change-tracking strategy it supports:
+
+    * ``updated_at`` - keyset scan past the (updated_at, pk) high-water mark
+    * ``pk``         - numeric primary key past the last synced id (inserts only)
+    * ``hash``       - full scan, re-embedding only rows whose content hash changed
+
+    Embedding work is proportional to the number of changed rows, not to the
+    table size. Finding vectors whose row was deleted takes a primary-key scan
+    of the table, so ``updated_at``/``pk`` tables only reconcile on a full run
+    or once every KB_SYNC_RECONCILE_INTERVAL seconds; ``hash`` tables get it
+    from their full scan. Vector ids are ``<table>:<pk>``, the same ids CSV
+    seeding uses (ChromaDBManager.add_csv_data).
+    """
+
+    def __init__(self, chroma, state_path=None, batch_size=None):
+        self.chroma = chroma
+        self.state_path = state_path or Config.KB_SYNC_STATE_PATH
+        self.batch_size = batch_size or Config.KB_SYNC_BATCH_ROWS
+        self.state = self._load_state()
+
+    def run(self, tables=None, full=False):
+        """Sync the given tables (all of SYNC_TABLES by default); returns a per-table report
+
+        ``full`` forgets the high-water marks (every row is re-embedded) and
+        reconciles deletions.
+        """
+        report = {}
+        for table in tables or SYNC_TABLES:
+            spec = SYNC_TABLES[table]
+            started = time.monotonic()
+            try:
+                stats = self.sync_table(table, spec, full=full)
+            except Exception as e:
+                logger.error(f"❌ Sync of {table} failed: {e}")
+                stats = {"error": str(e)}
+            stats["seconds"] = round(time.monotonic() - started, 2)
+            report[table] = stats
+            logger.info(f"🔄 {table}: {stats}")
+        return report
+
+    def sync_table(self, table, spec, full=False):
+        if full:
+            self.state.pop(table, None)
+
+        with get_mysql_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            mode = self._detect_mode(cursor, table, spec)
+            if mode == "hash":
+                # The full scan already tells us which rows disappeared
+                upserted, deleted = self._sync_by_hash(cursor, table, spec)
+                reconciled = True
+            else:
+                sync = self._sync_by_updated_at if mode == "updated_at" else self._sync_by_pk
+                upserted = sync(cursor, table, spec)
+                reconciled = self._reconcile_due(table)
+                deleted = self._delete_removed(cursor, table, spec) if reconciled else 0
+            cursor.close()
+
+        self._save_state()
+        return {"mode": mode, "upserted": upserted, "deleted": deleted, "reconciled": reconciled}
+
+    def _reconcile_due(self, table):
+        """Whether this run should look for deleted rows (always after ``full`` dropped the state)"""
+        reconciled_at = self.state.get(table, {}).get("reconciled_at")
+        if reconciled_at is None:
+            return True
+        interval = Config.KB_SYNC_RECONCILE_INTERVAL
+        return interval > 0 and time.time() - reconciled_at >= interval
+
+    def _detect_mode(self, cursor, table, spec):
+        cursor.execute("""
+            SELECT COLUMN_NAME, DATA_TYPE
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        columns = {row["COLUMN_NAME"]: row["DATA_TYPE"] for row in cursor.fetchall()}
+        if not columns:
+            raise ValueError(f"Table {table} does not exist")
+        if "updated_at" in columns:
+            return "updated_at"
+        if columns.get(spec["pk"]) in ("int", "bigint", "mediumint", "smallint"):
+            return "pk"
+        return "hash"
+
+    def _sync_by_updated_at(self, cursor, table, spec):
+        pk = spec["pk"]
+        table_state = self.state.setdefault(table, {})
+        last_updated = datetime.fromisoformat(table_state.get("updated_at", EPOCH.isoformat()))
+        last_pk = table_state.get("pk", "")
+        upserted = 0
+
+        while True:
+            cursor.execute(
+                UPDATED_AT_BATCH_QUERY.format(table=table, pk=pk),
+                (last_updated, last_updated, last_pk, self.batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            self._upsert_rows(table, spec, rows)
+            upserted += len(rows)
+            last_updated, last_pk = rows[-1]["updated_at"], rows[-1][pk]
+            table_state.update({"updated_at": last_updated.isoformat(), "pk": last_pk})
+            self._save_state()
+
+        return upserted
+
+    def _sync_by_pk(self, cursor, table, spec):
+        pk = spec["pk"]
+        table_state = self.state.setdefault(table, {})
+        last_pk = table_state.get("pk", 0)
+        upserted = 0
+
+        while True:
+            cursor.execute(f"""
+                SELECT * FROM {table}
+                WHERE {pk} > %s
+                ORDER BY {pk}
+                LIMIT %s
+            """, (last_pk, self.batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            self._upsert_rows(table, spec, rows)
+            upserted += len(rows)
+            last_pk = rows[-1][pk]
+            table_state["pk"] = last_pk
+            self._save_state()
+
+        return upserted
+
+    def _sync_by_hash(self, cursor, table, spec):
+        pk = spec["pk"]
+        known_hashes = {
+            vector_id: (metadata or {}).get("row_hash")
+            for vector_id, metadata in self.chroma.get_metadata_by_id({"table": table}).items()
+        }
+        seen_ids = set()
+        upserted = 0
+
+        cursor.execute(f"SELECT * FROM {table}")
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            changed = []
+            for row in rows:
+                vector_id = self._vector_id(table, row[pk])
+                seen_ids.add(vector_id)
+                if known_hashes.get(vector_id) != row_hash(row):
+                    changed.append(row)
+            if changed:
+                self._upsert_rows(table, spec, changed)
+                upserted += len(changed)
+
+        removed = set(known_hashes) - seen_ids
+        if removed:
+            self.chroma.delete_ids(removed)
+        return upserted, len(removed)
+
+    def _delete_removed(self, cursor, table, spec):
+        """Delete vectors whose source row is gone (primary-key-only scan)"""
+        cursor.execute(f"SELECT {spec['pk']} AS pk FROM {table}")
+        live_ids = {self._vector_id(table, row["pk"]) for row in cursor.fetchall()}
+        removed = self.chroma.list_ids({"table": table}) - live_ids
+        if removed:
+            self.chroma.delete_ids(removed)
+        self.state.setdefault(table, {})["reconciled_at"] = time.time()
+        return len(removed)
+
+    def _upsert_rows(self, table, spec, rows):
+        pk = spec["pk"]
+        ids = [self._vector_id(table, row[pk]) for row in rows]
+        metadatas = [
+            {
+                "source": table,
+                "type": spec["doc_type"],
+                "table": table,
+                "row_id": str(row[pk]),
+                "row_hash": row_hash(row),
+                **scope_metadata(row, spec["doc_type"])
+            }
+            for row in rows
+        ]
+        self.chroma.upsert_records(ids, rows, spec["doc_type"], metadatas)
+
+    @staticmethod
+    def _vector_id(table, pk_value):
+        return record_id(table, pk_value)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable sync state {self.state_path}: {e}")
+            return {}
+
+    def _save_state(self):
+        """Persist high-water marks atomically so an interrupted run resumes cleanly"""
+        directory = os.path.dirname(os.path.abspath(self.state_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, default=str)
+        os.replace(tmp_path, self.state_path)
@@ -1,13 +1,7 @@
-import os
-import sys
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.docstore.document import Document
 from config import Config
+from utils.embedding_service import get_embedding_service
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -21,30 +15,13 @@ class LangChainSetup:
     
     def initialize_components(self):
         """Initialize all LangChain components"""
-        try:
-            from sentence_transformers import SentenceTransformer
-            # Load model directly without HuggingFaceEmbeddings wrapper
-            model = SentenceTransformer(Config.EMBEDDING_MODEL)
-            
-            # Create a simple wrapper
-            class SimpleEmbeddings:
-                def __init__(self, model):
-                    self.model = model
-                def embed_documents(self, texts):
-                    return self.model.encode(texts).tolist()
-                def embed_query(self, text):
-                    return self.model.encode([text])[0].tolist()
-            
-            self.embeddings = SimpleEmbeddings(model)
-            logger.info("✅ Embeddings initialized successfully")
-            
-        except Exception as e:
-            import traceback
-            logger.error(f"❌ Failed to initialize embeddings: {e}")
-            logger.error(traceback.format_exc())
+        # Shared, lazily loaded model (see utils/embedding_service.py)
+        self.embeddings = get_embedding_service()
+        logger.info("✅ Embeddings initialized successfully")
     
     def create_custom_prompt(self):
         """Create custom prompt template for mining domain"""
+        from langchain.prompts import PromptTemplate
         
         prompt_template = """You are an expert mining and infrastructure management assistant. 
 Use the following context to provide a concise, actionable answer in 3-4 sentences maximum.
@@ -69,6 +46,8 @@ Concise Answer:"""
     
     def create_text_splitter(self):
         """Create text splitter for document processing"""
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+
         return RecursiveCharacterTextSplitter(
             chunk_size=1000,
             chunk_overlap=200,
@@ -78,6 +57,8 @@ Concise Answer:"""
     
     def create_documents_from_texts(self, texts, metadatas=None):
         """Create LangChain documents from text list"""
+        from langchain.docstore.document import Document
+
         documents = []
         for i, text in enumerate(texts):
             metadata = metadatas[i] if metadatas and i < len(metadatas) else {}
@@ -87,12 +68,28 @@ Concise Answer:"""
     
     def get_embedding_model_info(self):
         """Get information about the embedding model"""
-        if self.embeddings:
-            return {
-                "model_name": Config.EMBEDDING_MODEL,
-                "embedding_size": 384
-            }
-        return {"error": "Embeddings not initialized"}
+        try:
+            return self.embeddings.info()
+        except Exception as e:
+            logger.error(f"❌ Failed to load embeddings: {e}")
+            return {"error": "Embeddings not initialized"}
+
+# Global instance, created on first use (``from utils.langchain_setup import
+# langchain_setup`` still works through the module __getattr__ below)
+_langchain_setup = None
+_setup_lock = threading.Lock()
+
+
+def get_langchain_setup():
+    global _langchain_setup
+    if _langchain_setup is None:
+        with _setup_lock:
+            if _langchain_setup is None:
+                _langchain_setup = LangChainSetup()
+    return _langchain_setup
+
 
-# Global instance
-langchain_setup = LangChainSetup()
\ No newline at end of file
+def __getattr__(name):
+    if name == "langchain_setup":
+        return get_langchain_setup()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,45 @@
+import logging
+import os
+import resource
+
+logger = logging.getLogger(__name__)
+
+# /proc/<pid>/smaps_rollup fields reported by memory_usage(), in kB
+SMAPS_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Shared_Dirty": "shared_dirty_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+}
+
+
+def memory_usage(pid="self"):
+    """Memory of a process in MB
+
+    PSS (proportional set size) splits pages shared with other processes,
+    e.g. copy-on-write model weights inherited from the gunicorn master, so
+    summing PSS over the workers gives the real footprint. Falls back to the
+    peak RSS from getrusage where /proc is unavailable.
+    """
+    try:
+        usage = {}
+        with open(f"/proc/{pid}/smaps_rollup") as rollup:
+            for line in rollup:
+                name, _, rest = line.partition(":")
+                if name in SMAPS_FIELDS:
+                    usage[SMAPS_FIELDS[name]] = round(int(rest.split()[0]) / 1024, 1)
+        usage["pid"] = os.getpid() if pid == "self" else pid
+        return usage
+    except (OSError, ValueError, IndexError):
+        if pid != "self":
+            return {"pid": pid}
+        # ru_maxrss is in kB on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"pid": os.getpid(), "max_rss_mb": round(peak / 1024, 1)}
+
+
+def format_memory(usage):
+    parts = [f"{key.replace('_mb', '')}={value}MB" for key, value in usage.items() if key.endswith("_mb")]
+    return " ".join(parts) or "unavailable"
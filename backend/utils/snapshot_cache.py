@@ -0,0 +1,141 @@
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotUnavailable(Exception):
+    """A key's loader failed recently and there is no earlier snapshot to serve"""
+
+
+class SnapshotCache:
+    """Thread-safe TTL cache holding one snapshot per key
+
+    Each key expires on its own, so refreshing one aggregate never forces the
+    others to be recomputed. Concurrent readers of a stale key wait for a
+    single recomputation instead of all hitting the database.
+
+    When a refresh fails, the last good snapshot keeps being served (with its
+    real age) and the loader is not called again for ``error_ttl`` seconds,
+    so an outage costs one slow attempt per key and period, not one per
+    request.
+    """
+
+    def __init__(self, default_ttl=60, max_keys=None, error_ttl=10):
+        self.default_ttl = default_ttl
+        self.max_keys = max_keys  # None = unbounded; otherwise the oldest snapshot is evicted
+        self.error_ttl = error_ttl
+        self._entries = {}  # key -> (value, computed_at, ttl)
+        self._failures = {}  # key -> (error, failed_at)
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "failures": 0, "stale": 0}
+
+    def get(self, key, loader, ttl=None):
+        """Return ``(value, age_seconds)`` for ``key``, calling ``loader()`` when stale
+
+        Raises SnapshotUnavailable when the loader failed (now or within
+        ``error_ttl``) and the key has never been loaded.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        snapshot = self._fresh(key)
+        if snapshot is not None:
+            return snapshot
+
+        with self._key_lock(key):
+            # Another thread may have refreshed the key while we waited
+            snapshot = self._fresh(key)
+            if snapshot is not None:
+                return snapshot
+
+            error = self._recent_failure(key)
+            if error is not None:
+                return self._stale(key, error)
+
+            try:
+                value = loader()
+            except Exception as e:
+                with self._lock:
+                    self._failures[key] = (e, time.monotonic())
+                    self._stats["failures"] += 1
+                logger.warning(f"⚠️ Snapshot '{key}' refresh failed, retrying in {self.error_ttl}s: {e}")
+                return self._stale(key, e)
+
+            with self._lock:
+                self._failures.pop(key, None)
+                self._entries[key] = (value, time.monotonic(), ttl)
+                self._stats["misses"] += 1
+                if self.max_keys and len(self._entries) > self.max_keys:
+                    oldest = min(self._entries, key=lambda name: self._entries[name][1])
+                    del self._entries[oldest]
+                    self._failures.pop(oldest, None)
+                    self._key_locks.pop(oldest, None)
+            return value, 0.0
+
+    def peek(self, key):
+        """Return ``(value, age_seconds)`` if ``key`` is fresh, else None (never loads)"""
+        return self._fresh(key)
+
+    def invalidate(self, *keys):
+        """Drop the given keys (all keys when called without arguments)"""
+        with self._lock:
+            if keys:
+                for key in keys:
+                    self._entries.pop(key, None)
+                    self._failures.pop(key, None)
+            else:
+                keys = tuple(self._entries)
+                self._entries.clear()
+                self._failures.clear()
+            self._stats["invalidations"] += 1
+        logger.info(f"🧹 Snapshot cache invalidated: {', '.join(map(str, keys)) or 'nothing cached'}")
+
+    def ages(self):
+        """Age in seconds of every cached snapshot"""
+        now = time.monotonic()
+        with self._lock:
+            return {key: round(now - computed_at, 2) for key, (_, computed_at, _) in self._entries.items()}
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["keys"] = len(self._entries)
+            stats["failing_keys"] = len(self._failures)
+        return stats
+
+    def _fresh(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, computed_at, ttl = entry
+            if now - computed_at >= ttl:
+                return None
+            self._stats["hits"] += 1
+        return value, round(now - computed_at, 2)
+
+    def _recent_failure(self, key):
+        """The error of a failed refresh less than ``error_ttl`` seconds ago, else None"""
+        with self._lock:
+            failure = self._failures.get(key)
+        if failure is None or time.monotonic() - failure[1] >= self.error_ttl:
+            return None
+        return failure[0]
+
+    def _stale(self, key, error):
+        """The last good snapshot, however old, or SnapshotUnavailable"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._stats["stale"] += 1
+        if entry is None:
+            raise SnapshotUnavailable(f"'{key}' is unavailable: {error}") from error
+        value, computed_at, _ = entry
+        return value, round(now - computed_at, 2)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
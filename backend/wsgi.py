@@ -8,14 +8,21 @@ import sys
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, initialize_services
+from app import app, initialize_services, preload_models
+from config import Config
 
-# Initialize services when the WSGI app loads
-initialize_services()
+if Config.PRELOAD_MODELS:
+    # Loaded once in the gunicorn master (preload_app); each worker opens its
+    # own DB/Chroma handles in the post_fork hook (gunicorn.conf.py)
+    preload_models()
+else:
+    # Initialize services when the WSGI app loads
+    initialize_services()
 
 # This makes the app available to WSGI servers
 application = app
 
 if __name__ == "__main__":
     # This allows running: python wsgi.py (for development)
+    initialize_services()
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
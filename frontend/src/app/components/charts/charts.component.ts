@@ -1,6 +1,7 @@
 // Build timestamp: 2025-10-07-15:03
 import { Component, Input, OnChanges, SimpleChanges, OnInit, OnDestroy } from '@angular/core';
 import { Chart, registerables } from 'chart.js';
+import { ChartSeries } from '../../models/interfaces';
 
 Chart.register(...registerables);
 
@@ -10,7 +11,8 @@ Chart.register(...registerables);
   styleUrls: ['./charts.component.css']
 })
 export class ChartsComponent implements OnInit, OnChanges, OnDestroy {
-  @Input() data: any[] = [];
+  // Columnar {labels, series} from the API, or the older list of records
+  @Input() data: ChartSeries | any[] = [];
   @Input() type: 'line' | 'bar' | 'pie' | 'doughnut' = 'line';
   @Input() title: string = '';
   @Input() chartId: string = '';
@@ -27,17 +29,25 @@ export class ChartsComponent implements OnInit, OnChanges, OnDestroy {
   }
 
   ngOnInit(): void {
-    if (this.data?.length) {
+    if (ChartsComponent.hasData(this.data)) {
       this.safeRender();
     }
   }
 
   ngOnChanges(changes: SimpleChanges): void {
-    if ((changes['data'] || changes['type']) && this.data?.length) {
+    if ((changes['data'] || changes['type']) && ChartsComponent.hasData(this.data)) {
       this.safeRender();
     }
   }
 
+  static isSeries(data: any): data is ChartSeries {
+    return !!data && !Array.isArray(data) && Array.isArray(data.labels) && !!data.series;
+  }
+
+  static hasData(data: any): boolean {
+    return ChartsComponent.isSeries(data) ? data.labels.length > 0 : !!data?.length;
+  }
+
   ngOnDestroy(): void {
     if (this.chartInstance) {
       this.chartInstance.destroy();
@@ -67,7 +77,9 @@ export class ChartsComponent implements OnInit, OnChanges, OnDestroy {
     let labels: string[] = [];
     let datasets: any[] = [];
 
-    if (this.type === 'pie' || this.type === 'doughnut') {
+    if (ChartsComponent.isSeries(this.data)) {
+      ({ labels, datasets } = this.seriesDatasets(this.data));
+    } else if (this.type === 'pie' || this.type === 'doughnut') {
       labels = this.data.map(d => d.status || d.type || d.name || d.label || 'Unknown');
       datasets = [{
         data: this.data.map(d => d.count || d.value || d.percentage || 0),
@@ -101,6 +113,37 @@ export class ChartsComponent implements OnInit, OnChanges, OnDestroy {
     setTimeout(() => this.chartInstance?.resize(), 100);
   }
 
+  /** Columnar payload: labels used as-is, one dataset per series (pie/doughnut: the first series) */
+  private seriesDatasets(data: ChartSeries): { labels: string[]; datasets: any[] } {
+    const labels = data.labels.map(label => String(label));
+    const names = Object.keys(data.series);
+
+    if (this.type === 'pie' || this.type === 'doughnut') {
+      return {
+        labels,
+        datasets: [{
+          data: data.series[names[0]] || [],
+          backgroundColor: this.generateColors(labels.length, 0.7),
+          borderColor: this.generateColors(labels.length, 1),
+          borderWidth: 2
+        }]
+      };
+    }
+
+    return {
+      labels,
+      datasets: names.map((name, idx) => ({
+        label: this.formatLabel(name),
+        data: data.series[name],
+        borderColor: this.getColor(idx),
+        backgroundColor: this.type === 'bar' ? this.getColor(idx, 0.7) : this.getColor(idx, 0.1),
+        fill: this.type === 'line',
+        tension: 0.3,
+        borderWidth: 2
+      }))
+    };
+  }
+
   private getChartOptions(): any {
     const baseOptions = {
       responsive: true,
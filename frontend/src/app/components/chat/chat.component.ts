@@ -1,7 +1,8 @@
 import { Component, Input, OnInit, ViewChild, ElementRef } from '@angular/core';
 import { ApiService } from '../../services/api.service';
+import { ChartsComponent } from '../charts/charts.component';
 import { AudioService } from '../../services/audio.service';
-import { ChatMessage } from '../../models/interfaces';
+import { ChatMessage, DataTable } from '../../models/interfaces';
 
 @Component({
   selector: 'app-chat',
@@ -53,6 +54,51 @@ export class ChatComponent implements OnInit {
     this.userInput = '';
     this.isLoading = true;
 
+    this.streamMessage(query);
+  }
+
+  // Stream the answer: KPIs/charts arrive first, then the answer text token by token
+  private streamMessage(query: string): void {
+    let assistantMessage: ChatMessage | null = null;
+    const ensureMessage = (): ChatMessage => {
+      if (!assistantMessage) {
+        assistantMessage = { role: 'assistant', content: '', timestamp: new Date() };
+        this.messages.push(assistantMessage);
+        this.isLoading = false;
+      }
+      return assistantMessage;
+    };
+
+    this.apiService.streamQuery(query, this.language).subscribe({
+      next: ({ event, data }) => {
+        if (event === 'visualizations') {
+          ensureMessage().visualizations = data;
+        } else if (event === 'token') {
+          ensureMessage().content += data.text;
+        } else if (event === 'done') {
+          const message = ensureMessage();
+          message.content = data.answer;
+          message.recommendations = data.recommendations;
+        } else if (event === 'error') {
+          ensureMessage().content = 'Sorry, I encountered an error. Please try again.';
+        }
+        this.scrollToBottom();
+      },
+      error: () => {
+        // Streaming unavailable (e.g. proxy buffering): fall back to the blocking endpoint
+        if (assistantMessage) {
+          this.messages = this.messages.filter(m => m !== assistantMessage);
+        }
+        this.isLoading = true;
+        this.sendBlockingMessage(query);
+      },
+      complete: () => {
+        this.isLoading = false;
+      }
+    });
+  }
+
+  private sendBlockingMessage(query: string): void {
     // Use actual API call with your interface structure
     this.apiService.sendQuery(query, this.language, this.includeAudio).subscribe({
       next: (response: any) => {
@@ -152,12 +198,30 @@ export class ChatComponent implements OnInit {
     }, 100);
   }
 
+  // Move a data table to its previous/next page (all rows arrive with the answer)
+  changeTablePage(table: DataTable, delta: number): void {
+    const page = table.page + delta;
+    if (page < 1 || page > table.total_pages) return;
+    table.page = page;
+  }
+
+  // Rows of the table's current page
+  tablePageRows(table: DataTable): any[][] {
+    const start = (table.page - 1) * table.page_size;
+    return table.rows.slice(start, start + table.page_size);
+  }
+
   // Helper method to check if we have chart data
   hasChartData(charts: any): boolean {
     return charts && (
-      (charts.equipment_status && charts.equipment_status.length > 0) ||
-      (charts.production_trend && charts.production_trend.length > 0) ||
-      (charts.incidents_trend && charts.incidents_trend.length > 0)
+      this.hasSeries(charts.equipment_status) ||
+      this.hasSeries(charts.production_trend) ||
+      this.hasSeries(charts.incidents_trend)
     );
   }
+
+  // Columnar {labels, series} or a list of records, non-empty
+  hasSeries(chart: any): boolean {
+    return ChartsComponent.hasData(chart);
+  }
 }
\ No newline at end of file
@@ -12,15 +12,14 @@ export interface ChatMessage {
       monthly_production: number;
     };
     charts: {
-      equipment_status?: any[];
-      production_trend?: any[];
-      incidents_trend?: any[];
-      efficiency_trend?: any[];
-    };
-    tables?: {
-      summary: string;
-      preview: string;
+      equipment_status?: ChartSeries | any[];
+      production_trend?: ChartSeries | any[];
+      incidents_trend?: ChartSeries | any[];
+      efficiency_trend?: ChartSeries | any[];
     };
+    tables?: DataTables;
+    // Seconds since each KPI/chart snapshot was computed
+    cache_age?: { [aggregate: string]: number | null };
   };
   // ✅ ADDED: Embedded recommendations
   recommendations?: string[];
@@ -43,15 +42,54 @@ export interface ChatResponse {
     visualizations: {
       kpis: any;
       charts: any;
-      tables: any;
+      tables: DataTables;
     };
     recommendations: string[];
     sources: any[];
+    // Sections left out because their stage missed its time budget
+    dropped_sections?: string[];
+    // Estimated prompt size after context assembly
+    prompt_tokens?: number;
     language: string;
     audio?: AudioData;
   };
 }
 
+// Columnar chart payload: one value per label in every series
+export interface ChartSeries {
+  labels: string[];
+  series: { [name: string]: number[] };
+}
+
+// Routed SQL results behind an answer: one paginated table (and chart) per query
+export interface DataTables {
+  summary: string;
+  results: DataTable[];
+}
+
+export interface DataTable {
+  id: string;
+  name: string;
+  title: string;
+  columns: string[];
+  rows: any[][];        // every row (up to TABLE_MAX_ROWS); pages are sliced client side
+  page: number;
+  page_size: number;
+  total_rows: number;
+  total_pages: number;
+  truncated: boolean;   // more rows matched than were sent
+  chart?: {
+    type: 'line' | 'bar' | 'pie' | 'doughnut';
+    data: ChartSeries;
+  };
+}
+
+// ✅ ADDED: One server-sent event from /api/query/stream
+export interface StreamEvent {
+  event: 'visualizations' | 'token' | 'done' | 'error' | string;
+  data: any;
+}
+
 export interface KPIsResponse {
   success: boolean;
   kpis: {
@@ -60,6 +98,7 @@ export interface KPIsResponse {
     avg_efficiency: number;
     monthly_production: number;
   };
+  cache_age_seconds?: number;
 }
 
 // ✅ ADDED: System status interface
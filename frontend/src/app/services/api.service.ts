@@ -2,6 +2,7 @@ import { Injectable } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
 import { Observable } from 'rxjs';
 import { environment } from '../../environments/environment';
+import { StreamEvent } from '../models/interfaces';
 
 @Injectable({
   providedIn: 'root'
@@ -25,6 +26,60 @@ export class ApiService {
     });
   }
 
+  // Streaming query endpoint (server-sent events over a POST body)
+  streamQuery(query: string, language: string = 'en'): Observable<StreamEvent> {
+    return new Observable<StreamEvent>(observer => {
+      const controller = new AbortController();
+
+      fetch(`${this.apiUrl}/api/query/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify({ question: query, language: language }),
+        signal: controller.signal
+      }).then(async response => {
+        if (!response.ok || !response.body) {
+          throw new Error(`Stream request failed with status ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+
+          // SSE frames are separated by a blank line
+          let boundary = buffer.indexOf('\n\n');
+          while (boundary !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const parsed = this.parseStreamFrame(frame);
+            if (parsed) observer.next(parsed);
+            boundary = buffer.indexOf('\n\n');
+          }
+        }
+        observer.complete();
+      }).catch(err => {
+        if (!controller.signal.aborted) observer.error(err);
+      });
+
+      return () => controller.abort();
+    });
+  }
+
+  private parseStreamFrame(frame: string): StreamEvent | null {
+    let event = 'message';
+    const dataLines: string[] = [];
+    for (const line of frame.split('\n')) {
+      if (line.startsWith('event:')) event = line.slice(6).trim();
+      else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+    }
+    if (!dataLines.length) return null;
+    return { event, data: JSON.parse(dataLines.join('\n')) };
+  }
+
   // System status
   getSystemStatus(): Observable<any> {
     return this.http.get(`${this.apiUrl}/api/system-status`);
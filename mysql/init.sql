@@ -4,6 +4,10 @@
 CREATE DATABASE IF NOT EXISTS mining_data;
 USE mining_data;
 
+-- Telemetry tables (same DDL as migration 5 in backend/database/schema.py).
+-- The kaggle_data CSVs are loaded, and reloaded, with:
+--   python backend/scripts/load_telemetry.py
+
 -- =========================================
 -- Equipment Status Table
 -- =========================================
@@ -25,46 +29,29 @@ CREATE TABLE IF NOT EXISTS equipment_status (
     INDEX idx_alert (alert)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
--- Load CSV into equipment_status
-LOAD DATA INFILE '/path/to/equipment_status_logs_rows.csv'
-INTO TABLE equipment_status
-FIELDS TERMINATED BY ','
-ENCLOSED BY '"'
-LINES TERMINATED BY '\n'
-IGNORE 1 ROWS
-(id, equipment_name, status, date, start_time, end_time, duration_minutes, alert, reason, issue, comment, created_at);
-
 -- =========================================
--- Production By Date Table (Shift-wise)
+-- Production By Date Table (Shift-wise, one row per date and shift)
 -- =========================================
 CREATE TABLE IF NOT EXISTS production_by_date (
-    Date DATE PRIMARY KEY,
-    Excavator INT,
-    Dumper INT,
-    Total_Trips INT,
-    Qty_m3 DECIMAL(12,2),
-    Excavator_1 INT,
-    Dumper_1 INT,
-    Total_Trips_1 INT,
-    Qty_m3_1 DECIMAL(12,2),
-    Excavator_2 INT,
-    Dumper_2 INT,
-    Total_Trips_2 INT,
-    Qty_m3_2 DECIMAL(12,2)
+    date DATE NOT NULL,
+    shift VARCHAR(10) NOT NULL,
+    excavator INT,
+    dumper INT,
+    trips_mining INT,
+    trips_reclaim INT,
+    total_trips INT,
+    qty_m3 DECIMAL(12,2),
+    grader INT,
+    dozer INT,
+    PRIMARY KEY (date, shift)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
-LOAD DATA INFILE '/path/to/mines_production_data_by_date.csv'
-INTO TABLE production_by_date
-FIELDS TERMINATED BY ',' ENCLOSED BY '"'
-LINES TERMINATED BY '\n'
-IGNORE 1 ROWS
-(Date, Excavator, Dumper, Total_Trips, Qty_m3, Excavator_1, Dumper_1, Total_Trips_1, Qty_m3_1, Excavator_2, Dumper_2, Total_Trips_2, Qty_m3_2);
-
 -- =========================================
 -- Trip Details Table
 -- =========================================
 CREATE TABLE IF NOT EXISTS trip_details (
     id INT AUTO_INCREMENT PRIMARY KEY,
+    trip_key CHAR(40) NOT NULL,
     Date DATE NOT NULL,
     Source VARCHAR(255),
     Destination VARCHAR(255),
@@ -74,17 +61,11 @@ CREATE TABLE IF NOT EXISTS trip_details (
     Production DECIMAL(10,2) DEFAULT 0,
     Total INT DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_trip_key (trip_key),
     INDEX idx_date (Date),
     INDEX idx_asset (Asset_Name)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
-LOAD DATA INFILE '/path/to/mines_production_data_by_date_by_equipment.csv'
-INTO TABLE trip_details
-FIELDS TERMINATED BY ',' ENCLOSED BY '"'
-LINES TERMINATED BY '\n'
-IGNORE 1 ROWS
-(Date, Source, Destination, Specification, Asset_Name, Operator, Production, Total);
-
 -- =========================================
 -- Create User and Permissions
 -- =========================================